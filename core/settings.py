@@ -12,13 +12,113 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
 
 MY_API_KEY = config("MY_API_KEY")
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Whisper model used for transcription. With WHISPER_PRELOAD the model is
+# loaded once when the app starts instead of on the first quiz creation.
+WHISPER_MODEL = config("WHISPER_MODEL", default="turbo")
+WHISPER_PRELOAD = config("WHISPER_PRELOAD", default=False, cast=bool)
+
+# Audio longer than WHISPER_CHUNKED_MIN_SECONDS is split at quiet spots into
+# chunks that are transcribed in parallel by WHISPER_PROCESSES processes.
+# Each process uses WHISPER_TORCH_THREADS threads (default: cores / processes).
+# With WHISPER_PROCESSES = 1 every file is transcribed in one piece.
+WHISPER_PROCESSES = config("WHISPER_PROCESSES", default=1, cast=int)
+WHISPER_TORCH_THREADS = config("WHISPER_TORCH_THREADS", default=0, cast=int)
+WHISPER_CHUNKED_MIN_SECONDS = config("WHISPER_CHUNKED_MIN_SECONDS", default=600, cast=int)
+WHISPER_CHUNK_SECONDS = config("WHISPER_CHUNK_SECONDS", default=300, cast=float)
+WHISPER_CHUNK_OVERLAP_SECONDS = config("WHISPER_CHUNK_OVERLAP_SECONDS", default=1.5, cast=float)
+WHISPER_CHUNK_SEARCH_SECONDS = config("WHISPER_CHUNK_SEARCH_SECONDS", default=15, cast=float)
+
+# "native" keeps the downloaded audio stream as it is and decodes it once for
+# Whisper, "mp3" converts it to an MP3 file first (slower, needs more disk).
+AUDIO_FORMAT = config("AUDIO_FORMAT", default="native")
+
+# Gemini calls share one client with a keep-alive connection pool. At most
+# GEMINI_MAX_CONCURRENCY calls run at the same time and GEMINI_REQUESTS_PER_MINUTE
+# limits the rate; further calls wait. Rate limits, server errors and timeouts
+# are retried with jittered exponential backoff.
+GEMINI_MODEL = config("GEMINI_MODEL", default="gemini-2.5-flash")
+GEMINI_TIMEOUT_SECONDS = config("GEMINI_TIMEOUT_SECONDS", default=120, cast=float)
+GEMINI_MAX_CONCURRENCY = config("GEMINI_MAX_CONCURRENCY", default=4, cast=int)
+GEMINI_REQUESTS_PER_MINUTE = config("GEMINI_REQUESTS_PER_MINUTE", default=60, cast=float)
+GEMINI_RETRY_ATTEMPTS = config("GEMINI_RETRY_ATTEMPTS", default=4, cast=int)
+GEMINI_RETRY_BASE_SECONDS = config("GEMINI_RETRY_BASE_SECONDS", default=1, cast=float)
+GEMINI_RETRY_MAX_SECONDS = config("GEMINI_RETRY_MAX_SECONDS", default=30, cast=float)
+
+# Transcripts longer than GEMINI_PROMPT_TOKEN_BUDGET tokens are split into chunks of about
+# GEMINI_CHUNK_TOKENS tokens. The key facts of the chunks are extracted in parallel and the
+# quiz is generated from these notes instead of the whole transcript.
+GEMINI_PROMPT_TOKEN_BUDGET = config("GEMINI_PROMPT_TOKEN_BUDGET", default=12000, cast=int)
+GEMINI_CHUNK_TOKENS = config("GEMINI_CHUNK_TOKENS", default=4000, cast=int)
+
+# Quiz creation runs as background jobs. Each process starts QUIZ_JOB_WORKERS
+# threads that take jobs from the database; set it to 0 to process jobs only
+# with `python manage.py run_quiz_jobs`. Without QUIZ_JOB_AUTOSTART the threads
+# and the batch pipeline only start with the first job created or watched by the process, so jobs
+# queued before a restart wait for that or for `run_quiz_jobs`.
+QUIZ_JOB_WORKERS = config("QUIZ_JOB_WORKERS", default=2, cast=int)
+QUIZ_JOB_AUTOSTART = config("QUIZ_JOB_AUTOSTART", default=False, cast=bool)
+QUIZ_JOB_POLL_SECONDS = config("QUIZ_JOB_POLL_SECONDS", default=5, cast=float)
+QUIZ_JOB_STALE_SECONDS = config("QUIZ_JOB_STALE_SECONDS", default=3600, cast=int)
+
+# Progress events of jobs are stored when a stage grew by QUIZ_JOB_PROGRESS_STEP
+# and polled by the event stream every QUIZ_JOB_EVENTS_POLL_SECONDS. They are
+# deleted QUIZ_JOB_EVENTS_RETENTION_SECONDS after the job finished, except the final one.
+QUIZ_JOB_PROGRESS_STEP = config("QUIZ_JOB_PROGRESS_STEP", default=0.05, cast=float)
+QUIZ_JOB_EVENTS_POLL_SECONDS = config("QUIZ_JOB_EVENTS_POLL_SECONDS", default=0.5, cast=float)
+QUIZ_JOB_EVENTS_KEEPALIVE_SECONDS = config("QUIZ_JOB_EVENTS_KEEPALIVE_SECONDS", default=15, cast=float)
+QUIZ_JOB_EVENTS_RETENTION_SECONDS = config("QUIZ_JOB_EVENTS_RETENTION_SECONDS", default=3600, cast=int)
+
+# Jobs of a batch run through a staged pipeline instead of the job workers. Every stage
+# has its own number of threads and waits for the next one when QUIZ_BATCH_QUEUE_SIZE
+# items are queued in front of it.
+QUIZ_BATCH_MAX_URLS = config("QUIZ_BATCH_MAX_URLS", default=50, cast=int)
+QUIZ_BATCH_DOWNLOAD_WORKERS = config("QUIZ_BATCH_DOWNLOAD_WORKERS", default=8, cast=int)
+QUIZ_BATCH_TRANSCRIBE_WORKERS = config("QUIZ_BATCH_TRANSCRIBE_WORKERS", default=1, cast=int)
+QUIZ_BATCH_GENERATE_WORKERS = config("QUIZ_BATCH_GENERATE_WORKERS", default=GEMINI_MAX_CONCURRENCY, cast=int)
+QUIZ_BATCH_QUEUE_SIZE = config("QUIZ_BATCH_QUEUE_SIZE", default=4, cast=int)
+
+# With ASYNC_VIEWS the quiz and auth endpoints are served by async views, so under ASGI
+# (core/asgi.py) a request waiting for the database, a quiz job or Gemini does not hold a thread.
+# The Gemini calls that condense long transcripts for streamed quizzes still block, so they
+# run on ASYNC_BLOCKING_WORKERS threads.
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+ASYNC_BLOCKING_WORKERS = config("ASYNC_BLOCKING_WORKERS", default=8, cast=int)
+
+# Transcripts are cached per YouTube video id. With TRANSCRIPT_CACHE_STORE_AUDIO
+# the downloaded audio is kept as well, so other Whisper models can reuse it.
+QUIZLY_CACHE_DIR = config("QUIZLY_CACHE_DIR", default=str(BASE_DIR / "cache"))
+TRANSCRIPT_CACHE_MAX_BYTES = config("TRANSCRIPT_CACHE_MAX_BYTES", default=512 * 1024 * 1024, cast=int)
+TRANSCRIPT_CACHE_STORE_AUDIO = config("TRANSCRIPT_CACHE_STORE_AUDIO", default=False, cast=bool)
+
+# Concurrent requests for the same video wait for the first one instead of
+# downloading, transcribing and prompting Gemini again.
+SINGLE_FLIGHT_TIMEOUT_SECONDS = config("SINGLE_FLIGHT_TIMEOUT_SECONDS", default=1800, cast=int)
+
+# Downloaded audio lives in scratch areas that are removed as soon as a quiz creation ends.
+# SCRATCH_DIR defaults to the RAM-backed /dev/shm (if it can hold SCRATCH_MAX_BYTES) or the
+# temp directory. New downloads wait while SCRATCH_MAX_BYTES are used. Every running
+# download of every process reserves at least SCRATCH_RESERVE_BYTES.
+SCRATCH_DIR = config("SCRATCH_DIR", default="")
+SCRATCH_MAX_BYTES = config("SCRATCH_MAX_BYTES", default=1024 * 1024 * 1024, cast=int)
+SCRATCH_RESERVE_BYTES = config("SCRATCH_RESERVE_BYTES", default=64 * 1024 * 1024, cast=int)
+SCRATCH_WAIT_SECONDS = config("SCRATCH_WAIT_SECONDS", default=600, cast=float)
+
+# Pipeline metrics are served in the Prometheus text format at /internal/metrics/ to
+# requests carrying METRICS_TOKEN as Bearer token. Only with DEBUG and without a token,
+# requests from METRICS_ALLOWED_IPS are served instead.
+# With PIPELINE_TRACE_LOG every quiz creation logs its stage timings as one JSON line.
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+METRICS_ALLOWED_IPS = config("METRICS_ALLOWED_IPS", default="127.0.0.1,::1", cast=Csv())
+PIPELINE_TRACE_LOG = config("PIPELINE_TRACE_LOG", default=False, cast=bool)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -95,11 +195,80 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects the database: "sqlite" (default) or "postgres".
+# Connections are kept open for DB_CONN_MAX_AGE seconds and checked before they are reused.
+# With ASYNC_VIEWS the default is 0: under ASGI every request runs its queries on another
+# thread, and each of them would keep its own persistent connection open.
+DB_ENGINE = config("DB_ENGINE", default="sqlite")
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=0 if ASYNC_VIEWS else 60, cast=int)
+
+if DB_ENGINE == "sqlite":
+    # WAL lets readers continue while a quiz is written, and writers wait up to SQLITE_TIMEOUT
+    # seconds for each other instead of failing with "database is locked". Transactions take
+    # the write lock when they begin, so two transactions that read first cannot deadlock.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config("DB_NAME", default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': config("SQLITE_TIMEOUT", default=20, cast=float),
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f'PRAGMA mmap_size={config("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024, cast=int)};'
+                ),
+            },
+            # Tests use a file instead of the shared in-memory database, whose table locks fail
+            # immediately instead of waiting when the job and batch threads write concurrently.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
     }
+elif DB_ENGINE == "postgres":
+    # With DB_POOL every process keeps between DB_POOL_MIN_SIZE and DB_POOL_MAX_SIZE connections
+    # in a psycopg pool (pip install "psycopg[binary,pool]"); persistent connections are not
+    # used together with the pool.
+    DB_POOL = config("DB_POOL", default=False, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config("DB_NAME", default="quizly"),
+            'USER': config("DB_USER", default="quizly"),
+            'PASSWORD': config("DB_PASSWORD", default=""),
+            'HOST': config("DB_HOST", default="localhost"),
+            'PORT': config("DB_PORT", default=5432, cast=int),
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config("DB_POOL_MIN_SIZE", default=2, cast=int),
+                    'max_size': config("DB_POOL_MAX_SIZE", default=20, cast=int),
+                    'timeout': config("DB_POOL_TIMEOUT", default=10, cast=float),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'DB_ENGINE must be "sqlite" or "postgres", not "{DB_ENGINE}".')
+
+
+# The rendered JSON of every quiz is cached under its id, its updated_at and the version of its
+# questions in the "quizzes" cache, a local memory cache that drops the least recently used of
+# QUIZ_CACHE_MAX_ENTRIES quizzes.
+# QUIZ_CACHE_BACKEND can be any Django cache backend, e.g. FileBasedCache with a directory
+# or DatabaseCache with a table name (python manage.py createcachetable) as QUIZ_CACHE_LOCATION.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'quizzes': {
+        'BACKEND': config("QUIZ_CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': config("QUIZ_CACHE_LOCATION", default="quizzes"),
+        'TIMEOUT': config("QUIZ_CACHE_TIMEOUT", default=24 * 60 * 60, cast=int),
+        'OPTIONS': {'MAX_ENTRIES': config("QUIZ_CACHE_MAX_ENTRIES", default=10000, cast=int)},
+    },
 }
 
 
@@ -146,7 +315,6 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'user_auth_app.authentication.CookieJWTAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
 }
 
@@ -154,3 +322,21 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+# Number of access tokens whose user is kept in memory until the token expires.
+AUTH_TOKEN_CACHE_SIZE = config("AUTH_TOKEN_CACHE_SIZE", default=4096, cast=int)
+
+# Maximum number of passwords hashed at the same time during registration. The sync view
+# still waits for the hash in its thread; with ASYNC_VIEWS registration awaits it instead.
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "management_app.pipeline": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
@@ -17,10 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from management_app.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include([
         path('', include('user_auth_app.api.urls')),
         path('', include('management_app.api.urls'))
     ])),
+    path('internal/metrics/', metrics_view, name='metrics'),
 ]
@@ -1,6 +1,8 @@
 from django.contrib import admin
-from .models import Quiz, QuizQuestion
+from .models import Quiz, QuizContent, QuizQuestion, QuizJob
 
 # Register your models here.
 admin.site.register(Quiz)
-admin.site.register(QuizQuestion)
\ No newline at end of file
+admin.site.register(QuizContent)
+admin.site.register(QuizQuestion)
+admin.site.register(QuizJob)
\ No newline at end of file
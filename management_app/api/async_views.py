@@ -0,0 +1,297 @@
+import asyncio
+import json
+import time
+from contextlib import aclosing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from management_app.models import Quiz, QuizJob, QuizJobEvent
+from management_app.utils.quiz_jobs import enqueue_quiz_job
+from management_app.utils.quiz_streaming import stream_quiz_from_url_async
+from management_app.utils.video_id import extract_video_id
+from user_auth_app.api.views import parse_request_data
+from user_auth_app.authentication import authenticate_async
+from .conditional import conditional_get_async
+from .fieldsets import Fieldset
+from .pagination import QuizCursorPagination
+from .serializers import QuizJobSerializer, QuizSerializer, QuizSummarySerializer
+from .renderers import FastJSONRenderer
+from .response_cache import render_page, render_quizzes, with_question_version
+from .sse import format_event
+
+TERMINAL_STAGES = (QuizJob.STATUS_DONE, QuizJob.STATUS_FAILED)
+
+
+def not_authenticated():
+    # Same status as the DRF views, whose authentication sends no WWW-Authenticate challenge.
+    return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+
+def not_found(model):
+    return JsonResponse({'detail': f'No {model.__name__} matches the given query.'},
+                        status=status.HTTP_404_NOT_FOUND)
+
+
+def invalid_url():
+    return JsonResponse({'detail': 'Ungültige URL oder Anfragedaten'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def json_response(data):
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCreateQuizView(View):
+    """
+    Async variant of CreateQuizView.
+    """
+    http_method_names = ['post']
+
+    async def post(self, request):
+        """
+        Queues the creation of a new Quiz from a provided video URL.
+        The returned job can be polled until it contains the id of the created quiz.
+        """
+        user = await authenticate_async(request)
+        if user is None:
+            return not_authenticated()
+        data = parse_request_data(request)
+        url = data.get('url') if data else None
+        if not isinstance(url, str) or extract_video_id(url) is None:
+            return invalid_url()
+
+        job = await sync_to_async(enqueue_quiz_job)(url, user)
+        response = JsonResponse(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = reverse('quiz_job_detail', kwargs={'pk': job.pk})
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCreateQuizStreamView(View):
+    """
+    Async variant of CreateQuizStreamView. While Gemini writes the quiz or a job transcribes
+    the video, the open connection only costs a coroutine.
+    """
+    http_method_names = ['get', 'post']
+
+    async def get(self, request):
+        return await self.stream(request, request.GET.get('url'))
+
+    async def post(self, request):
+        data = parse_request_data(request)
+        return await self.stream(request, data.get('url') if data else None)
+
+    async def stream(self, request, url):
+        user = await authenticate_async(request)
+        if user is None:
+            return as_event_stream(request, not_authenticated())
+        if not isinstance(url, str) or extract_video_id(url) is None:
+            return as_event_stream(request, invalid_url())
+
+        response = StreamingHttpResponse(quiz_events(url, user), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+def as_event_stream(request, response):
+    """
+    Sends an error response as a single "error" event if the client asked for an event stream,
+    like EventStreamRenderer does for the DRF views.
+    """
+    if 'text/event-stream' not in request.headers.get('Accept', ''):
+        return response
+    return HttpResponse(format_event('error', json.loads(response.content)),
+                        status=response.status_code, content_type='text/event-stream')
+
+
+async def quiz_events(url: str, user):
+    try:
+        # aclosing ends the stream, and frees its Gemini slot, as soon as the response is closed.
+        async with aclosing(stream_quiz_from_url_async(url, user)) as events:
+            async for event, data in events:
+                yield format_event(event, data)
+    except Exception as e:
+        yield format_event('error', {'detail': str(e)})
+
+
+class AsyncQuizListView(View):
+    """
+    Async variant of QuizListView, with the same pagination, ?summary=true, ?fields= and conditional GET.
+    """
+    http_method_names = ['get']
+
+    async def get(self, request):
+        request.user = await authenticate_async(request)
+        if request.user is None:
+            return not_authenticated()
+        queryset = Quiz.objects.filter(user=request.user)
+        return await conditional_get_async(request, queryset, lambda: self.list(request, queryset),
+                                           send_last_modified=False)
+
+    async def list(self, request, queryset):
+        paginator = QuizCursorPagination()
+        try:
+            fieldset = Fieldset.from_query_params(request.GET)
+            summary = fieldset is None and request.GET.get('summary', '').lower() in ('1', 'true')
+            if fieldset is not None:
+                queryset = fieldset.queryset(queryset)
+            elif not summary:
+                queryset = with_question_version(queryset.select_related('content'))
+            # DRF's paginator evaluates the page synchronously.
+            page = await sync_to_async(paginator.paginate_queryset)(queryset, Request(request))
+        except APIException as e:
+            return JsonResponse({'detail': e.detail}, status=e.status_code)
+        if fieldset is not None or summary:
+            serializer = fieldset.serializer(page, many=True) if fieldset else QuizSummarySerializer(page, many=True)
+            return json_response({
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
+                # Sparse fieldsets read the prefetched questions while serializing.
+                'results': await sync_to_async(lambda: serializer.data)(),
+            })
+        body = render_page(paginator.get_next_link(), paginator.get_previous_link(),
+                           await sync_to_async(render_quizzes)(page))
+        return HttpResponse(body, content_type='application/json')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncQuizDetailView(View):
+    """
+    Async variant of QuizDetailView.
+    """
+    http_method_names = ['get', 'put', 'patch', 'delete']
+
+    async def get(self, request, pk):
+        request.user = await authenticate_async(request)
+        if request.user is None:
+            return not_authenticated()
+        return await conditional_get_async(
+            request, Quiz.objects.filter(user=request.user, pk=pk),
+            lambda: self.retrieve(request.user, pk, request.GET))
+
+    async def retrieve(self, user, pk, query_params=None):
+        try:
+            fieldset = Fieldset.from_query_params(query_params or {})
+        except APIException as e:
+            return JsonResponse({'detail': e.detail}, status=e.status_code)
+        if fieldset is not None:
+            quiz = await fieldset.queryset(Quiz.objects.filter(user=user)).filter(pk=pk).afirst()
+            if quiz is None:
+                return not_found(Quiz)
+            return json_response(await sync_to_async(lambda: fieldset.serializer(quiz).data)())
+        quiz = await get_quiz(user, pk)
+        if quiz is None:
+            return not_found(Quiz)
+        rendered = await sync_to_async(render_quizzes)([quiz])
+        return HttpResponse(rendered[0], content_type='application/json')
+
+    async def put(self, request, pk):
+        return await self.update(request, pk, partial=False)
+
+    async def patch(self, request, pk):
+        return await self.update(request, pk, partial=True)
+
+    async def update(self, request, pk, partial: bool):
+        """
+        Updates title and description, which every quiz owns even if its questions are shared.
+        """
+        user = await authenticate_async(request)
+        if user is None:
+            return not_authenticated()
+        quiz = await get_quiz(user, pk)
+        if quiz is None:
+            return not_found(Quiz)
+        data = parse_request_data(request)
+        if data is None:
+            return JsonResponse({'detail': 'Invalid request data'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = QuizSerializer(quiz, data=data, partial=partial)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        await sync_to_async(serializer.save)()
+        return await self.retrieve(user, pk)
+
+    async def delete(self, request, pk):
+        user = await authenticate_async(request)
+        if user is None:
+            return not_authenticated()
+        deleted, _ = await Quiz.objects.filter(user=user, pk=pk).adelete()
+        if not deleted:
+            return not_found(Quiz)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+async def get_quiz(user, pk):
+    """
+    Returns a quiz of the user, or None.
+    """
+    try:
+        return await with_question_version(Quiz.objects.filter(user=user).select_related('content')).aget(pk=pk)
+    except Quiz.DoesNotExist:
+        return None
+
+
+class QuizJobEventsView(View):
+    """
+    Streams the progress of a quiz job as server-sent events. The view is async, so under
+    ASGI (core/asgi.py) a waiting listener only costs a coroutine, not a worker thread.
+    """
+    http_method_names = ['get']
+
+    async def get(self, request, pk):
+        """
+        Sends every stage transition and progress update of the job, starting after the
+        Last-Event-ID header if the client reconnects, and ends with a done or failed event.
+        """
+        user = await authenticate_async(request)
+        if user is None:
+            return not_authenticated()
+        if not await QuizJob.objects.filter(pk=pk, user=user).aexists():
+            return not_found(QuizJob)
+
+        last_event_id = request.headers.get('Last-Event-ID', '')
+        response = StreamingHttpResponse(
+            job_events(pk, int(last_event_id) if last_event_id.isdigit() else 0),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+async def job_events(job_id: int, last_event_id: int = 0):
+    """
+    Polls the QuizJobEvents of a job and yields them as server-sent events until the job is finished.
+    """
+    last_sent = time.monotonic()
+    while True:
+        events = QuizJobEvent.objects.filter(job_id=job_id, id__gt=last_event_id).order_by('id')
+        async for event in events:
+            last_event_id = event.id
+            last_sent = time.monotonic()
+            if event.stage in TERMINAL_STAGES:
+                yield await _final_event(job_id, event.id)
+                return
+            yield format_event('progress', {'stage': event.stage, 'progress': event.progress}, event.id)
+
+        if time.monotonic() - last_sent >= settings.QUIZ_JOB_EVENTS_KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield ': keep-alive\n\n'
+        await asyncio.sleep(settings.QUIZ_JOB_EVENTS_POLL_SECONDS)
+
+
+async def _final_event(job_id: int, event_id: int) -> str:
+    job = await QuizJob.objects.aget(pk=job_id)
+    if job.status == QuizJob.STATUS_DONE:
+        return format_event('done', {'quiz_id': job.quiz_id}, event_id)
+    return format_event('failed', {'detail': job.error}, event_id)
@@ -0,0 +1,97 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+
+VALIDATOR_AGGREGATES = {
+    'quiz_count': Count('id', distinct=True),
+    'question_count': Count('questions'),
+    'quiz_updated': Max('updated_at'),
+    'question_updated': Max('questions__updated_at'),
+}
+
+
+def quiz_validators(queryset, *extra):
+    """
+    Computes an ETag and a Last-Modified timestamp for a set of quizzes with one aggregate query
+    over the updated_at fields and row counts of the quizzes and their questions.
+    """
+    return _validators(queryset.aggregate(**VALIDATOR_AGGREGATES), extra)
+
+
+async def quiz_validators_async(queryset, *extra):
+    """
+    Same as quiz_validators, with the async ORM.
+    """
+    return _validators(await queryset.aaggregate(**VALIDATOR_AGGREGATES), extra)
+
+
+def _validators(stats, extra):
+    timestamps = [stats['quiz_updated'], stats['question_updated']]
+    last_modified = max((timestamp for timestamp in timestamps if timestamp), default=None)
+
+    fingerprint = ':'.join(str(value) for value in (*extra, *stats.values()))
+    etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+    return etag, last_modified, stats['quiz_count']
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified if the client already has the current
+    version of the quizzes, without loading or serializing them. Views listing several quizzes
+    set send_last_modified to False: deleting a quiz does not move the newest updated_at,
+    so only the ETag, which includes the row counts, notices it.
+    """
+    send_last_modified = True
+
+    def get_validator_queryset(self):
+        return self.get_queryset()
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified, quiz_count = quiz_validators(
+            self.get_validator_queryset(), request.user.pk, request.get_full_path())
+        if not quiz_count:
+            return super().get(request, *args, **kwargs)
+        last_modified_timestamp = _timestamp(last_modified) if self.send_last_modified else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return add_validators(response, etag, last_modified_timestamp)
+
+
+async def conditional_get_async(request, validator_queryset, get_response, send_last_modified=True):
+    """
+    Does the same as ConditionalGetMixin for async views. get_response is a coroutine
+    function building the full response; it is only awaited if the client's version is outdated.
+    """
+    etag, last_modified, quiz_count = await quiz_validators_async(
+        validator_queryset, request.user.pk, request.get_full_path())
+    if not quiz_count:
+        return await get_response()
+    last_modified_timestamp = _timestamp(last_modified) if send_last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_timestamp)
+    if response is None:
+        response = await get_response()
+    return add_validators(response, etag, last_modified_timestamp)
+
+
+def _timestamp(last_modified):
+    return timegm(last_modified.utctimetuple()) if last_modified else None
+
+
+def add_validators(response, etag: str, last_modified_timestamp):
+    """
+    Sets the ETag and Last-Modified headers on successful responses and makes clients revalidate them.
+    """
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified_timestamp:
+            response['Last-Modified'] = http_date(last_modified_timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,95 @@
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+from management_app.models import QuizContent, QuizQuestion
+from .serializers import QuizQuestionSerializer, QuizSerializer
+
+QUIZ_FIELDS = [name for name in QuizSerializer.Meta.fields if name != 'questions']
+QUESTION_FIELDS = QuizQuestionSerializer.Meta.fields
+
+
+class Fieldset:
+    """
+    The fields of a quiz response chosen with ?fields= and ?expand=questions. Only these
+    columns are loaded and serialized; the id of a quiz is always included.
+    """
+
+    def __init__(self, quiz_fields, question_fields=None):
+        self.quiz_fields = quiz_fields
+        # None leaves out the questions.
+        self.question_fields = question_fields
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        """
+        Returns the fieldset of e.g. ?fields=title,questions.question_title or ?fields=title&expand=questions,
+        or None without ?fields= for the complete quiz.
+        """
+        if 'fields' not in query_params:
+            return None
+        requested = _names(query_params['fields'])
+        expand = _names(query_params.get('expand', ''))
+        question_fields = [name.removeprefix('questions.') for name in requested if name.startswith('questions.')]
+        quiz_fields = [name for name in requested if not name.startswith('questions.') and name != 'questions']
+
+        unknown = ([name for name in quiz_fields if name not in QUIZ_FIELDS]
+                   + [f'questions.{name}' for name in question_fields if name not in QUESTION_FIELDS]
+                   + [name for name in expand if name != 'questions'])
+        if unknown:
+            raise ValidationError({'fields': f'Unbekannte Felder: {", ".join(unknown)}'})
+
+        quiz_fields = [name for name in QUIZ_FIELDS if name == 'id' or name in quiz_fields]
+        if question_fields:
+            question_fields = [name for name in QUESTION_FIELDS if name in question_fields]
+        elif 'questions' in expand or 'questions' in requested:
+            question_fields = list(QUESTION_FIELDS)
+        else:
+            question_fields = None
+        return cls(quiz_fields, question_fields)
+
+    def queryset(self, queryset):
+        """
+        Restricts a queryset of quizzes to the columns of the fieldset and created_at for the cursor,
+        and prefetches only the chosen columns of their own or shared questions.
+        """
+        queryset = queryset.select_related(None).only(*self.quiz_fields, 'created_at')
+        if self.question_fields is None:
+            return queryset
+        # The foreign keys match the questions to their quiz or content.
+        questions = QuizQuestion.objects.only(*self.question_fields, 'quiz', 'content')
+        return queryset.only(*self.quiz_fields, 'created_at', 'content').prefetch_related(
+            Prefetch('questions', queryset=questions),
+            Prefetch('content', queryset=QuizContent.objects.only('id')),
+            Prefetch('content__questions', queryset=questions),
+        )
+
+    def serializer(self, instance, **kwargs):
+        """
+        Returns a QuizSerializer limited to the fieldset.
+        """
+        fields = self.quiz_fields if self.question_fields is None else [*self.quiz_fields, 'questions']
+        return QuizSerializer(instance, fields=fields, question_fields=self.question_fields, **kwargs)
+
+
+class FieldsetMixin:
+    """
+    Serves GET requests with ?fields= from a sparse queryset and serializer, see Fieldset.
+    """
+
+    def get_fieldset(self):
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = Fieldset.from_query_params(self.request.query_params)
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return super().get_serializer(*args, **kwargs)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return fieldset.serializer(*args, **kwargs)
+
+
+def _names(value: str) -> list:
+    return [name.strip() for name in value.split(',') if name.strip()]
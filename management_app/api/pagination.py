@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class QuizCursorPagination(CursorPagination):
+    """
+    Pages through quizzes newest first. The cursor is based on (created_at, id), which is
+    covered by the (user, created_at, id) index of Quiz, so every page is a single index range scan.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,97 @@
+import json
+import threading
+
+from django.core.cache import caches
+from django.db.models import DateTimeField, F, Func, IntegerField, OuterRef, Q, Subquery, prefetch_related_objects
+
+from management_app.models import Quiz, QuizQuestion
+from .renderers import FastJSONRenderer
+from .serializers import QuizSerializer
+
+CACHE_ALIAS = 'quizzes'
+
+_counters = {'hits': 0, 'misses': 0}
+_counters_lock = threading.Lock()
+
+
+def with_question_version(queryset):
+    """
+    Annotates every quiz with the number and the latest updated_at of the questions it shows,
+    its own or those of its shared content, with two subqueries.
+    """
+    questions = QuizQuestion.objects.filter(
+        Q(quiz=OuterRef('pk')) | Q(content=OuterRef('content_id'))).order_by()
+    return queryset.annotate(
+        question_count=Subquery(questions.values(count=Func(F('id'), function='COUNT')),
+                                output_field=IntegerField()),
+        questions_updated=Subquery(questions.values(latest=Func(F('updated_at'), function='MAX')),
+                                   output_field=DateTimeField()),
+    )
+
+
+def cache_key(quiz) -> str:
+    """
+    Returns the key of a rendered quiz. Saving the quiz or adding, changing or deleting one of its
+    questions changes the key, in every process, so an outdated version is never served; it just
+    ages out of the cache. The quiz needs the annotations of with_question_version.
+    """
+    questions_updated = quiz.questions_updated.isoformat() if quiz.questions_updated else ''
+    return f'quiz:{quiz.pk}:{quiz.updated_at.isoformat()}:{quiz.question_count}:{questions_updated}'
+
+
+def render_quizzes(quizzes) -> list:
+    """
+    Returns the JSON of every quiz as rendered by QuizSerializer, taken from the cache where
+    possible. The questions of the other quizzes are loaded with two queries, rendered and cached.
+    Quizzes not loaded through with_question_version cost one more query.
+    """
+    _add_question_versions(quizzes)
+    cache = caches[CACHE_ALIAS]
+    keys = [cache_key(quiz) for quiz in quizzes]
+    rendered = cache.get_many(keys)
+
+    missing = [quiz for quiz, key in zip(quizzes, keys) if key not in rendered]
+    _record(hits=len(quizzes) - len(missing), misses=len(missing))
+    if missing:
+        prefetch_related_objects(missing, 'questions', 'content__questions')
+        renderer = FastJSONRenderer()
+        new = {cache_key(quiz): renderer.render(QuizSerializer(quiz).data) for quiz in missing}
+        cache.set_many(new)
+        rendered.update(new)
+    return [rendered[key] for key in keys]
+
+
+def render_page(next_link, previous_link, rendered_quizzes) -> bytes:
+    """
+    Joins rendered quizzes into the body of a cursor-paginated list response.
+    """
+    links = json.dumps({'next': next_link, 'previous': previous_link}, separators=(',', ':')).encode()
+    return links[:-1] + b',"results":[' + b','.join(rendered_quizzes) + b']}'
+
+
+def _add_question_versions(quizzes):
+    unversioned = {quiz.pk: quiz for quiz in quizzes if not hasattr(quiz, 'question_count')}
+    if not unversioned:
+        return
+    versions = with_question_version(Quiz.objects.filter(pk__in=unversioned)).values_list(
+        'pk', 'question_count', 'questions_updated')
+    for pk, question_count, questions_updated in versions:
+        unversioned[pk].question_count = question_count
+        unversioned[pk].questions_updated = questions_updated
+
+
+def _record(**values):
+    with _counters_lock:
+        for name, value in values.items():
+            _counters[name] += value
+
+
+def cache_stats():
+    """
+    Returns the hit and miss counters of this process and the hit rate.
+    """
+    with _counters_lock:
+        stats = dict(_counters)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
@@ -1,9 +1,21 @@
 from rest_framework import serializers
 
-from management_app.models import Quiz, QuizQuestion
+from management_app.models import Quiz, QuizBatch, QuizQuestion, QuizJob
 
 
-class QuizQuestionSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Takes an optional `fields` argument with the names of the fields to keep, e.g. for ?fields=.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class QuizQuestionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = QuizQuestion
         fields = [
@@ -11,15 +23,24 @@ class QuizQuestionSerializer(serializers.ModelSerializer):
         ]
 
 
-class QuizSerializer(serializers.ModelSerializer):
-    questions = QuizQuestionSerializer(many=True, read_only=True)
+class QuizSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    questions = QuizQuestionSerializer(source='question_list', many=True, read_only=True)
 
     class Meta:
         model = Quiz
         fields = ['id', 'title', 'description', 'created_at',
-                  'updated_at', 'video_url', 'questions']
+                  'updated_at', 'video_url', 'video_id', 'questions']
         read_only_fields = ['id', 'created_at',
-                            'updated_at', 'questions', 'video_url']
+                            'updated_at', 'questions', 'video_url', 'video_id']
+
+    def __init__(self, *args, question_fields=None, **kwargs):
+        """
+        Also takes the names of the question fields to keep in `question_fields`.
+        """
+        super().__init__(*args, **kwargs)
+        if question_fields is not None and 'questions' in self.fields:
+            self.fields['questions'] = QuizQuestionSerializer(
+                source='question_list', many=True, read_only=True, fields=question_fields)
 
     def get_questions(self, obj):
         """
@@ -29,3 +50,37 @@ class QuizSerializer(serializers.ModelSerializer):
         if obj.questions:
             return [QuizQuestionSerializer(obj.questions).data]
         return []
+
+
+class QuizSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Quiz
+        fields = ['id', 'title', 'description', 'created_at', 'updated_at', 'video_url', 'video_id']
+        read_only_fields = fields
+
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizJob
+        fields = ['id', 'status', 'stage', 'progress', 'error', 'quiz',
+                  'video_url', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class QuizBatchSerializer(serializers.ModelSerializer):
+    items = QuizJobSerializer(source='jobs', many=True, read_only=True)
+    summary = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizBatch
+        fields = ['id', 'created_at', 'summary', 'items']
+        read_only_fields = fields
+
+    def get_summary(self, batch):
+        """
+        Returns the number of jobs of the batch per status.
+        """
+        summary = {status: 0 for status, _ in QuizJob.STATUS_CHOICES}
+        for job in batch.jobs.all():
+            summary[job.status] += 1
+        return summary
@@ -0,0 +1,28 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def format_event(event: str, data, event_id=None) -> str:
+    """
+    Formats one server-sent event with JSON data.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False))
+    return '\n'.join(lines) + '\n\n'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF negotiate text/event-stream. Regular responses, e.g. validation errors,
+    are sent as a single "error" event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data).encode(self.charset)
@@ -1,9 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import CreateQuizView, QuizListView, QuizDetailView
+from .async_views import (
+    AsyncCreateQuizStreamView, AsyncCreateQuizView, AsyncQuizDetailView, AsyncQuizListView, QuizJobEventsView,
+)
+from .views import (
+    CreateQuizView, CreateQuizBatchView, CreateQuizStreamView, QuizListView, QuizDetailView, QuizJobDetailView,
+    QuizBatchDetailView,
+)
+
+if settings.ASYNC_VIEWS:
+    CreateQuizView, CreateQuizStreamView = AsyncCreateQuizView, AsyncCreateQuizStreamView
+    QuizListView, QuizDetailView = AsyncQuizListView, AsyncQuizDetailView
 
 urlpatterns = [
     path('createQuiz/', CreateQuizView.as_view(), name='create_quiz'),
+    path('createQuiz/batch/', CreateQuizBatchView.as_view(), name='create_quiz_batch'),
+    path('createQuiz/stream/', CreateQuizStreamView.as_view(), name='create_quiz_stream'),
     path('quizzes/', QuizListView.as_view(), name='quiz_list'),
-    path('quizzes/<int:pk>/', QuizDetailView.as_view(), name='quiz_detail')
+    path('quizzes/<int:pk>/', QuizDetailView.as_view(), name='quiz_detail'),
+    path('jobs/<int:pk>/', QuizJobDetailView.as_view(), name='quiz_job_detail'),
+    path('jobs/<int:pk>/events/', QuizJobEventsView.as_view(), name='quiz_job_events'),
+    path('batches/<int:pk>/', QuizBatchDetailView.as_view(), name='quiz_batch_detail'),
 ]
@@ -1,48 +1,213 @@
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.generics import RetrieveUpdateDestroyAPIView, ListAPIView, CreateAPIView
+from rest_framework.generics import RetrieveUpdateDestroyAPIView, ListAPIView, CreateAPIView, RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.views import APIView
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 
-from management_app.models import Quiz
-from management_app.utils.youtube_quiz_creator import create_quiz_from_url
-from .serializers import QuizSerializer
+from management_app.models import Quiz, QuizBatch, QuizJob
+from management_app.utils.quiz_batches import enqueue_quiz_batch
+from management_app.utils.quiz_jobs import enqueue_quiz_job
+from management_app.utils.quiz_streaming import stream_quiz_from_url
+from management_app.utils.video_id import extract_video_id
+from .conditional import ConditionalGetMixin
+from .fieldsets import FieldsetMixin
+from .pagination import QuizCursorPagination
+from .renderers import FastJSONRenderer, RenderedJSON
+from .response_cache import render_page, render_quizzes, with_question_version
+from .sse import EventStreamRenderer, format_event
+from .serializers import QuizSerializer, QuizSummarySerializer, QuizJobSerializer, QuizBatchSerializer
 
 
 class CreateQuizView(CreateAPIView):
     permission_classes = [IsAuthenticated]
-    serializer_class = QuizSerializer
+    serializer_class = QuizJobSerializer
 
     def create(self, request, *args, **kwargs):
         """
-        Creates a new Quiz from a provided video URL.
+        Queues the creation of a new Quiz from a provided video URL.
+        The returned job can be polled until it contains the id of the created quiz.
         """
 
         url = request.data.get('url')
-        if not url:
+        if not isinstance(url, str) or extract_video_id(url) is None:
             return Response({'detail': 'Ungültige URL oder Anfragedaten'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            quiz = create_quiz_from_url(url, request.user)
-        except RuntimeError as e:
-            return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        serializer = QuizSerializer(quiz)
+        job = enqueue_quiz_job(url, request.user)
+        serializer = QuizJobSerializer(job)
+        status_url = reverse('quiz_job_detail', kwargs={'pk': job.pk})
 
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
 
 
-class QuizListView(ListAPIView):
+class CreateQuizBatchView(CreateAPIView):
     permission_classes = [IsAuthenticated]
-    serializer_class = QuizSerializer
-    queryset = Quiz.objects.all()
+    serializer_class = QuizBatchSerializer
+
+    def create(self, request, *args, **kwargs):
+        """
+        Queues the creation of one Quiz per video URL in "urls", e.g. the videos of a playlist.
+        Invalid and repeated URLs are returned as "rejected", all others as jobs of the batch.
+        """
+        urls = request.data.get('urls')
+        if not isinstance(urls, list) or not 0 < len(urls) <= settings.QUIZ_BATCH_MAX_URLS:
+            return Response({'detail': 'Ungültige URL oder Anfragedaten'}, status=status.HTTP_400_BAD_REQUEST)
 
+        accepted, rejected, video_ids = [], [], set()
+        for url in urls:
+            video_id = extract_video_id(url) if isinstance(url, str) else None
+            if video_id is None:
+                rejected.append({'url': url, 'detail': 'Ungültige URL'})
+            elif video_id in video_ids:
+                rejected.append({'url': url, 'detail': 'Doppelte URL'})
+            else:
+                video_ids.add(video_id)
+                accepted.append(url)
+        if not accepted:
+            return Response({'detail': 'Ungültige URL oder Anfragedaten', 'rejected': rejected},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-class QuizDetailView(RetrieveUpdateDestroyAPIView):
+        batch = enqueue_quiz_batch(accepted, request.user)
+        data = QuizBatchSerializer(batch).data
+        data['rejected'] = rejected
+        status_url = reverse('quiz_batch_detail', kwargs={'pk': batch.pk})
+
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
+
+
+class CreateQuizStreamView(APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Creates a new Quiz from the video URL in the query string and streams the progress,
+        the title, the description and every question as server-sent events.
+        """
+        return self.stream(request, request.query_params.get('url'))
+
+    def post(self, request, *args, **kwargs):
+        """
+        Same as GET, with the video URL in the request body.
+        """
+        return self.stream(request, request.data.get('url'))
+
+    def stream(self, request, url):
+        if not isinstance(url, str) or extract_video_id(url) is None:
+            return Response({'detail': 'Ungültige URL oder Anfragedaten'}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            self.generate_events(url, request.user), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def generate_events(self, url, user):
+        try:
+            for event, data in stream_quiz_from_url(url, user):
+                yield format_event(event, data)
+        except Exception as e:
+            yield format_event('error', {'detail': str(e)})
+
+
+class QuizListView(FieldsetMixin, ConditionalGetMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = QuizSerializer
+    pagination_class = QuizCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    send_last_modified = False
+
+    def is_summary(self):
+        """
+        Returns whether only a summary is requested with ?summary=true; ?fields= takes precedence.
+        """
+        return (self.get_fieldset() is None
+                and self.request.query_params.get('summary', '').lower() in ('1', 'true'))
 
     def get_queryset(self):
         """
-        Returns quizzes belonging to the authenticated user.
+        Returns quizzes belonging to the authenticated user. Their questions are only
+        loaded for quizzes missing in the response cache, see list().
         """
+        queryset = Quiz.objects.filter(user=self.request.user)
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            return fieldset.queryset(queryset)
+        if self.is_summary():
+            return queryset
+        return with_question_version(queryset.select_related('content'))
+
+    def get_validator_queryset(self):
         return Quiz.objects.filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        """
+        Leaves out the questions if the request contains ?summary=true.
+        """
+        if self.is_summary():
+            return QuizSummarySerializer
+        return QuizSerializer
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the page of quizzes with the rendered JSON of each quiz from the response cache.
+        """
+        if self.is_summary() or self.get_fieldset() is not None:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(self.get_queryset())
+        body = render_page(self.paginator.get_next_link(), self.paginator.get_previous_link(), render_quizzes(page))
+        return Response(RenderedJSON(body))
+
+
+class QuizDetailView(FieldsetMixin, ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get_queryset(self):
+        """
+        Returns quizzes belonging to the authenticated user, restricted to the fields of ?fields=.
+        """
+        queryset = Quiz.objects.filter(user=self.request.user)
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            return fieldset.queryset(queryset)
+        return with_question_version(queryset.select_related('content'))
+
+    def get_validator_queryset(self):
+        return Quiz.objects.filter(user=self.request.user, pk=self.kwargs['pk'])
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the rendered JSON of the quiz from the response cache.
+        """
+        if self.get_fieldset() is not None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(RenderedJSON(render_quizzes([self.get_object()])[0]))
+
+
+class QuizJobDetailView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizJobSerializer
+
+    def get_queryset(self):
+        """
+        Returns quiz jobs belonging to the authenticated user.
+        """
+        return QuizJob.objects.filter(user=self.request.user)
+
+
+class QuizBatchDetailView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizBatchSerializer
+
+    def get_queryset(self):
+        """
+        Returns batches of the authenticated user with their jobs in the order of the request.
+        """
+        return QuizBatch.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('jobs', queryset=QuizJob.objects.order_by('id')))
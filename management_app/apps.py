@@ -1,6 +1,25 @@
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ManagementAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'management_app'
+
+    def ready(self):
+        """
+        Starts the quiz job workers and the batch pipeline if QUIZ_JOB_AUTOSTART is enabled
+        and starts loading the Whisper model in the background if WHISPER_PRELOAD is enabled.
+        """
+        if settings.QUIZ_JOB_AUTOSTART:
+            # The workers re-queue interrupted jobs first, which must not run during app loading.
+            from management_app.utils.quiz_batches import start_batch_pipeline
+            from management_app.utils.quiz_jobs import start_workers
+            threading.Thread(target=start_workers, name='quiz-job-start', daemon=True).start()
+            threading.Thread(target=start_batch_pipeline, name='quiz-batch-start', daemon=True).start()
+
+        if settings.WHISPER_PRELOAD:
+            from management_app.utils.whisper_models import preload_models
+            threading.Thread(target=preload_models, name='whisper-preload', daemon=True).start()
@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import shutil
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+from management_app.utils.chunked_transcription import SAMPLE_RATE
+
+
+def write_test_tone(path: str, seconds: float):
+    """
+    Writes a 16 kHz mono WAV file with a quiet tone that is interrupted by a pause every few seconds.
+    """
+    samples = np.arange(int(seconds * SAMPLE_RATE))
+    tone = 0.2 * np.sin(2 * np.pi * 220 * samples / SAMPLE_RATE)
+    tone[(samples // SAMPLE_RATE) % 5 == 4] = 0
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((tone * 32767).astype(np.int16).tobytes())
+    return path
+
+
+def is_whisper_wav(path: str) -> bool:
+    """
+    Returns whether a file is a 16 kHz mono 16 bit WAV file that can be decoded without ffmpeg.
+    """
+    try:
+        with wave.open(path, 'rb') as wav:
+            return (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, SAMPLE_RATE)
+    except (wave.Error, EOFError):
+        return False
+
+
+def decode_wav(path: str):
+    """
+    Decodes a 16 kHz mono WAV file into the float32 samples Whisper works on.
+    """
+    with wave.open(path, 'rb') as wav:
+        frames = wav.readframes(wav.getnframes())
+    return np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+
+
+class LocalAudioSource:
+    """
+    Stands in for the yt_dlp module: every "download" copies a local audio file
+    to the requested output template and reports progress like yt-dlp does.
+    """
+
+    def __init__(self, audio_file: str):
+        self.audio_file = audio_file
+        self.extension = os.path.splitext(audio_file)[1].lstrip('.') or 'audio'
+
+    def YoutubeDL(self, options):
+        return _LocalDownloader(self, options)
+
+
+class _LocalDownloader:
+    def __init__(self, source: LocalAudioSource, options: dict):
+        self.source = source
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=True):
+        filepath = self.options['outtmpl'].replace('%(ext)s', self.source.extension)
+        shutil.copyfile(self.source.audio_file, filepath)
+        size = os.path.getsize(filepath)
+        for hook in self.options.get('progress_hooks', []):
+            hook({'status': 'downloading', 'downloaded_bytes': size, 'total_bytes': size})
+        return {'requested_downloads': [{'filepath': filepath}]}
+
+
+class StubWhisperModel:
+    """
+    Stands in for a loaded Whisper model: it takes realtime_factor seconds per second
+    of audio and returns a fixed transcript.
+    """
+
+    def __init__(self, realtime_factor: float = 0.0, transcript: str = None):
+        self.name = 'stub'
+        self.realtime_factor = realtime_factor
+        self.transcript = transcript or 'This is a transcript of the benchmark video. ' * 50
+
+    def transcribe(self, audio, progress=None, **kwargs):
+        time.sleep(len(audio) / SAMPLE_RATE * self.realtime_factor)
+        if progress:
+            progress(1)
+        return {'text': self.transcript}
+
+
+class CannedGemini:
+    """
+    Stands in for gemini_client.generate_content: it answers every prompt with the same
+    quiz after latency seconds, varied by up to jitter seconds.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, questions: int = 10):
+        self.latency = latency
+        self.jitter = jitter
+        self.text = '```json\n' + json.dumps(canned_quiz(questions)) + '\n```'
+
+    def generate_content(self, contents, model: str = None):
+        time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+        return SimpleNamespace(text=self.text)
+
+
+def canned_quiz(questions: int = 10) -> dict:
+    return {
+        'title': 'Benchmark Quiz',
+        'description': 'A quiz generated by the offline benchmark.',
+        'questions': [
+            {
+                'question_title': f'Benchmark question {number}?',
+                'question_options': ['Option A', 'Option B', 'Option C', 'Option D'],
+                'answer': 'Option A',
+            }
+            for number in range(1, questions + 1)
+        ],
+    }
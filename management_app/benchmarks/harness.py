@@ -0,0 +1,174 @@
+import math
+import os
+import platform
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import override_settings
+
+from management_app.benchmarks.fakes import decode_wav, is_whisper_wav
+from management_app.utils import gemini_client, youtube_quiz_creator
+from management_app.utils.pipeline_metrics import observe_spans
+from management_app.utils.whisper_models import current_rss_bytes
+
+
+def percentile(values, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values, e.g. fraction 0.95 for p95.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def resident_bytes() -> int:
+    """
+    Returns the current resident set size of this process, or the peak where it cannot be read.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return current_rss_bytes()
+
+
+class StageRecorder:
+    """
+    Collects the duration of every stage span and the resident memory right after it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.errors = {}
+        self.rss = {}
+        self.failures = {}
+
+    def __call__(self, stage, outcome, duration, attributes):
+        rss = resident_bytes()
+        with self.lock:
+            self.record(stage, outcome, duration)
+            self.rss[stage] = max(self.rss.get(stage, 0), rss)
+
+    def record(self, stage, outcome, duration):
+        if outcome == 'success':
+            self.durations.setdefault(stage, []).append(duration)
+        else:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        stages = {}
+        for stage in sorted(set(self.durations) | set(self.errors)):
+            durations = self.durations.get(stage, [])
+            stages[stage] = {
+                'count': len(durations),
+                'errors': self.errors.get(stage, 0),
+                'throughput_per_second': len(durations) / wall_seconds if wall_seconds else 0.0,
+                'mean_seconds': sum(durations) / len(durations) if durations else 0.0,
+                'p50_seconds': percentile(durations, 0.50),
+                'p95_seconds': percentile(durations, 0.95),
+                'p99_seconds': percentile(durations, 0.99),
+                'peak_rss_bytes': self.rss.get(stage, 0),
+            }
+        return stages
+
+
+@contextmanager
+def pipeline_fakes(audio_source=None, whisper_model=None, gemini=None):
+    """
+    Replaces yt-dlp, the Whisper model and Gemini in the quiz pipeline with the given stand-ins.
+    Stand-ins that are None keep the real implementation.
+    """
+    with ExitStack() as stack:
+        if audio_source is not None:
+            stack.enter_context(mock.patch.object(youtube_quiz_creator, 'yt_dlp', audio_source))
+            if is_whisper_wav(audio_source.audio_file):
+                stack.enter_context(mock.patch.object(youtube_quiz_creator, 'decode_audio', decode_wav))
+        if whisper_model is not None:
+            stack.enter_context(mock.patch.object(youtube_quiz_creator, 'get_model', lambda: whisper_model))
+        if gemini is not None:
+            stack.enter_context(mock.patch.object(gemini_client, 'generate_content', gemini.generate_content))
+        yield
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Runs the benchmark against a fresh test database, so the real one stays untouched.
+    SQLite uses a temporary file instead of the in-memory database to allow concurrent connections.
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    test_name = test_settings.get('NAME')
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=False)
+            test_settings['NAME'] = test_name
+
+
+def run_benchmark(requests: int, concurrency: int, audio_source=None, whisper_model=None, gemini=None) -> dict:
+    """
+    Creates `requests` quizzes for distinct videos with `concurrency` threads through
+    create_quiz_from_url and returns throughput, latency percentiles and peak memory per stage.
+    """
+    user, _ = User.objects.get_or_create(username='benchmark')
+    recorder = StageRecorder()
+
+    def create_quiz(number):
+        started = time.perf_counter()
+        outcome = 'success'
+        try:
+            youtube_quiz_creator.create_quiz_from_url(f'https://youtu.be/{number:011d}', user)
+        except Exception as e:
+            outcome = 'error'
+            with recorder.lock:
+                recorder.failures[str(e)] = recorder.failures.get(str(e), 0) + 1
+        finally:
+            connection.close()
+        with recorder.lock:
+            recorder.record('pipeline', outcome, time.perf_counter() - started)
+            recorder.rss['pipeline'] = max(recorder.rss.get('pipeline', 0), resident_bytes())
+
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            override_settings(QUIZLY_CACHE_DIR=cache_dir, WHISPER_PROCESSES=1), \
+            pipeline_fakes(audio_source, whisper_model, gemini), observe_spans(recorder):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(create_quiz, range(requests)))
+        wall_seconds = time.perf_counter() - started
+
+    stages = recorder.summary(wall_seconds)
+    pipeline = stages.pop('pipeline', {})
+    return {
+        'config': {
+            'requests': requests,
+            'concurrency': concurrency,
+            'audio_source': getattr(audio_source, 'audio_file', 'yt-dlp'),
+            'whisper_model': getattr(whisper_model, 'name', settings.WHISPER_MODEL),
+            'gemini_latency_seconds': getattr(gemini, 'latency', None),
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'database': connection.vendor,
+        },
+        'wall_seconds': wall_seconds,
+        'throughput_per_second': pipeline.get('count', 0) / wall_seconds if wall_seconds else 0.0,
+        'pipeline': pipeline,
+        'stages': stages,
+        'failures': recorder.failures,
+        'peak_rss_bytes': current_rss_bytes(),
+    }
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from management_app.benchmarks.harness import percentile
+
+
+async def run_load_test(url: str, requests: int, connections: int, method: str = 'GET', headers=None,
+                        body=None, timeout: float = 60, transport=None):
+    """
+    Sends `requests` requests to a running server over `connections` concurrent connections and
+    returns throughput, latency percentiles and the peak number of requests in flight. Waiting
+    for responses costs one coroutine per connection, so thousands of connections are cheap here
+    and the result shows how many of them the server keeps busy at the same time.
+    """
+    latencies = []
+    statuses = Counter()
+    failures = Counter()
+    in_flight = peak_in_flight = 0
+    remaining = requests
+
+    async def connection(client):
+        nonlocal in_flight, peak_in_flight, remaining
+        while remaining > 0:
+            remaining -= 1
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, json=body)
+                await response.aread()
+            except httpx.HTTPError as e:
+                failures[type(e).__name__] += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+            finally:
+                in_flight -= 1
+
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(connection(client) for _ in range(min(connections, requests))))
+        wall_seconds = time.perf_counter() - started
+
+    errors = sum(failures.values()) + sum(count for status, count in statuses.items() if status >= 500)
+    return {
+        'config': {'url': url, 'method': method, 'requests': requests, 'connections': connections},
+        'wall_seconds': wall_seconds,
+        'throughput_per_second': len(latencies) / wall_seconds if wall_seconds else 0.0,
+        'count': len(latencies),
+        'errors': errors,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'failures': dict(failures),
+        'peak_in_flight': peak_in_flight,
+        'p50_seconds': percentile(latencies, 0.50),
+        'p95_seconds': percentile(latencies, 0.95),
+        'p99_seconds': percentile(latencies, 0.99),
+    }
@@ -0,0 +1,66 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from management_app.api.fieldsets import Fieldset
+from management_app.api.renderers import FastJSONRenderer
+from management_app.api.serializers import QuizSerializer
+from management_app.benchmarks.harness import percentile
+from management_app.models import Quiz, QuizQuestion
+
+# Name, query parameters and renderer of every measured response. "full" is the response before
+# sparse fieldsets and orjson; the response cache is left out to measure the work of a cache miss.
+VARIANTS = [
+    ('full', {}, JSONRenderer),
+    ('full_fast_renderer', {}, FastJSONRenderer),
+    ('titles', {'fields': 'title'}, FastJSONRenderer),
+    ('question_titles', {'fields': 'title,questions.question_title'}, FastJSONRenderer),
+]
+
+
+def create_quizzes(quizzes: int, questions: int):
+    """
+    Creates a user with `quizzes` quizzes of `questions` questions each and returns the user.
+    """
+    user, _ = User.objects.get_or_create(username='benchmark')
+    with transaction.atomic():
+        for number in range(quizzes):
+            quiz = Quiz.objects.create(
+                title=f'Quiz {number}', description='A quiz about the video. ' * 10, user=user,
+                video_url=f'https://youtu.be/{number:011d}', video_id=f'{number:011d}')
+            QuizQuestion.objects.bulk_create(
+                QuizQuestion(question_title=f'Question {index} of quiz {number}?',
+                             question_options=[f'Option {option} of question {index}' for option in 'ABCD'],
+                             answer=f'Option A of question {index}', quiz=quiz)
+                for index in range(questions))
+    return user
+
+
+def run_response_benchmark(user, page_size: int = 20, repeat: int = 50) -> dict:
+    """
+    Loads, serializes and renders a page of the user's quizzes `repeat` times per variant and
+    returns the response size and the CPU time per response.
+    """
+    results = {}
+    for name, query_params, renderer_class in VARIANTS:
+        fieldset = Fieldset.from_query_params(query_params)
+        cpu_seconds = []
+        size = 0
+        for _ in range(repeat):
+            started = time.process_time()
+            queryset = Quiz.objects.filter(user=user).order_by('-created_at', '-id')
+            if fieldset is None:
+                page = list(queryset.prefetch_related('questions', 'content__questions')[:page_size])
+                data = QuizSerializer(page, many=True).data
+            else:
+                data = fieldset.serializer(list(fieldset.queryset(queryset)[:page_size]), many=True).data
+            size = len(renderer_class().render({'next': None, 'previous': None, 'results': data}))
+            cpu_seconds.append(time.process_time() - started)
+        results[name] = {
+            'bytes': size,
+            'cpu_seconds_mean': sum(cpu_seconds) / len(cpu_seconds),
+            'cpu_seconds_p95': percentile(cpu_seconds, 0.95),
+        }
+    return {'config': {'page_size': page_size, 'repeat': repeat}, 'variants': results}
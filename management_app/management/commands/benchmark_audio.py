@@ -0,0 +1,99 @@
+import json
+import resource
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from management_app.utils.chunked_transcription import SAMPLE_RATE
+from management_app.utils.whisper_models import get_model
+from management_app.utils.scratch_space import scratch_area
+from management_app.utils.youtube_quiz_creator import decode_audio, download_audio_from_video
+
+AUDIO_FORMATS = ['mp3', 'native']
+DISK_POLL_SECONDS = 0.05
+
+
+def cpu_seconds() -> float:
+    """
+    Returns the CPU time used by this process and its finished child processes (ffmpeg).
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+class PeakDiskUsage:
+    """
+    Samples the size of a scratch area in a background thread and keeps the largest one,
+    e.g. while the MP3 path holds the downloaded stream and the converted file at once.
+    """
+
+    def __init__(self, scratch):
+        self.scratch = scratch
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            self.peak_bytes = max(self.peak_bytes, self.scratch.size())
+            if self._stop.wait(DISK_POLL_SECONDS):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self.scratch.size())
+        return False
+
+
+class Command(BaseCommand):
+    help = 'Compares CPU time and disk usage of the MP3 and the native audio path for a YouTube video.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='YouTube video URL used for the benchmark.')
+        parser.add_argument('--formats', nargs='+', choices=AUDIO_FORMATS, default=AUDIO_FORMATS)
+        parser.add_argument('--transcribe', action='store_true',
+                            help='Include the Whisper transcription in the measurement.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        results = [self.measure(options['url'], audio_format, options['transcribe'])
+                   for audio_format in options['formats']]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for result in results:
+            self.stdout.write(
+                f"{result['format']:>6}: {result['cpu_seconds']:.2f}s CPU, "
+                f"{result['wall_seconds']:.2f}s wall, {result['disk_bytes'] / 2**20:.2f} MiB peak on disk "
+                f"({result['audio_seconds']:.0f}s audio)"
+            )
+
+    def measure(self, url, audio_format, transcribe):
+        """
+        Downloads and decodes (and optionally transcribes) the audio once in the given format.
+        disk_bytes is the peak size of the scratch area during the download and conversion.
+        """
+        cpu_started = cpu_seconds()
+        wall_started = time.perf_counter()
+        with scratch_area() as scratch:
+            with PeakDiskUsage(scratch) as disk_usage:
+                audio_file = download_audio_from_video(url, scratch.file('audio'), audio_format)
+            audio = decode_audio(audio_file)
+            if transcribe:
+                get_model().transcribe(audio)
+
+        return {
+            'format': audio_format,
+            'cpu_seconds': cpu_seconds() - cpu_started,
+            'wall_seconds': time.perf_counter() - wall_started,
+            'disk_bytes': disk_usage.peak_bytes,
+            'audio_seconds': len(audio) / SAMPLE_RATE,
+        }
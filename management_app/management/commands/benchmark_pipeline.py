@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management_app.benchmarks.fakes import CannedGemini, LocalAudioSource, StubWhisperModel, write_test_tone
+from management_app.benchmarks.harness import benchmark_database, run_benchmark
+from management_app.utils.whisper_models import get_model
+
+
+class Command(BaseCommand):
+    help = ('Measures throughput, latency percentiles and peak memory per stage of the quiz pipeline '
+            'offline, with a local audio file, a stub or small Whisper model and a canned Gemini response.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Number of quizzes to create.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of quizzes created at the same time.')
+        parser.add_argument('--audio', help='Local audio file used instead of the YouTube download '
+                                            '(default: a generated 16 kHz WAV file of --audio-seconds).')
+        parser.add_argument('--audio-seconds', type=float, default=60)
+        parser.add_argument('--whisper', default='stub',
+                            help='"stub" or the name of a real Whisper model, e.g. "tiny".')
+        parser.add_argument('--whisper-realtime-factor', type=float, default=0.05,
+                            help='Seconds the stub model needs per second of audio.')
+        parser.add_argument('--gemini-latency', type=float, default=1.0, help='Seconds until Gemini answers.')
+        parser.add_argument('--gemini-jitter', type=float, default=0.2)
+        parser.add_argument('--output', help='Writes the results as JSON to this file.')
+        parser.add_argument('--compare', help='JSON file of an earlier run to compare the results with.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be at least 1.')
+        baseline = self.load_baseline(options['compare'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            audio_file = options['audio'] or write_test_tone(
+                os.path.join(directory, 'benchmark.wav'), options['audio_seconds'])
+            if options['whisper'] == 'stub':
+                whisper_model = StubWhisperModel(options['whisper_realtime_factor'])
+            else:
+                whisper_model = get_model(options['whisper'])
+            gemini = CannedGemini(options['gemini_latency'], options['gemini_jitter'])
+
+            with benchmark_database():
+                results = run_benchmark(options['requests'], options['concurrency'],
+                                        LocalAudioSource(audio_file), whisper_model, gemini)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        self.report(results, baseline)
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+    def report(self, results, baseline):
+        pipeline = results['pipeline']
+        self.stdout.write(
+            f"{pipeline.get('count', 0)} quizzes ({pipeline.get('errors', 0)} failed) in "
+            f"{results['wall_seconds']:.2f}s with concurrency {results['config']['concurrency']}: "
+            f"{results['throughput_per_second']:.2f} quizzes/s, peak RSS {results['peak_rss_bytes'] / 2**20:.0f} MiB"
+        )
+        self.stdout.write(f"{'stage':<12}{'count':>7}{'errors':>8}{'per s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'RSS MiB':>9}")
+        rows = dict(results['stages'], pipeline=pipeline)
+        for stage, stats in rows.items():
+            line = (f"{stage:<12}{stats['count']:>7}{stats['errors']:>8}{stats['throughput_per_second']:>9.2f}"
+                    f"{stats['p50_seconds']:>9.3f}{stats['p95_seconds']:>9.3f}{stats['p99_seconds']:>9.3f}"
+                    f"{stats['peak_rss_bytes'] / 2**20:>9.0f}")
+            previous = self.baseline_stage(baseline, stage)
+            if previous and previous['p95_seconds']:
+                change = stats['p95_seconds'] / previous['p95_seconds'] - 1
+                line += f"  p95 {change:+.0%} vs. baseline"
+            self.stdout.write(line)
+        for message, count in results['failures'].items():
+            self.stderr.write(f'{count} failed: {message}')
+
+    def baseline_stage(self, baseline, stage):
+        if baseline is None:
+            return None
+        if stage == 'pipeline':
+            return baseline.get('pipeline')
+        return baseline.get('stages', {}).get(stage)
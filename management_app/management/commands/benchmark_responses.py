@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management_app.api.renderers import orjson
+from management_app.benchmarks.harness import benchmark_database
+from management_app.benchmarks.responses import create_quizzes, run_response_benchmark
+
+
+class Command(BaseCommand):
+    help = ('Measures bytes and CPU time per quiz list response for the complete quizzes with the '
+            'default JSON renderer, with the orjson renderer and with sparse fieldsets.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quizzes', type=int, default=20, help='Number of quizzes in the test database.')
+        parser.add_argument('--questions', type=int, default=10, help='Number of questions per quiz.')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=50, help='Number of responses per variant.')
+        parser.add_argument('--output', help='Writes the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        if min(options['quizzes'], options['page_size'], options['repeat']) < 1 or options['questions'] < 0:
+            raise CommandError('--quizzes, --page-size and --repeat must be at least 1.')
+        if orjson is None:
+            self.stderr.write('orjson is not installed, the fast renderer falls back to the default one.')
+
+        with benchmark_database():
+            user = create_quizzes(options['quizzes'], options['questions'])
+            results = run_response_benchmark(user, options['page_size'], options['repeat'])
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        self.report(results)
+
+    def report(self, results):
+        full = results['variants']['full']
+        for name, variant in results['variants'].items():
+            self.stdout.write(
+                f"{name:<20} {variant['bytes']:>8} bytes ({variant['bytes'] / full['bytes']:>4.0%})  "
+                f"cpu {variant['cpu_seconds_mean'] * 1000:7.2f}ms mean, {variant['cpu_seconds_p95'] * 1000:7.2f}ms p95 "
+                f"({variant['cpu_seconds_mean'] / full['cpu_seconds_mean']:>4.0%})"
+            )
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management_app.benchmarks.startup import measure_startup
+from management_app.utils.lazy_modules import HEAVY_MODULES
+
+
+class Command(BaseCommand):
+    help = ('Measures with `python -X importtime` how long a fresh process needs to set up Django and import '
+            'a module, and fails if it exceeds --budget-ms or loads torch, Whisper, yt-dlp, the GenAI SDK or numpy.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='core.urls',
+                            help='Module to import after django.setup() (default: core.urls, i.e. all views).')
+        parser.add_argument('--budget-ms', type=float, help='Fails if the imports take longer.')
+        parser.add_argument('--allow-heavy', action='store_true',
+                            help='Only reports the heavy modules instead of failing, e.g. for pipeline workers.')
+        parser.add_argument('--top', type=int, default=10, help='Number of slowest modules to list.')
+        parser.add_argument('--output', help='Writes the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            results = measure_startup(options['module'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        heavy = [name for name in HEAVY_MODULES if name in results['modules']]
+        results['heavy_modules'] = heavy
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        self.report(results, options['top'])
+
+        if heavy and not options['allow_heavy']:
+            raise CommandError(f"Importing {options['module']} loads {', '.join(heavy)}; "
+                               f"import them through management_app.utils.lazy_modules.")
+        if options['budget_ms'] is not None and results['total_seconds'] * 1000 > options['budget_ms']:
+            raise CommandError(f"Imports took {results['total_seconds'] * 1000:.0f}ms, "
+                               f"the budget is {options['budget_ms']:.0f}ms.")
+
+    def report(self, results, top):
+        self.stdout.write(f"{results['module']}: {results['module_count']} modules imported in "
+                          f"{results['total_seconds'] * 1000:.0f}ms")
+        slowest = sorted(results['modules'].items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, microseconds in slowest:
+            self.stdout.write(f'{microseconds / 1000:8.1f}ms  {name}')
+        if results['heavy_modules']:
+            self.stdout.write(f"heavy modules: {', '.join(results['heavy_modules'])}")
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management_app.benchmarks.load import run_load_test
+
+
+class Command(BaseCommand):
+    help = ('Sends many concurrent requests to a running Quizly server and reports throughput and latency, '
+            'e.g. once against `gunicorn core.wsgi` and once against `uvicorn core.asgi` with ASYNC_VIEWS=true.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Full URL of the endpoint, e.g. http://localhost:8000/api/quizzes/.')
+        parser.add_argument('--requests', type=int, default=1000, help='Number of requests to send.')
+        parser.add_argument('--connections', type=int, default=100,
+                            help='Number of requests waiting for a response at the same time.')
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--token', help='Access token sent as Authorization: Bearer header.')
+        parser.add_argument('--data', help='JSON request body.')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds until a request fails.')
+        parser.add_argument('--output', help='Writes the results as JSON to this file.')
+        parser.add_argument('--compare', help='JSON file of an earlier run to compare the results with.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['connections'] < 1:
+            raise CommandError('--requests and --connections must be at least 1.')
+        try:
+            body = json.loads(options['data']) if options['data'] else None
+        except ValueError as e:
+            raise CommandError(f'--data is not valid JSON: {e}')
+        baseline = self.load_baseline(options['compare'])
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else None
+
+        results = asyncio.run(run_load_test(
+            options['url'], options['requests'], options['connections'], method=options['method'].upper(),
+            headers=headers, body=body, timeout=options['timeout']))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        self.report(results, baseline)
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+    def report(self, results, baseline):
+        self.stdout.write(
+            f"{results['count']} responses ({results['errors']} errors) in {results['wall_seconds']:.2f}s "
+            f"over {results['config']['connections']} connections: {results['throughput_per_second']:.1f} requests/s, "
+            f"peak {results['peak_in_flight']} in flight"
+        )
+        self.stdout.write(f"p50 {results['p50_seconds']:.3f}s  p95 {results['p95_seconds']:.3f}s  "
+                          f"p99 {results['p99_seconds']:.3f}s  statuses {results['statuses']}")
+        if baseline and baseline.get('throughput_per_second'):
+            change = results['throughput_per_second'] / baseline['throughput_per_second'] - 1
+            self.stdout.write(f"throughput {change:+.0%}, p95 {results['p95_seconds'] - baseline['p95_seconds']:+.3f}s "
+                              f"vs. baseline")
+        for failure, count in results['failures'].items():
+            self.stderr.write(f'{count} failed: {failure}')
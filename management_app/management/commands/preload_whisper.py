@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from management_app.utils.whisper_models import preload_models, model_stats
+
+
+class Command(BaseCommand):
+    help = 'Downloads and loads the configured Whisper models and prints load time and memory usage.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Model names, defaults to WHISPER_MODEL.')
+
+    def handle(self, *args, **options):
+        preload_models(options['models'])
+        for stats in model_stats():
+            self.stdout.write(
+                f"{stats['name']}: loaded in {stats['load_seconds']}s, "
+                f"{stats['parameter_bytes'] / 2**20:.1f} MiB parameters, "
+                f"{stats['rss_after_load'] / 2**20:.1f} MiB peak RSS"
+            )
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from management_app.utils.quiz_batches import run_batch_jobs
+from management_app.utils.quiz_jobs import requeue_stale_jobs, run_pending_jobs
+from management_app.utils.scratch_space import sweep_stale_areas
+
+
+class Command(BaseCommand):
+    help = 'Processes queued quiz creation jobs and batches in this process.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+
+    def handle(self, *args, **options):
+        requeue_stale_jobs()
+        sweep_stale_areas()
+        while True:
+            close_old_connections()
+            processed = run_pending_jobs() + run_batch_jobs()
+            if processed:
+                self.stdout.write(f'Processed {processed} quiz jobs')
+            if options['once']:
+                return
+            time.sleep(settings.QUIZ_JOB_POLL_SECONDS)
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management_app', '0004_quizjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=11)),
+                ('model', models.CharField(max_length=64)),
+                ('transcript', models.TextField()),
+                ('audio_file', models.CharField(blank=True, max_length=255)),
+                ('size_bytes', models.PositiveBigIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'model'), name='unique_transcript_per_video_and_model')],
+            },
+        ),
+    ]
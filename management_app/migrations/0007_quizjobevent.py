@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management_app', '0006_quiz_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizJobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=32)),
+                ('progress', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='management_app.quizjob')),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management_app', '0008_quizbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=11, unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='video_id',
+            field=models.CharField(blank=True, db_index=True, max_length=11),
+        ),
+        migrations.AlterField(
+            model_name='quizquestion',
+            name='quiz',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='management_app.quiz'),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='content',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='quizzes', to='management_app.quizcontent'),
+        ),
+        migrations.AddField(
+            model_name='quizquestion',
+            name='content',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='management_app.quizcontent'),
+        ),
+    ]
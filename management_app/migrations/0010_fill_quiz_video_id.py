@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from management_app.utils.video_id import extract_video_id
+
+
+def fill_video_ids(apps, schema_editor):
+    """
+    Stores the canonical video id of every existing quiz. Their questions stay with the quiz.
+    """
+    Quiz = apps.get_model('management_app', 'Quiz')
+    quizzes = []
+    for quiz in Quiz.objects.filter(video_id='').only('id', 'video_url').iterator():
+        quiz.video_id = extract_video_id(quiz.video_url) or ''
+        if quiz.video_id:
+            quizzes.append(quiz)
+    Quiz.objects.bulk_update(quizzes, ['video_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management_app', '0009_quizcontent'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_video_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+def fix_question_owners(apps, schema_editor):
+    """
+    Deletes questions without quiz and content, which no quiz shows, and keeps questions
+    with both with their quiz, so every question satisfies the new constraint.
+    """
+    QuizQuestion = apps.get_model('management_app', 'QuizQuestion')
+    QuizQuestion.objects.filter(quiz__isnull=True, content__isnull=True).delete()
+    QuizQuestion.objects.filter(quiz__isnull=False, content__isnull=False).update(content=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management_app', '0010_fill_quiz_video_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_question_owners, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='quizquestion',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('content__isnull', True), ('quiz__isnull', False)), models.Q(('content__isnull', False), ('quiz__isnull', True)), _connector='OR'), name='question_has_quiz_or_content'),
+        ),
+    ]
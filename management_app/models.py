@@ -2,13 +2,36 @@ from django.db import models
 from django.contrib.auth.models import User
 
 
+class QuizContent(models.Model):
+    """
+    Quiz generated for a YouTube video, stored once and shared by the quizzes of all users
+    who create a quiz for this video.
+    """
+    video_id = models.CharField(max_length=11, unique=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class QuizQuestion(models.Model):
     question_title = models.CharField(max_length=255)
     question_options = models.JSONField()
     answer = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    quiz = models.ForeignKey('Quiz', on_delete=models.CASCADE, related_name='questions')
+    # A question belongs either to one quiz or to shared content.
+    quiz = models.ForeignKey('Quiz', on_delete=models.CASCADE, null=True, blank=True, related_name='questions')
+    content = models.ForeignKey(QuizContent, on_delete=models.CASCADE, null=True, blank=True,
+                                related_name='questions')
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=(models.Q(quiz__isnull=False, content__isnull=True)
+                           | models.Q(quiz__isnull=True, content__isnull=False)),
+                name='question_has_quiz_or_content',
+            ),
+        ]
 
 
 class Quiz(models.Model):
@@ -17,4 +40,73 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     video_url = models.URLField()
+    video_id = models.CharField(max_length=11, blank=True, db_index=True)
+    content = models.ForeignKey(QuizContent, on_delete=models.PROTECT, null=True, blank=True, related_name='quizzes')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quizzes')
+
+    @property
+    def question_list(self):
+        """
+        Returns the questions of the shared content, or the own questions of the quiz.
+        """
+        if self.content_id is not None:
+            return self.content.questions.all()
+        return self.questions.all()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='quiz_user_created_idx'),
+        ]
+
+
+class QuizBatch(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_batches')
+
+
+class QuizJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    video_url = models.URLField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    stage = models.CharField(max_length=32, blank=True)
+    progress = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=255, blank=True)
+    quiz = models.ForeignKey(Quiz, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    batch = models.ForeignKey(QuizBatch, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_jobs')
+
+
+class TranscriptCacheEntry(models.Model):
+    video_id = models.CharField(max_length=11)
+    model = models.CharField(max_length=64)
+    transcript = models.TextField()
+    audio_file = models.CharField(max_length=255, blank=True)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video_id', 'model'], name='unique_transcript_per_video_and_model'),
+        ]
+
+
+class QuizJobEvent(models.Model):
+    job = models.ForeignKey(QuizJob, on_delete=models.CASCADE, related_name='events')
+    stage = models.CharField(max_length=32)
+    progress = models.FloatField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,40 @@
+import tempfile
+
+from django.test import override_settings
+
+
+def quiz_content(question_count: int = 1) -> dict:
+    """
+    Returns valid quiz content, as generated by Gemini, with the given number of questions.
+    """
+    return {
+        'title': 'Sample Quiz',
+        'description': 'A sample quiz for testing.',
+        'questions': [
+            {
+                'question_title': f'Sample Question {number}',
+                'question_options': ['Option 1', 'Option 2', 'Option 3', 'Option 4'],
+                'answer': 'Option 1',
+            }
+            for number in range(question_count)
+        ],
+    }
+
+
+QUIZ_CONTENT = quiz_content()
+
+
+class TempCacheDirMixin:
+    """
+    Points QUIZLY_CACHE_DIR to a temporary directory for every test, so transcripts and
+    single-flight results neither leak between tests nor end up in the real cache/.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        settings_override = override_settings(QUIZLY_CACHE_DIR=self.cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from management_app.api.async_views import (
+    AsyncCreateQuizStreamView, AsyncCreateQuizView, AsyncQuizDetailView, AsyncQuizListView,
+)
+from management_app.models import Quiz, QuizJob, QuizQuestion
+from management_app.utils import gemini_client, quiz_streaming, single_flight
+from management_app.utils.quiz_jobs import ProgressPublisher, finish_job
+from management_app.utils.quiz_persistence import save_quiz
+from .test_quiz_streaming import GEMINI_RESPONSE, chunks, parse_events
+from .helpers import QUIZ_CONTENT, TempCacheDirMixin
+
+
+async def gemini_stream(prompt, delay=0):
+    for text in chunks(GEMINI_RESPONSE):
+        await asyncio.sleep(delay)
+        yield text
+
+
+@override_settings(QUIZ_JOB_WORKERS=0)
+class AsyncQuizViewTests(TempCacheDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.factory = AsyncRequestFactory()
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.quiz = save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+
+    async def test_create_quiz(self):
+        request = self.factory.post('/', {'url': 'https://youtu.be/PPzIWFJU_3s'}, content_type='application/json',
+                                    headers=self.headers)
+        response = await AsyncCreateQuizView.as_view()(request)
+
+        self.assertEqual(response.status_code, 202)
+        job = await QuizJob.objects.aget(pk=json.loads(response.content)['id'])
+        self.assertEqual(response['Location'], reverse('quiz_job_detail', kwargs={'pk': job.pk}))
+
+    async def test_create_quiz_rejects_invalid_url_and_anonymous_users(self):
+        request = self.factory.post('/', {'url': 'http://example.com/video'}, content_type='application/json',
+                                    headers=self.headers)
+        self.assertEqual((await AsyncCreateQuizView.as_view()(request)).status_code, 400)
+
+        request = self.factory.post('/', {'url': 'https://youtu.be/PPzIWFJU_3s'}, content_type='application/json')
+        self.assertEqual((await AsyncCreateQuizView.as_view()(request)).status_code, 403)
+
+    async def test_list_quizzes(self):
+        response = await AsyncQuizListView.as_view()(self.factory.get('/api/quizzes/', headers=self.headers))
+        data = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([quiz['id'] for quiz in data['results']], [self.quiz.id])
+        self.assertEqual(len(data['results'][0]['questions']), 1)
+        self.assertIsNone(data['next'])
+
+        cached = await AsyncQuizListView.as_view()(
+            self.factory.get('/api/quizzes/', headers={**self.headers, 'If-None-Match': response['ETag']}))
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_list_quizzes_summary_page(self):
+        for number in range(2):
+            await Quiz.objects.acreate(title=f'Quiz {number}', user=self.user, description='More.',
+                                       video_url='http://example.com/video')
+        response = await AsyncQuizListView.as_view()(
+            self.factory.get('/api/quizzes/', {'summary': 'true', 'page_size': 2}, headers=self.headers))
+        data = json.loads(response.content)
+
+        self.assertEqual([quiz['title'] for quiz in data['results']], ['Quiz 1', 'Quiz 0'])
+        self.assertNotIn('questions', data['results'][0])
+        self.assertIsNotNone(data['next'])
+
+    async def test_list_and_retrieve_sparse_fieldsets(self):
+        response = await AsyncQuizListView.as_view()(
+            self.factory.get('/api/quizzes/', {'fields': 'title,questions.answer'}, headers=self.headers))
+        self.assertEqual(json.loads(response.content)['results'],
+                         [{'id': self.quiz.id, 'title': 'Sample Quiz', 'questions': [{'answer': 'Option 1'}]}])
+
+        response = await AsyncQuizDetailView.as_view()(
+            self.factory.get('/', {'fields': 'video_id'}, headers=self.headers), pk=self.quiz.pk)
+        self.assertEqual(json.loads(response.content), {'id': self.quiz.id, 'video_id': 'PPzIWFJU_3s'})
+
+        response = await AsyncQuizDetailView.as_view()(
+            self.factory.get('/', {'fields': 'user'}, headers=self.headers), pk=self.quiz.pk)
+        self.assertEqual(response.status_code, 400)
+
+    async def test_update_quiz_keeps_shared_content(self):
+        request = self.factory.patch('/', {'title': 'My Quiz'}, content_type='application/json', headers=self.headers)
+        response = await AsyncQuizDetailView.as_view()(request, pk=self.quiz.pk)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['title'], 'My Quiz')
+        self.assertEqual(len(json.loads(response.content)['questions']), 1)
+        # Questions are read-only, so renaming needs no copy of them.
+        self.assertEqual(await QuizQuestion.objects.filter(quiz=self.quiz).acount(), 0)
+        self.assertIsNotNone((await Quiz.objects.aget(pk=self.quiz.pk)).content_id)
+
+    async def test_delete_quiz(self):
+        view = AsyncQuizDetailView.as_view()
+        response = await view(self.factory.delete('/', headers=self.headers), pk=self.quiz.pk)
+        self.assertEqual(response.status_code, 204)
+        response = await view(self.factory.get('/', headers=self.headers), pk=self.quiz.pk)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_quiz(self):
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream_async', gemini_stream):
+            response = await AsyncCreateQuizStreamView.as_view()(
+                self.factory.get('/', {'url': 'https://youtu.be/aaaaaaaaaaa'}, headers=self.headers))
+            content = ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        events = parse_events(content)
+        self.assertEqual([event for event, _ in events],
+                         ['stage', 'stage', 'title', 'description', 'question', 'question',
+                          'question', 'stage', 'done'])
+        quiz = await Quiz.objects.aget(pk=events[-1][1]['quiz_id'])
+        self.assertEqual(quiz.video_id, 'aaaaaaaaaaa')
+
+    async def test_waiting_streams_do_not_block_each_other(self):
+        delay = 0.01
+
+        async def stream(video_id):
+            response = await AsyncCreateQuizStreamView.as_view()(
+                self.factory.get('/', {'url': f'https://youtu.be/{video_id}'}, headers=self.headers))
+            return ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream_async',
+                                  lambda prompt: gemini_stream(prompt, delay)):
+            started = time.perf_counter()
+            contents = await asyncio.gather(*(stream(f'{number:011d}') for number in range(20)))
+            elapsed = time.perf_counter() - started
+
+        self.assertTrue(all('event: done' in content for content in contents))
+        # One stream waits len(chunks) * delay for Gemini; 20 of them one after another would take 20 times as long.
+        self.assertLess(elapsed, 20 * len(chunks(GEMINI_RESPONSE)) * delay / 2)
+
+    async def test_stream_without_transcript_follows_a_quiz_job(self):
+        def enqueue_finished_job(url, user):
+            job = QuizJob.objects.create(video_url=url, user=user)
+            ProgressPublisher(job)('download', 1)
+            finish_job(job, quiz=save_quiz(json.loads(GEMINI_RESPONSE.strip('`json\n')), user, url))
+            return job
+
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value=None), \
+                mock.patch.object(quiz_streaming, 'enqueue_quiz_job', side_effect=enqueue_finished_job), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream_async') as generate:
+            events = [event async for event in quiz_streaming.stream_quiz_from_url_async(
+                'https://youtu.be/aaaaaaaaaaa', self.user)]
+
+        generate.assert_not_called()
+        self.assertEqual([event for event, _ in events],
+                         ['stage', 'job', 'stage', 'title', 'description', 'question', 'question', 'question', 'done'])
+        job = await QuizJob.objects.aget()
+        self.assertEqual(events[-1][1]['quiz_id'], job.quiz_id)
+
+    async def test_stream_waits_for_a_running_generation_of_the_video(self):
+        flight, _ = await single_flight.lead_or_wait_async('aaaaaaaaaaa')
+
+        async def lead():
+            await asyncio.sleep(0.2)
+            flight.publish(json.loads(GEMINI_RESPONSE.strip('`json\n')))
+            flight.release()
+
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream_async') as generate:
+            leader = asyncio.create_task(lead())
+            events = [event async for event in quiz_streaming.stream_quiz_from_url_async(
+                'https://youtu.be/aaaaaaaaaaa', self.user)]
+            await leader
+
+        generate.assert_not_called()
+        self.assertEqual([event for event, _ in events],
+                         ['stage', 'title', 'description', 'question', 'question', 'question', 'stage', 'done'])
+
+    async def test_closing_a_stream_releases_the_gemini_slot_and_the_video(self):
+        async def gemini_chunks():
+            for text in chunks(GEMINI_RESPONSE):
+                yield SimpleNamespace(text=text)
+
+        client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+            generate_content_stream=mock.AsyncMock(return_value=gemini_chunks()))))
+        semaphore, _ = gemini_client._get_limits()
+        free_slots = semaphore._value
+
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(gemini_client, 'get_client', return_value=client):
+            # Like a client that disconnects after the first question.
+            async with aclosing(quiz_streaming.stream_quiz_from_url_async(
+                    'https://youtu.be/aaaaaaaaaaa', self.user)) as events:
+                async for event, _ in events:
+                    if event == 'question':
+                        self.assertEqual(semaphore._value, free_slots - 1)
+                        break
+
+        self.assertEqual(semaphore._value, free_slots)
+        flight, _ = await single_flight.lead_or_wait_async('aaaaaaaaaaa')
+        self.assertIsNotNone(flight)
+        flight.release()
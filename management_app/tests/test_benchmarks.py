@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import tempfile
+from contextlib import nullcontext
+from unittest import mock
+
+import httpx
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from management_app.benchmarks.fakes import (
+    CannedGemini, LocalAudioSource, StubWhisperModel, decode_wav, is_whisper_wav, write_test_tone)
+from management_app.benchmarks.harness import percentile, run_benchmark
+from management_app.benchmarks.load import run_load_test
+from management_app.benchmarks.responses import create_quizzes, run_response_benchmark
+from management_app.management.commands import benchmark_pipeline
+from management_app.models import Quiz
+from management_app.utils.youtube_quiz_creator import clean_ai_response
+
+
+class BenchmarkFakesTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.audio_file = write_test_tone(os.path.join(self.directory, 'tone.wav'), 2)
+
+    def test_test_tone_decodes_without_ffmpeg(self):
+        self.assertTrue(is_whisper_wav(self.audio_file))
+        audio = decode_wav(self.audio_file)
+        self.assertEqual(len(audio), 32000)
+        self.assertLessEqual(abs(audio).max(), 1)
+
+    def test_local_audio_source_behaves_like_yt_dlp(self):
+        reported = []
+        options = {'outtmpl': os.path.join(self.directory, 'download.%(ext)s'),
+                   'progress_hooks': [reported.append]}
+        with LocalAudioSource(self.audio_file).YoutubeDL(options) as ydl:
+            info = ydl.extract_info('https://youtu.be/abcdefghijk', download=True)
+
+        filepath = info['requested_downloads'][0]['filepath']
+        self.assertEqual(filepath, os.path.join(self.directory, 'download.wav'))
+        self.assertEqual(reported[-1]['downloaded_bytes'], os.path.getsize(self.audio_file))
+
+    def test_stub_model_and_canned_gemini(self):
+        self.assertTrue(StubWhisperModel().transcribe(decode_wav(self.audio_file))['text'])
+        quiz = clean_ai_response(CannedGemini(questions=3).generate_content('prompt').text)
+        self.assertEqual(len(quiz['questions']), 3)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3], 0.95), 3)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+class RunBenchmarkTests(TransactionTestCase):
+    def test_reports_every_stage_of_every_quiz(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = LocalAudioSource(write_test_tone(os.path.join(directory, 'tone.wav'), 1))
+            results = run_benchmark(3, 1, source, StubWhisperModel(), CannedGemini())
+
+        self.assertEqual(results['pipeline']['count'], 3)
+        self.assertEqual(results['failures'], {})
+        self.assertEqual(set(results['stages']), {'download', 'transcribe', 'generate', 'parse', 'save'})
+        for stats in results['stages'].values():
+            self.assertEqual(stats['count'], 3)
+            self.assertLessEqual(stats['p50_seconds'], stats['p99_seconds'])
+        self.assertEqual(Quiz.objects.count(), 3)
+        json.dumps(results)
+
+    @mock.patch.object(benchmark_pipeline, 'benchmark_database', nullcontext)
+    def test_command_writes_json_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command('benchmark_pipeline', requests=2, concurrency=1, audio_seconds=1,
+                         gemini_latency=0, gemini_jitter=0, output=output, stdout=open(os.devnull, 'w'))
+            with open(output) as results_file:
+                results = json.load(results_file)
+        self.assertEqual(results['pipeline']['count'], 2)
+
+
+class ResponseBenchmarkTests(TransactionTestCase):
+    def test_sparse_fieldsets_are_smaller(self):
+        results = run_response_benchmark(create_quizzes(3, 2), page_size=3, repeat=2)
+
+        variants = results['variants']
+        self.assertEqual(variants['full']['bytes'], variants['full_fast_renderer']['bytes'])
+        self.assertLess(variants['question_titles']['bytes'], variants['full']['bytes'])
+        self.assertLess(variants['titles']['bytes'], variants['question_titles']['bytes'])
+        json.dumps(results)
+
+
+class LoadTestTests(SimpleTestCase):
+    def test_requests_wait_concurrently(self):
+        async def handler(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={'detail': 'ok'})
+
+        results = asyncio.run(run_load_test(
+            'http://testserver/api/quizzes/', 40, 20, transport=httpx.MockTransport(handler)))
+
+        self.assertEqual(results['count'], 40)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(results['statuses'], {'200': 40})
+        self.assertEqual(results['peak_in_flight'], 20)
+        # Two rounds of 0.05s instead of forty one after another.
+        self.assertLess(results['wall_seconds'], 1)
+
+    def test_server_errors_are_counted(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        results = asyncio.run(run_load_test('http://testserver/', 5, 2, transport=transport))
+        self.assertEqual(results['errors'], 5)
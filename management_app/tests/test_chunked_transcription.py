@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from management_app.utils import chunked_transcription
+from management_app.utils.chunked_transcription import SAMPLE_RATE, find_chunks, stitch_transcripts
+
+
+def speech_with_pauses(seconds: int, pauses):
+    """
+    Returns noise of the given length that is silent for one second at each pause.
+    """
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, seconds * SAMPLE_RATE).astype(np.float32)
+    for pause in pauses:
+        audio[pause * SAMPLE_RATE:(pause + 1) * SAMPLE_RATE] = 0
+    return audio
+
+
+class ChunkedTranscriptionTests(SimpleTestCase):
+    def test_short_audio_is_one_chunk(self):
+        audio = speech_with_pauses(20, [])
+        self.assertEqual(find_chunks(audio, 30, 1, 5), [(0, len(audio))])
+
+    def test_chunks_are_cut_at_silence_and_overlap(self):
+        audio = speech_with_pauses(100, [33, 58])
+        chunks = find_chunks(audio, 30, 1, 5)
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(audio))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            cut = (end + start) // 2
+            self.assertTrue(33 <= cut / SAMPLE_RATE <= 34 or 58 <= cut / SAMPLE_RATE <= 59)
+            self.assertEqual(end - start, 2 * SAMPLE_RATE)
+
+    def test_stitch_removes_duplicated_overlap_words(self):
+        texts = [
+            'The mitochondria is the powerhouse of the',
+            'of the cell. It produces',
+            'Produces energy.',
+        ]
+        self.assertEqual(stitch_transcripts(texts),
+                         'The mitochondria is the powerhouse of the cell. It produces energy.')
+
+    def test_stitch_keeps_text_without_overlap(self):
+        self.assertEqual(stitch_transcripts(['First part.', 'Second part.']),
+                         'First part. Second part.')
+
+    @override_settings(WHISPER_CHUNK_SECONDS=30, WHISPER_CHUNK_OVERLAP_SECONDS=0,
+                       WHISPER_CHUNK_SEARCH_SECONDS=5)
+    def test_transcribe_chunked_keeps_order(self):
+        audio = speech_with_pauses(100, [33, 58])
+        progress = []
+
+        def fake_transcribe(chunk):
+            return f'{len(chunk) // SAMPLE_RATE} seconds.'
+
+        with ThreadPoolExecutor(max_workers=3) as pool, \
+                mock.patch.object(chunked_transcription, 'get_pool', return_value=pool), \
+                mock.patch.object(chunked_transcription, '_transcribe_chunk', side_effect=fake_transcribe):
+            transcript = chunked_transcription.transcribe_chunked(audio, progress.append)
+
+        expected = ' '.join(f'{(end - start) // SAMPLE_RATE} seconds.'
+                            for start, end in find_chunks(audio, 30, 0, 5))
+        self.assertEqual(transcript, expected)
+        self.assertEqual(progress[-1], 1)
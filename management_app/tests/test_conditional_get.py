@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.http import http_date
+
+from management_app.models import Quiz, QuizQuestion
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        """
+        Registrates the testuser for the testcase and generates a test quiz.
+        """
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        access_token = response.cookies.get('access_token').value
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.quiz = Quiz.objects.create(
+            title='Sample Quiz', user=self.user, description='A sample quiz for testing.',
+            video_url='http://example.com/video')
+        self.quiz_question = QuizQuestion.objects.create(
+            question_title='Sample Question',
+            question_options=['Option 1', 'Option 2', 'Option 3', 'Option 4'],
+            answer='Option 1',
+            quiz=self.quiz
+        )
+        self.detail_url = reverse('quiz_detail', kwargs={'pk': self.quiz.id})
+
+    def test_detail_not_modified_with_etag(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+
+        # the user is cached by the authentication, so only the aggregate query remains
+        with self.assertNumQueries(1):
+            cached_response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached_response.status_code, 304)
+        self.assertEqual(cached_response.content, b'')
+
+    def test_detail_modified_after_question_update(self):
+        response = self.client.get(self.detail_url)
+        self.quiz_question.answer = 'Option 2'
+        self.quiz_question.save()
+
+        new_response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(new_response.status_code, 200)
+        self.assertNotEqual(new_response['ETag'], response['ETag'])
+
+    def test_detail_not_modified_with_last_modified(self):
+        later = http_date((timezone.now() + timedelta(minutes=1)).timestamp())
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=later)
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_modified_after_deleted_quiz(self):
+        Quiz.objects.create(title='Second Quiz', user=self.user, description='Another quiz.',
+                            video_url='http://example.com/video')
+        response = self.client.get(reverse('quiz_list'))
+        self.assertNotIn('Last-Modified', response)
+        self.quiz.delete()
+
+        new_response = self.client.get(reverse('quiz_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(new_response.status_code, 200)
+        self.assertEqual(len(new_response.json()['results']), 1)
+
+    def test_list_modified_after_new_quiz(self):
+        response = self.client.get(reverse('quiz_list'))
+        Quiz.objects.create(title='Second Quiz', user=self.user, description='Another quiz.',
+                            video_url='http://example.com/video')
+
+        new_response = self.client.get(reverse('quiz_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(new_response.status_code, 200)
+        self.assertEqual(len(new_response.json()['results']), 2)
+
+    def test_list_etag_depends_on_query(self):
+        response = self.client.get(reverse('quiz_list'))
+        summary_response = self.client.get(reverse('quiz_list'), {'summary': 'true'},
+                                           HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(summary_response.status_code, 200)
+
+    def test_missing_quiz_returns_not_found(self):
+        response = self.client.get(reverse('quiz_detail', kwargs={'pk': self.quiz.id + 1}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+
+from management_app.models import Quiz
+from management_app.utils.quiz_persistence import save_quiz
+from .helpers import QUIZ_CONTENT
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite profile')
+class SqliteProfileTests(TransactionTestCase):
+    def test_connections_use_wal(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_concurrent_creates_do_not_fail_on_the_lock(self):
+        user = User.objects.create_user(username='testuser', password='testpass')
+        threads, quizzes_per_thread = 8, 5
+        start = threading.Barrier(threads)
+        errors = []
+
+        def create_quizzes(number):
+            start.wait()
+            try:
+                for index in range(quizzes_per_thread):
+                    # Every save reads the shared content of the video before it writes.
+                    save_quiz(QUIZ_CONTENT, user, f'https://youtu.be/{number:05d}{index:06d}')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=create_quizzes, args=(number,)) for number in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Quiz.objects.count(), threads * quizzes_per_thread)
@@ -0,0 +1,90 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from management_app.api import renderers
+from management_app.api.renderers import FastJSONRenderer
+from management_app.models import Quiz, QuizQuestion
+from management_app.utils.quiz_persistence import save_quiz
+from .helpers import QUIZ_CONTENT
+
+
+class FieldsetTests(APITestCase):
+    def setUp(self):
+        """
+        Logs in the testuser and creates a quiz with its own question.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.cookies.get('access_token').value)
+        self.quiz = Quiz.objects.create(
+            title='Sample Quiz', user=self.user, description='A sample quiz for testing.',
+            video_url='http://example.com/video')
+        QuizQuestion.objects.create(question_title='Sample Question', question_options=['A', 'B'],
+                                    answer='A', quiz=self.quiz)
+
+    def test_list_only_returns_requested_fields(self):
+        response = self.client.get(reverse('quiz_list'), {'fields': 'title'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': self.quiz.id, 'title': 'Sample Quiz'}])
+
+    def test_list_expands_questions_with_chosen_fields(self):
+        save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        # authentication, validators, quizzes, own questions, shared content, shared questions
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('quiz_list'), {'fields': 'title,questions.question_title'})
+
+        shared_quiz, own_quiz = response.data['results']
+        self.assertEqual(shared_quiz['questions'], [{'question_title': 'Sample Question 0'}])
+        self.assertEqual(own_quiz['questions'], [{'question_title': 'Sample Question'}])
+
+    def test_sparse_query_only_selects_requested_columns(self):
+        with self.assertNumQueries(4) as context:
+            self.client.get(reverse('quiz_list'), {'fields': 'title', 'expand': 'questions'})
+        quiz_query, question_query = context.captured_queries[2]['sql'], context.captured_queries[3]['sql']
+
+        self.assertNotIn('"description"', quiz_query)
+        self.assertIn('"question_options"', question_query)
+
+    def test_detail_with_fields(self):
+        response = self.client.get(reverse('quiz_detail', kwargs={'pk': self.quiz.id}),
+                                   {'fields': 'title,description,questions.answer'})
+
+        self.assertEqual(response.data, {'id': self.quiz.id, 'title': 'Sample Quiz',
+                                          'description': 'A sample quiz for testing.',
+                                          'questions': [{'answer': 'A'}]})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('quiz_list'), {'fields': 'title,secret,questions.user'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', str(response.data['fields']))
+        self.assertIn('questions.user', str(response.data['fields']))
+
+    def test_fields_take_precedence_over_summary(self):
+        response = self.client.get(reverse('quiz_list'), {'summary': 'true', 'fields': 'video_url'})
+
+        self.assertEqual(response.data['results'], [{'id': self.quiz.id, 'video_url': 'http://example.com/video'}])
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    DATA = {'title': 'Quiz \u2028 ä', 'questions': [{'id': 1, 'options': ['A', None, 1.5, True]}]}
+
+    def test_renders_like_the_json_renderer(self):
+        self.assertEqual(json.loads(FastJSONRenderer().render(self.DATA)), json.loads(JSONRenderer().render(self.DATA)))
+        self.assertNotIn(b'\xe2\x80\xa8', FastJSONRenderer().render(self.DATA))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_falls_back_without_orjson(self):
+        orjson = renderers.orjson
+        renderers.orjson = None
+        try:
+            self.assertEqual(FastJSONRenderer().render(self.DATA), JSONRenderer().render(self.DATA))
+        finally:
+            renderers.orjson = orjson
@@ -0,0 +1,79 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+from google.genai import errors
+
+from management_app.utils import gemini_client
+from management_app.utils.gemini_client import TokenBucket
+
+
+def fake_client(*results):
+    """
+    Returns a client whose generate_content returns or raises the given results in order.
+    """
+    return SimpleNamespace(models=SimpleNamespace(generate_content=mock.Mock(side_effect=results)))
+
+
+@override_settings(GEMINI_RETRY_ATTEMPTS=3, GEMINI_RETRY_BASE_SECONDS=0, GEMINI_RETRY_MAX_SECONDS=0,
+                   GEMINI_REQUESTS_PER_MINUTE=6000, GEMINI_MAX_CONCURRENCY=2)
+class GeminiClientTests(SimpleTestCase):
+    def test_transient_errors_are_retried(self):
+        client = fake_client(errors.ServerError(503, {}), httpx.ReadTimeout('timeout'), 'response')
+        retries_before = gemini_client.gemini_stats()['retries']
+
+        with mock.patch.object(gemini_client, 'get_client', return_value=client):
+            self.assertEqual(gemini_client.generate_content('prompt'), 'response')
+
+        self.assertEqual(client.models.generate_content.call_count, 3)
+        self.assertEqual(gemini_client.gemini_stats()['retries'] - retries_before, 2)
+
+    def test_client_errors_are_not_retried(self):
+        client = fake_client(errors.ClientError(400, {}), 'response')
+
+        with mock.patch.object(gemini_client, 'get_client', return_value=client), \
+                self.assertRaises(errors.ClientError):
+            gemini_client.generate_content('prompt')
+        self.assertEqual(client.models.generate_content.call_count, 1)
+
+    def test_retries_stop_after_attempts(self):
+        client = fake_client(*[errors.ClientError(429, {})] * 5)
+
+        with mock.patch.object(gemini_client, 'get_client', return_value=client), \
+                self.assertRaises(errors.ClientError):
+            gemini_client.generate_content('prompt')
+        self.assertEqual(client.models.generate_content.call_count, 3)
+
+    def test_stream_is_retried_before_first_chunk(self):
+        chunks = [SimpleNamespace(text='{"title": '), SimpleNamespace(text='"Quiz"}')]
+        client = SimpleNamespace(models=SimpleNamespace(generate_content_stream=mock.Mock(
+            side_effect=[errors.ServerError(503, {}), iter(chunks)])))
+
+        with mock.patch.object(gemini_client, 'get_client', return_value=client):
+            text = ''.join(gemini_client.generate_content_stream('prompt'))
+
+        self.assertEqual(text, '{"title": "Quiz"}')
+        self.assertEqual(client.models.generate_content_stream.call_count, 2)
+
+    async def test_async_stream_is_retried_before_first_chunk(self):
+        async def stream(texts):
+            for text in texts:
+                yield SimpleNamespace(text=text)
+
+        start_stream = mock.AsyncMock(side_effect=[errors.ServerError(503, {}), stream(['{"title": ', '"Quiz"}'])])
+        client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=start_stream)))
+
+        with mock.patch.object(gemini_client, 'get_client', return_value=client):
+            text = ''.join([text async for text in gemini_client.generate_content_stream_async('prompt')])
+
+        self.assertEqual(text, '{"title": "Quiz"}')
+        self.assertEqual(start_stream.call_count, 2)
+
+    def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        started = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
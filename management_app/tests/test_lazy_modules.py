@@ -0,0 +1,50 @@
+import sys
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from management_app.benchmarks.startup import measure_startup, parse_importtime
+from management_app.utils.lazy_modules import HEAVY_MODULES, LazyModule
+
+IMPORTTIME_OUTPUT = '''import time: self [us] | cumulative | imported package
+import time:       162 |        162 |   _io
+import time:      1439 |       1601 | site
+import time:       500 |        500 |     whisper.audio
+import time:      2000 |       2500 |   whisper
+import time:       262 |       2762 | management_app.utils.youtube_quiz_creator
+'''
+
+
+class LazyModuleTests(SimpleTestCase):
+    def test_imports_on_first_attribute_access(self):
+        with mock.patch.dict(sys.modules):
+            sys.modules.pop('colorsys', None)
+            colorsys = LazyModule('colorsys')
+            self.assertNotIn('colorsys', sys.modules)
+            self.assertIn('not loaded yet', repr(colorsys))
+
+            self.assertEqual(colorsys.rgb_to_hsv(1, 0, 0), (0.0, 1.0, 1))
+            self.assertIs(colorsys.rgb_to_hsv, sys.modules['colorsys'].rgb_to_hsv)
+
+    def test_patching_acts_on_the_real_module(self):
+        import json
+
+        lazy_json = LazyModule('json')
+        with mock.patch.object(lazy_json, 'dumps', return_value='patched'):
+            self.assertEqual(json.dumps({}), 'patched')
+        self.assertEqual(json.dumps({}), '{}')
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        modules, total = parse_importtime(IMPORTTIME_OUTPUT)
+
+        self.assertEqual(modules['whisper'], 2500)
+        self.assertEqual(modules['whisper.audio'], 500)
+        self.assertEqual(total, 1601 + 2762)
+
+    def test_web_workers_do_not_load_heavy_modules(self):
+        results = measure_startup('core.urls')
+
+        self.assertIn('management_app.api.views', results['modules'])
+        self.assertEqual([name for name in HEAVY_MODULES if name in results['modules']], [])
@@ -0,0 +1,134 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from management_app.utils import pipeline_metrics, youtube_quiz_creator
+from management_app.utils.pipeline_metrics import Histogram, pipeline_trace, stage_span
+
+from .helpers import TempCacheDirMixin
+
+GEMINI_RESPONSE = json.dumps({
+    'title': 'Sample Quiz',
+    'description': 'A sample quiz.',
+    'questions': [{
+        'question_title': 'Sample Question?',
+        'question_options': ['Option 1', 'Option 2', 'Option 3', 'Option 4'],
+        'answer': 'Option 1',
+    }],
+})
+
+
+class HistogramTests(SimpleTestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('test_seconds', 'Test.', ['stage'], (1, 5))
+        histogram.observe(0.5, stage='a')
+        histogram.observe(3, stage='a')
+        histogram.observe(10, stage='a')
+
+        lines = histogram.render()
+
+        self.assertIn('test_seconds_bucket{stage="a",le="1"} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="5"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_sum{stage="a"} 13.5', lines)
+        self.assertIn('test_seconds_count{stage="a"} 3', lines)
+
+
+class StageSpanTests(SimpleTestCase):
+    def setUp(self):
+        self.duration = Histogram('duration', '', ['stage', 'outcome'], (1,))
+        self.tokens = Histogram('tokens', '', ['stage'], (10,))
+        patches = [
+            mock.patch.object(pipeline_metrics, 'STAGE_DURATION', self.duration),
+            mock.patch.dict(pipeline_metrics.ATTRIBUTE_HISTOGRAMS, {'transcript_tokens': self.tokens}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_records_duration_outcome_and_attributes(self):
+        with stage_span('generate') as span:
+            span['transcript_tokens'] = 42
+
+        with self.assertRaises(ValueError):
+            with stage_span('generate'):
+                raise ValueError
+
+        self.assertIn(('generate', 'success'), self.duration.series)
+        self.assertIn(('generate', 'error'), self.duration.series)
+        self.assertEqual(self.tokens.series[('generate',)][1], 42)
+
+    @override_settings(PIPELINE_TRACE_LOG=True)
+    def test_trace_logs_spans_as_json(self):
+        with self.assertLogs('management_app.pipeline', 'INFO') as logs:
+            with pipeline_trace('create_quiz', video_id='abc'):
+                with stage_span('download') as span:
+                    span['download_bytes'] = 100
+                with stage_span('save'):
+                    pass
+
+        trace = json.loads(logs.records[0].getMessage())
+        self.assertEqual(trace['video_id'], 'abc')
+        self.assertEqual(trace['outcome'], 'success')
+        self.assertEqual([span['stage'] for span in trace['spans']], ['download', 'save'])
+        self.assertEqual(trace['spans'][0]['download_bytes'], 100)
+
+    def test_trace_is_not_logged_by_default(self):
+        with mock.patch.object(pipeline_metrics.trace_logger, 'info') as info:
+            with pipeline_trace('create_quiz'):
+                with stage_span('save'):
+                    pass
+        info.assert_not_called()
+
+
+class PipelineInstrumentationTests(TempCacheDirMixin, TestCase):
+    def test_quiz_creation_records_every_stage(self):
+        user = User.objects.create_user(username='metrics', password='secret')
+        duration = Histogram('duration', '', ['stage', 'outcome'], (1,))
+        with mock.patch.object(pipeline_metrics, 'STAGE_DURATION', duration), \
+                mock.patch.object(youtube_quiz_creator.transcript_cache, 'get_transcript',
+                                  return_value='A transcript.'), \
+                mock.patch.object(youtube_quiz_creator.gemini_client, 'generate_content',
+                                  return_value=mock.Mock(text=GEMINI_RESPONSE)):
+            youtube_quiz_creator.create_quiz_from_url('https://youtu.be/dQw4w9WgXcQ', user)
+
+        self.assertEqual(
+            {stage for stage, outcome in duration.series},
+            {'generate', 'parse', 'save'},
+        )
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(DEBUG=True)
+    def test_metrics_are_served_to_local_requests(self):
+        with stage_span('download'):
+            pass
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn('quizly_pipeline_stage_duration_seconds_count{stage="download",outcome="success"}', content)
+        self.assertIn('quizly_gemini_calls_total', content)
+        self.assertIn('quizly_transcript_cache_hits_total', content)
+        self.assertIn('quizly_quiz_cache_hit_rate', content)
+
+    @override_settings(DEBUG=True)
+    def test_metrics_are_forbidden_for_other_addresses(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics_require_a_token_without_debug(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret-token')
+    def test_metrics_token_is_required_if_set(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret-token')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret-tökén')
+        self.assertEqual(response.status_code, 403)
@@ -1,8 +1,11 @@
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.test import override_settings
 
-from management_app.models import Quiz, QuizQuestion
+from management_app.models import Quiz, QuizQuestion, QuizJob
+from management_app.utils.quiz_persistence import save_quiz
+from .helpers import QUIZ_CONTENT
 
 
 class QuizTests(APITestCase):
@@ -27,18 +30,96 @@ class QuizTests(APITestCase):
             quiz=self.quiz
         )
 
+    @override_settings(QUIZ_JOB_WORKERS=0)
     def test_create_quiz(self):
         url = reverse('create_quiz')
         data = {
             'url': 'https://www.youtube.com/watch?v=PPzIWFJU_3s'
         }
         response = self.client.post(url, data, format='json')
-        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], QuizJob.STATUS_QUEUED)
+        self.assertEqual(response['Location'], reverse(
+            'quiz_job_detail', kwargs={'pk': response.data['id']}))
+
+    def test_create_quiz_without_url(self):
+        response = self.client.post(reverse('create_quiz'), {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_quiz_with_invalid_url(self):
+        for url in ['http://[::1', ['https://youtu.be/dQw4w9WgXcQ'], 42]:
+            response = self.client.post(reverse('create_quiz'), {'url': url}, format='json')
+            self.assertEqual(response.status_code, 400)
 
     def test_get_quizzes(self):
         url = reverse('quiz_list')
         response = self.client.get(url, format='json')
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(len(response.json()['results'][0]['questions']), 1)
+
+    def test_get_quizzes_only_returns_own_quizzes(self):
+        other_user = User.objects.create_user(username='otheruser', password='otherpass')
+        Quiz.objects.create(title='Other Quiz', user=other_user, description='Not mine.',
+                            video_url='http://example.com/video')
+        response = self.client.get(reverse('quiz_list'), format='json')
+        self.assertEqual([quiz['id'] for quiz in response.json()['results']], [self.quiz.id])
+
+    def test_get_quizzes_without_n_plus_one_queries(self):
+        for number in range(5):
+            quiz = Quiz.objects.create(title=f'Quiz {number}', user=self.user, description='More.',
+                                       video_url='http://example.com/video')
+            QuizQuestion.objects.create(question_title='Question', question_options=['A', 'B'],
+                                        answer='A', quiz=quiz)
+        # authentication, validators, quizzes, questions
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('quiz_list'), format='json')
+        self.assertEqual(len(response.json()['results']), 6)
+
+    def test_get_quizzes_with_shared_content(self):
+        save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        # authentication, validators, quizzes with their content, own questions, shared questions
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('quiz_list'), format='json')
+        shared_quiz, own_quiz = response.json()['results']
+        self.assertEqual(shared_quiz['video_id'], 'PPzIWFJU_3s')
+        self.assertEqual(len(shared_quiz['questions']), 1)
+        self.assertEqual(len(own_quiz['questions']), 1)
+
+    def test_update_quiz_with_shared_content_only_changes_own_copy(self):
+        quiz = save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        other_user = User.objects.create_user(username='otheruser', password='otherpass')
+        other_quiz = save_quiz(QUIZ_CONTENT, other_user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+
+        response = self.client.patch(reverse('quiz_detail', kwargs={'pk': quiz.id}),
+                                     {'title': 'My Quiz'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['questions']), 1)
+        quiz.refresh_from_db()
+        other_quiz.refresh_from_db()
+        self.assertEqual(quiz.title, 'My Quiz')
+        self.assertEqual(other_quiz.title, 'Sample Quiz')
+        # The questions are read-only, so both quizzes keep sharing them.
+        self.assertEqual(quiz.content_id, other_quiz.content_id)
+        self.assertEqual(quiz.questions.count(), 0)
+
+    def test_get_quizzes_summary(self):
+        response = self.client.get(reverse('quiz_list'), {'summary': 'true'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('questions', response.data['results'][0])
+
+    def test_get_quizzes_pagination(self):
+        for number in range(3):
+            Quiz.objects.create(title=f'Quiz {number}', user=self.user, description='More.',
+                                video_url='http://example.com/video')
+        response = self.client.get(reverse('quiz_list'), {'page_size': 2}, format='json')
+        self.assertEqual([quiz['title'] for quiz in response.json()['results']], ['Quiz 2', 'Quiz 1'])
+
+        next_response = self.client.get(response.json()['next'], format='json')
+        self.assertEqual([quiz['title'] for quiz in next_response.json()['results']],
+                         ['Quiz 0', 'Sample Quiz'])
+        self.assertIsNone(next_response.json()['next'])
 
     def test_get_quiz_detail(self):
         detail_url = reverse('quiz_detail', kwargs={'pk': self.quiz.id})
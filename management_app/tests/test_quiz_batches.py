@@ -0,0 +1,124 @@
+import time
+from unittest import mock
+
+from rest_framework.test import APITestCase, APITransactionTestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from management_app.models import Quiz, QuizBatch, QuizJob
+from management_app.tests.helpers import QUIZ_CONTENT, TempCacheDirMixin
+from management_app.utils import quiz_batches, quiz_jobs
+
+URLS = [
+    'https://www.youtube.com/watch?v=PPzIWFJU_3s',
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://www.youtube.com/shorts/abcdefghijk',
+]
+
+
+class BatchTestMixin:
+    def login(self):
+        """
+        Registrates the testuser for the testcase and authenticates the client.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.cookies.get('access_token').value)
+
+
+@override_settings(QUIZ_JOB_WORKERS=0)
+class CreateQuizBatchTests(BatchTestMixin, APITestCase):
+    def setUp(self):
+        self.login()
+
+    def test_create_batch(self):
+        urls = URLS + ['not a url', 'https://www.youtube.com/watch?v=dQw4w9WgXcQ']
+        response = self.client.post(reverse('create_quiz_batch'), {'urls': urls}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        batch = QuizBatch.objects.get()
+        self.assertEqual(response['Location'], reverse('quiz_batch_detail', kwargs={'pk': batch.pk}))
+        self.assertEqual([item['video_url'] for item in response.data['items']], URLS)
+        self.assertEqual(response.data['summary'][QuizJob.STATUS_QUEUED], 3)
+        self.assertEqual([item['detail'] for item in response.data['rejected']], ['Ungültige URL', 'Doppelte URL'])
+
+    def test_create_batch_with_invalid_data(self):
+        for data in [{}, {'urls': []}, {'urls': 'https://youtu.be/dQw4w9WgXcQ'}, {'urls': ['not a url']}, {'urls': ['http://[::1']}]:
+            response = self.client.post(reverse('create_quiz_batch'), data, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuizBatch.objects.exists())
+
+    @override_settings(QUIZ_BATCH_MAX_URLS=2)
+    def test_create_batch_with_too_many_urls(self):
+        response = self.client.post(reverse('create_quiz_batch'), {'urls': URLS}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_of_other_user(self):
+        other_user = User.objects.create_user(username='otheruser', password='otherpass')
+        batch = quiz_batches.enqueue_quiz_batch(URLS, other_user)
+        response = self.client.get(reverse('quiz_batch_detail', kwargs={'pk': batch.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_job_workers_leave_batch_jobs_to_the_pipeline(self):
+        quiz_batches.enqueue_quiz_batch(URLS, self.user)
+        self.assertIsNone(quiz_jobs.claim_next_job())
+        self.assertIsNotNone(quiz_jobs.claim_next_job(batch=True))
+
+
+@override_settings(QUIZ_JOB_WORKERS=0, QUIZ_BATCH_DOWNLOAD_WORKERS=3, QUIZ_BATCH_GENERATE_WORKERS=2)
+class RunBatchJobsTests(TempCacheDirMixin, BatchTestMixin, APITransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.login()
+
+    def test_every_item_reports_its_result(self):
+        def fetch_audio(url, video_id, scratch, progress):
+            if video_id == 'dQw4w9WgXcQ':
+                raise RuntimeError('Error downloading audio')
+            progress('download', 1)
+            return '/tmp/audio', None
+
+        batch = quiz_batches.enqueue_quiz_batch(URLS, self.user)
+        with mock.patch.object(quiz_batches.transcript_cache, 'get_transcript', return_value=None), \
+                mock.patch.object(quiz_batches, 'fetch_audio', side_effect=fetch_audio), \
+                mock.patch.object(quiz_batches, 'transcribe_audio', return_value='A transcript.') as transcribe, \
+                mock.patch.object(quiz_batches, 'generate_quiz_from_transcript', return_value=QUIZ_CONTENT):
+            self.assertEqual(quiz_batches.run_batch_jobs(), 3)
+
+        self.assertEqual(transcribe.call_count, 2)
+        response = self.client.get(reverse('quiz_batch_detail', kwargs={'pk': batch.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary'], {'queued': 0, 'running': 0, 'done': 2, 'failed': 1})
+        items = {item['video_url']: item for item in response.data['items']}
+        self.assertEqual(items[URLS[1]]['error'], 'Error downloading audio')
+        self.assertEqual(Quiz.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(items[URLS[0]]['progress']['save'], 1)
+
+    def test_cached_transcripts_skip_download_and_transcription(self):
+        quiz_batches.enqueue_quiz_batch(URLS[:1], self.user)
+        with mock.patch.object(quiz_batches.transcript_cache, 'get_transcript', return_value='Cached.'), \
+                mock.patch.object(quiz_batches, 'fetch_audio') as fetch_audio, \
+                mock.patch.object(quiz_batches, 'generate_quiz_from_transcript', return_value=QUIZ_CONTENT) as generate:
+            quiz_batches.run_batch_jobs()
+
+        fetch_audio.assert_not_called()
+        generate.assert_called_once()
+        self.assertEqual(QuizJob.objects.get().status, QuizJob.STATUS_DONE)
+
+    def test_jobs_of_the_same_video_share_one_generation(self):
+        def generate_slowly(transcript, progress):
+            time.sleep(0.3)
+            return QUIZ_CONTENT
+
+        other_user = User.objects.create_user(username='otheruser', password='otherpass')
+        quiz_batches.enqueue_quiz_batch(URLS[:1], self.user)
+        quiz_batches.enqueue_quiz_batch(URLS[:1], other_user)
+        with mock.patch.object(quiz_batches.transcript_cache, 'get_transcript', return_value='Cached.'), \
+                mock.patch.object(quiz_batches, 'generate_quiz_from_transcript', side_effect=generate_slowly) as generate:
+            self.assertEqual(quiz_batches.run_batch_jobs(), 2)
+
+        generate.assert_called_once()
+        self.assertEqual(set(QuizJob.objects.values_list('status', flat=True)), {QuizJob.STATUS_DONE})
+        self.assertEqual(Quiz.objects.count(), 2)
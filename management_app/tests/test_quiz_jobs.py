@@ -0,0 +1,140 @@
+from datetime import timedelta
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone
+
+from management_app.models import Quiz, QuizJob, QuizJobEvent
+from management_app.utils import quiz_batches, quiz_jobs
+
+
+@override_settings(QUIZ_JOB_WORKERS=0)
+class QuizJobTests(APITestCase):
+    def setUp(self):
+        """
+        Registrates the testuser for the testcase and queues a test job.
+        """
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        self.access_token = response.cookies.get('access_token').value
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + self.access_token)
+        self.job = QuizJob.objects.create(
+            video_url='https://www.youtube.com/watch?v=PPzIWFJU_3s', user=self.user)
+
+    def test_get_job_detail(self):
+        url = reverse('quiz_job_detail', kwargs={'pk': self.job.id})
+        with mock.patch.object(quiz_jobs, 'start_workers') as start_workers, \
+                mock.patch.object(quiz_batches, 'start_batch_pipeline') as start_batch_pipeline:
+            response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], QuizJob.STATUS_QUEUED)
+        start_workers.assert_not_called()
+        start_batch_pipeline.assert_not_called()
+
+    def test_get_job_detail_of_other_user(self):
+        other_user = User.objects.create_user(username='otheruser', password='otherpass')
+        other_job = QuizJob.objects.create(video_url='http://example.com/video', user=other_user)
+        url = reverse('quiz_job_detail', kwargs={'pk': other_job.id})
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_run_pending_jobs_stores_quiz(self):
+        quiz = Quiz.objects.create(
+            title='Sample Quiz', user=self.user, description='A sample quiz for testing.',
+            video_url=self.job.video_url)
+
+        def fake_pipeline(url, user, progress):
+            progress('download', 1)
+            return quiz
+
+        with mock.patch.object(quiz_jobs, 'create_quiz_from_url', side_effect=fake_pipeline):
+            self.assertEqual(quiz_jobs.run_pending_jobs(), 1)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizJob.STATUS_DONE)
+        self.assertEqual(self.job.quiz, quiz)
+        self.assertEqual(self.job.progress, {'download': 1})
+        self.assertEqual(list(self.job.events.values_list('stage', flat=True)), ['download', 'done'])
+
+    def test_run_pending_jobs_stores_error(self):
+        with mock.patch.object(quiz_jobs, 'create_quiz_from_url',
+                               side_effect=RuntimeError('Error downloading audio')):
+            quiz_jobs.run_pending_jobs()
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizJob.STATUS_FAILED)
+        self.assertEqual(self.job.error, 'Error downloading audio')
+
+    def test_requeue_stale_jobs(self):
+        QuizJob.objects.filter(pk=self.job.pk).update(
+            status=QuizJob.STATUS_RUNNING, worker='otherhost:1',
+            updated_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(quiz_jobs.requeue_stale_jobs(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizJob.STATUS_QUEUED)
+
+    def test_autostart_starts_workers_when_the_app_is_ready(self):
+        app_config = apps.get_app_config('management_app')
+        with mock.patch('management_app.apps.threading.Thread') as thread:
+            with override_settings(QUIZ_JOB_AUTOSTART=False):
+                app_config.ready()
+            thread.assert_not_called()
+            with override_settings(QUIZ_JOB_AUTOSTART=True):
+                app_config.ready()
+        thread.assert_any_call(target=quiz_jobs.start_workers, name='quiz-job-start', daemon=True)
+        thread.assert_any_call(target=quiz_batches.start_batch_pipeline, name='quiz-batch-start', daemon=True)
+        self.assertEqual(thread.return_value.start.call_count, 2)
+
+    @override_settings(QUIZ_JOB_EVENTS_RETENTION_SECONDS=60)
+    def test_progress_events_of_finished_jobs_are_pruned(self):
+        quiz_jobs.ProgressPublisher(self.job)('download', 0)
+        quiz_jobs.finish_job(self.job, error=RuntimeError('Error downloading audio'))
+        self.assertEqual(self.job.events.count(), 2)
+
+        QuizJob.objects.filter(pk=self.job.pk).update(updated_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(quiz_jobs.prune_job_events(), 1)
+        self.assertEqual(list(self.job.events.values_list('stage', flat=True)), [QuizJob.STATUS_FAILED])
+
+    def test_progress_events_are_throttled(self):
+        publish = quiz_jobs.ProgressPublisher(self.job)
+        for fraction in [0, 0.01, 0.02, 0.06, 0.07, 0.5, 1, 1]:
+            publish('download', fraction)
+
+        self.assertEqual(list(self.job.events.values_list('progress', flat=True)), [0, 0.06, 0.5, 1])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.stage, 'download')
+        self.assertEqual(self.job.progress, {'download': 1})
+
+    @override_settings(QUIZ_JOB_EVENTS_POLL_SECONDS=0)
+    async def test_job_event_stream(self):
+        quiz = await Quiz.objects.acreate(
+            title='Sample Quiz', user=self.user, description='A sample quiz for testing.',
+            video_url=self.job.video_url)
+        await QuizJob.objects.filter(pk=self.job.pk).aupdate(status=QuizJob.STATUS_DONE, quiz=quiz)
+        first = await QuizJobEvent.objects.acreate(job=self.job, stage='download', progress=0.5)
+        await QuizJobEvent.objects.acreate(job=self.job, stage='transcribe', progress=0)
+        await QuizJobEvent.objects.acreate(job=self.job, stage=QuizJob.STATUS_DONE, progress=1)
+
+        url = reverse('quiz_job_events', kwargs={'pk': self.job.id})
+        response = await self.async_client.get(
+            url, headers={'Authorization': 'Bearer ' + self.access_token,
+                          'Last-Event-ID': str(first.id)})
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('"download"', content)
+        self.assertIn('event: progress', content)
+        self.assertIn('"stage": "transcribe"', content)
+        self.assertIn(f'event: done\ndata: {{"quiz_id": {quiz.id}}}', content)
+
+    async def test_job_event_stream_requires_authentication(self):
+        url = reverse('quiz_job_events', kwargs={'pk': self.job.id})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,100 @@
+import copy
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from management_app.models import Quiz, QuizContent, QuizQuestion
+from management_app.utils import youtube_quiz_creator
+from management_app.utils.quiz_persistence import save_quiz, save_quizzes
+from .helpers import quiz_content
+
+QUIZ_CONTENT = quiz_content(10)
+
+
+class QuizPersistenceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+
+    def test_save_quiz_stores_all_questions(self):
+        quiz = save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        self.assertEqual(quiz.title, 'Sample Quiz')
+        self.assertEqual(quiz.question_list.count(), 10)
+        self.assertIsNotNone(quiz.question_list.first().created_at)
+
+    def test_save_quizzes_uses_bulk_inserts(self):
+        items = [(QUIZ_CONTENT, self.user, 'http://example.com/video')] * 100
+        with CaptureQueriesContext(connection) as queries:
+            quizzes = save_quizzes(items)
+
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertLess(len(inserts), 10)
+        self.assertEqual(len(quizzes), 100)
+        self.assertEqual(QuizQuestion.objects.count(), 1000)
+
+    def test_invalid_content_stores_nothing(self):
+        invalid_content = copy.deepcopy(QUIZ_CONTENT)
+        invalid_content['questions'][9]['answer'] = 'Option 5'
+        items = [(QUIZ_CONTENT, self.user, 'http://example.com/video'),
+                 (invalid_content, self.user, 'http://example.com/video')]
+
+        with self.assertRaisesMessage(RuntimeError, 'the answer of question 10 is not an option'):
+            save_quizzes(items)
+        self.assertFalse(Quiz.objects.exists())
+        self.assertFalse(QuizQuestion.objects.exists())
+
+    def test_missing_fields_are_rejected(self):
+        for key in ('title', 'description', 'questions'):
+            invalid_content = copy.deepcopy(QUIZ_CONTENT)
+            del invalid_content[key]
+            with self.subTest(key=key), self.assertRaises(RuntimeError):
+                save_quiz(invalid_content, self.user, 'http://example.com/video')
+
+
+class SharedQuizContentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.other_user = User.objects.create_user(username='otheruser', password='otherpass')
+
+    def test_quizzes_of_the_same_video_share_their_questions(self):
+        first = save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        second = save_quiz(QUIZ_CONTENT, self.other_user, 'https://youtu.be/PPzIWFJU_3s')
+
+        self.assertEqual(first.video_id, 'PPzIWFJU_3s')
+        self.assertEqual(first.content_id, second.content_id)
+        self.assertEqual(QuizContent.objects.count(), 1)
+        self.assertEqual(QuizQuestion.objects.count(), 10)
+        self.assertEqual(second.question_list.count(), 10)
+
+    def test_differing_content_keeps_own_questions(self):
+        save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        other_content = copy.deepcopy(QUIZ_CONTENT)
+        other_content['title'] = 'Generated at the same time'
+        quiz = save_quiz(other_content, self.other_user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+
+        self.assertIsNone(quiz.content)
+        self.assertEqual(quiz.title, 'Generated at the same time')
+        self.assertEqual(quiz.questions.count(), 10)
+
+    def test_repeat_creation_uses_stored_content(self):
+        save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+
+        with mock.patch.object(youtube_quiz_creator, 'transcribe_video') as transcribe, \
+                mock.patch.object(youtube_quiz_creator, 'get_ai_response') as ai_response:
+            quiz = youtube_quiz_creator.create_quiz_from_url(
+                'https://m.youtube.com/watch?v=PPzIWFJU_3s', self.other_user)
+
+        transcribe.assert_not_called()
+        ai_response.assert_not_called()
+        self.assertEqual(quiz.user, self.other_user)
+        self.assertEqual(quiz.title, 'Sample Quiz')
+        self.assertEqual(quiz.question_list.count(), 10)
+
+    def test_question_needs_exactly_one_owner(self):
+        quiz = save_quiz(QUIZ_CONTENT, self.user, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        for owners in ({}, {'quiz': quiz, 'content': quiz.content}):
+            with self.subTest(owners=owners), self.assertRaises(IntegrityError), transaction.atomic():
+                QuizQuestion.objects.create(question_title='Question?', question_options=['A', 'B'],
+                                            answer='A', **owners)
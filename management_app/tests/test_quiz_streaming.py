@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+
+from management_app.models import Quiz, QuizJob
+from management_app.utils import quiz_streaming, single_flight
+from management_app.utils.quiz_streaming import IncrementalQuizParser
+
+from .helpers import TempCacheDirMixin
+
+GEMINI_RESPONSE = '```json\n' + json.dumps({
+    'title': 'Sample "Quiz"',
+    'description': 'A sample quiz, with {braces}.',
+    'questions': [
+        {
+            'question_title': f'Sample Question {number}?',
+            'question_options': ['Option 1', 'Option 2', 'Option [3]', 'Option 4'],
+            'answer': 'Option 1',
+        }
+        for number in range(3)
+    ],
+}, indent=2) + '\n```'
+
+
+def chunks(text, size=7):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def parse_events(content: str):
+    events = []
+    for block in content.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class IncrementalQuizParserTests(SimpleTestCase):
+    def test_values_are_emitted_as_soon_as_complete(self):
+        parser = IncrementalQuizParser()
+        events = []
+        for number, chunk in enumerate(chunks(GEMINI_RESPONSE)):
+            events.extend((number, event, data) for event, data in parser.feed(chunk))
+
+        self.assertEqual([event for _, event, _ in events],
+                         ['title', 'description', 'question', 'question', 'question'])
+        self.assertEqual(events[0][2], 'Sample "Quiz"')
+        self.assertEqual(events[2][2]['question_options'][2], 'Option [3]')
+        self.assertLess(events[2][0], events[3][0])
+
+    def test_text_after_the_quiz_is_ignored(self):
+        parser = IncrementalQuizParser()
+        events = parser.feed('{"title": "Quiz", "questions": []}\n```\n{"title": "Other"}')
+        self.assertEqual(events, [('title', 'Quiz')])
+
+
+class QuizStreamTests(TempCacheDirMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        """
+        Registrates the testuser for the testcase.
+        """
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        access_token = response.cookies.get('access_token').value
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + access_token)
+
+    def stream(self, url='https://youtu.be/PPzIWFJU_3s'):
+        response = self.client.get(reverse('create_quiz_stream'), {'url': url}, HTTP_ACCEPT='text/event-stream')
+        return parse_events(b''.join(response.streaming_content).decode())
+
+    def test_stream_quiz(self):
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream',
+                                  return_value=iter(chunks(GEMINI_RESPONSE))):
+            response = self.client.get(
+                reverse('create_quiz_stream'), {'url': 'https://youtu.be/PPzIWFJU_3s'},
+                HTTP_ACCEPT='text/event-stream')
+            content = b''.join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = parse_events(content)
+        self.assertEqual([event for event, _ in events],
+                         ['stage', 'stage', 'title', 'description', 'question', 'question',
+                          'question', 'stage', 'done'])
+        quiz = Quiz.objects.get(pk=events[-1][1]['quiz_id'])
+        self.assertEqual(quiz.question_list.count(), 3)
+        self.assertGreaterEqual(quiz_streaming.streaming_stats()['time_to_first_question_count'], 1)
+
+    def test_stream_uses_stored_content(self):
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream',
+                                  return_value=iter(chunks(GEMINI_RESPONSE))) as generate:
+            for _ in range(2):
+                response = self.client.get(
+                    reverse('create_quiz_stream'), {'url': 'https://youtu.be/PPzIWFJU_3s'},
+                    HTTP_ACCEPT='text/event-stream')
+                events = parse_events(b''.join(response.streaming_content).decode())
+
+        generate.assert_called_once()
+        self.assertEqual([event for event, _ in events],
+                         ['title', 'description', 'question', 'question', 'question', 'stage', 'done'])
+        self.assertEqual(Quiz.objects.filter(content__isnull=False).count(), 2)
+
+    def test_stream_reports_errors(self):
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream',
+                                  return_value=iter(['{"title": "Quiz"'])):
+            response = self.client.get(
+                reverse('create_quiz_stream'), {'url': 'https://youtu.be/PPzIWFJU_3s'},
+                HTTP_ACCEPT='text/event-stream')
+            events = parse_events(b''.join(response.streaming_content).decode())
+
+        self.assertEqual(events[-1][0], 'error')
+        self.assertFalse(Quiz.objects.exists())
+
+    @override_settings(QUIZ_JOB_WORKERS=0)
+    def test_stream_without_transcript_hands_over_to_a_quiz_job(self):
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value=None), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream') as generate:
+            events = self.stream()
+
+        generate.assert_not_called()
+        job = QuizJob.objects.get()
+        self.assertEqual(events, [
+            ('stage', {'stage': 'transcribe'}),
+            ('job', {'job_id': job.pk, 'events_url': reverse('quiz_job_events', kwargs={'pk': job.pk})}),
+        ])
+
+    def test_stream_waits_for_a_running_generation_of_the_video(self):
+        content = json.loads(GEMINI_RESPONSE.strip('`json\n'))
+        leading = threading.Event()
+
+        def lead():
+            flight, _ = single_flight.lead_or_wait('PPzIWFJU_3s')
+            leading.set()
+            time.sleep(0.2)
+            flight.publish(content)
+            flight.release()
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        leading.wait()
+        with mock.patch.object(quiz_streaming.transcript_cache, 'get_transcript', return_value='Hello'), \
+                mock.patch.object(quiz_streaming.gemini_client, 'generate_content_stream') as generate:
+            events = self.stream()
+        leader.join()
+
+        generate.assert_not_called()
+        self.assertEqual([event for event, _ in events],
+                         ['stage', 'title', 'description', 'question', 'question', 'question', 'stage', 'done'])
+
+    def test_stream_invalid_url(self):
+        response = self.client.get(reverse('create_quiz_stream'), {'url': 'http://example.com/video'},
+                                   HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(parse_events(response.content.decode())[0][0], 'error')
+
+    def test_stream_url_that_is_not_a_string(self):
+        response = self.client.post(reverse('create_quiz_stream'), {'url': ['https://youtu.be/dQw4w9WgXcQ']},
+                                    format='json', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,95 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from management_app.api import response_cache
+from management_app.models import Quiz, QuizQuestion
+from management_app.utils.quiz_persistence import save_quiz
+from .helpers import QUIZ_CONTENT
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        """
+        Logs in the testuser and starts every test with an empty response cache.
+        """
+        caches[response_cache.CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.cookies.get('access_token').value)
+        self.quiz = Quiz.objects.create(
+            title='Sample Quiz', user=self.user, description='A sample quiz for testing.',
+            video_url='http://example.com/video')
+        self.question = QuizQuestion.objects.create(
+            question_title='Sample Question', question_options=['A', 'B'], answer='A', quiz=self.quiz)
+        self.detail_url = reverse('quiz_detail', kwargs={'pk': self.quiz.id})
+
+    def test_second_list_request_is_served_from_the_cache(self):
+        before = response_cache.cache_stats()
+        first = self.client.get(reverse('quiz_list'))
+        # the user is cached by the authentication; validators and quizzes remain, the questions come from the cache
+        with self.assertNumQueries(2):
+            second = self.client.get(reverse('quiz_list'))
+
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.json()['results'][0]['questions'][0]['question_title'], 'Sample Question')
+        stats = response_cache.cache_stats()
+        self.assertEqual(stats['misses'] - before['misses'], 1)
+        self.assertEqual(stats['hits'] - before['hits'], 1)
+        self.assertGreater(stats['hit_rate'], 0)
+
+    def test_detail_and_list_share_rendered_quizzes(self):
+        detail = self.client.get(self.detail_url)
+        listed = self.client.get(reverse('quiz_list'))
+
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(listed.json()['results'], [detail.json()])
+
+    def test_changed_question_is_rendered_again(self):
+        self.client.get(self.detail_url)
+        # update() sends no signals, like a change made by another process.
+        QuizQuestion.objects.filter(pk=self.question.pk).update(
+            question_title='Changed Question', updated_at=timezone.now())
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.json()['questions'][0]['question_title'], 'Changed Question')
+
+    def test_deleted_question_is_rendered_again(self):
+        QuizQuestion.objects.create(question_title='Second Question', question_options=['A', 'B'], answer='A',
+                                    quiz=self.quiz)
+        self.assertEqual(len(self.client.get(self.detail_url).json()['questions']), 2)
+        QuizQuestion.objects.filter(pk=self.question.pk).delete()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual([question['question_title'] for question in response.json()['questions']],
+                         ['Second Question'])
+
+    def test_updated_quiz_is_rendered_again(self):
+        self.client.get(self.detail_url)
+        self.client.patch(self.detail_url, {'title': 'Updated Quiz'}, format='json')
+
+        self.assertEqual(self.client.get(self.detail_url).json()['title'], 'Updated Quiz')
+        self.assertEqual(self.client.get(reverse('quiz_list')).json()['results'][0]['title'], 'Updated Quiz')
+
+    def test_cached_quizzes_go_through_content_negotiation(self):
+        response = self.client.get(self.detail_url, HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Sample Question', response.content)
+
+        response = self.client.get(self.detail_url, HTTP_ACCEPT='application/xml')
+        self.assertEqual(response.status_code, 406)
+
+    def test_changed_shared_question_is_rendered_again_for_every_quiz_using_it(self):
+        other_user = User.objects.create_user(username='otheruser', password='otherpass')
+        url = 'https://www.youtube.com/watch?v=PPzIWFJU_3s'
+        quiz = save_quiz(QUIZ_CONTENT, self.user, url)
+        other_quiz = save_quiz(QUIZ_CONTENT, other_user, url)
+        response_cache.render_quizzes([quiz, other_quiz])
+
+        quiz.content.questions.update(question_title='Changed?', updated_at=timezone.now())
+
+        for rendered in response_cache.render_quizzes(list(Quiz.objects.filter(pk__in=[quiz.pk, other_quiz.pk]))):
+            self.assertIn(b'Changed?', rendered)
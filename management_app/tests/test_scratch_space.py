@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from management_app.utils import scratch_space, youtube_quiz_creator
+from management_app.utils.scratch_space import open_scratch_area, scratch_area, sweep_stale_areas
+
+
+class ScratchSpaceTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        patch = override_settings(SCRATCH_DIR=self.root, SCRATCH_MAX_BYTES=100, SCRATCH_RESERVE_BYTES=60,
+                                  SCRATCH_WAIT_SECONDS=5)
+        patch.enable()
+        self.addCleanup(patch.disable)
+
+    def test_area_is_removed_on_errors(self):
+        with self.assertRaises(ValueError):
+            with scratch_area() as scratch:
+                with open(scratch.file('audio.webm'), 'wb') as audio:
+                    audio.write(b'audio')
+                self.assertTrue(scratch.path.startswith(os.path.join(self.root, f'{os.getpid()}-')))
+                raise ValueError
+        self.assertEqual(scratch_space.used_bytes(), 0)
+        self.assertEqual(os.listdir(self.root), [scratch_space.LOCK_NAME])
+        self.assertEqual(scratch_space.scratch_stats()['areas'], 0)
+
+    def test_transcription_errors_remove_the_download(self):
+        def download(url, tmp_audiofile, progress=None):
+            with open(tmp_audiofile + '.webm', 'wb') as audio:
+                audio.write(b'audio')
+            return tmp_audiofile + '.webm'
+
+        with mock.patch.object(youtube_quiz_creator.transcript_cache, 'get_audio_file', return_value=None), \
+                mock.patch.object(youtube_quiz_creator, 'download_audio_from_video', side_effect=download), \
+                mock.patch.object(youtube_quiz_creator, 'generate_transcript', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                youtube_quiz_creator.transcribe_video(
+                    'https://youtu.be/dQw4w9WgXcQ', 'dQw4w9WgXcQ', lambda stage, fraction: None)
+        self.assertEqual(scratch_space.used_bytes(), 0)
+        self.assertEqual(os.listdir(self.root), [scratch_space.LOCK_NAME])
+
+    def test_full_quota_makes_new_areas_wait(self):
+        first = open_scratch_area()
+        opened = threading.Event()
+
+        def open_second():
+            with scratch_area():
+                opened.set()
+
+        thread = threading.Thread(target=open_second)
+        thread.start()
+        self.assertFalse(opened.wait(0.3))
+        first.close()
+        self.assertTrue(opened.wait(2))
+        thread.join()
+
+    def test_written_bytes_count_against_the_quota(self):
+        with scratch_area(reserve_bytes=0) as scratch:
+            with open(scratch.file('audio.webm'), 'wb') as audio:
+                audio.write(b'x' * 80)
+            self.assertEqual(scratch_space.used_bytes(), 80)
+            with override_settings(SCRATCH_WAIT_SECONDS=0.1):
+                with self.assertRaisesMessage(RuntimeError, 'quota exceeded'):
+                    open_scratch_area(reserve_bytes=30)
+
+    def test_reservations_of_other_processes_count_against_the_quota(self):
+        os.makedirs(os.path.join(self.root, f'{os.getppid()}-60-{"0" * 32}'))
+        self.assertEqual(scratch_space.used_bytes(), 60)
+        with override_settings(SCRATCH_WAIT_SECONDS=0.1):
+            with self.assertRaisesMessage(RuntimeError, 'quota exceeded'):
+                open_scratch_area()
+
+    def test_single_area_larger_than_the_quota_is_allowed(self):
+        with scratch_area(reserve_bytes=500):
+            pass
+
+    def test_sweeper_removes_areas_of_dead_processes(self):
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        dead = os.path.join(self.root, f'{process.pid}-leftover')
+        alive = os.path.join(self.root, f'{os.getppid()}-running')
+        for path in (dead, alive):
+            os.makedirs(path)
+            with open(os.path.join(path, 'audio.webm'), 'wb') as audio:
+                audio.write(b'audio')
+
+        self.assertEqual(sweep_stale_areas(self.root, force=True), 1)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(alive)])
+
+    @override_settings(SCRATCH_DIR='')
+    def test_default_directory(self):
+        with mock.patch.object(scratch_space, 'RAM_DIR', self.root), \
+                mock.patch.object(scratch_space, '_is_large_enough', return_value=True):
+            self.assertEqual(scratch_space.scratch_root(), os.path.join(self.root, scratch_space.DIR_NAME))
+        with mock.patch.object(scratch_space, '_is_large_enough', return_value=False), \
+                mock.patch.object(scratch_space.tempfile, 'gettempdir', return_value=self.root):
+            self.assertEqual(scratch_space.scratch_root(), os.path.join(self.root, scratch_space.DIR_NAME))
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from management_app.utils import single_flight
+
+from .helpers import TempCacheDirMixin
+
+
+class SingleFlightTests(TempCacheDirMixin, SimpleTestCase):
+    def run_concurrently(self, compute, callers=5):
+        results = []
+        leader_started = threading.Event()
+
+        def leader_compute():
+            leader_started.set()
+            return compute()
+
+        def call(function):
+            results.append(single_flight.run_once('PPzIWFJU_3s', function))
+
+        leader = threading.Thread(target=call, args=(leader_compute,))
+        leader.start()
+        leader_started.wait()
+        followers = [threading.Thread(target=call, args=(compute,)) for _ in range(callers - 1)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+        return results
+
+    def test_followers_share_the_result_of_the_leader(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.3)
+            return {'title': 'Sample Quiz'}
+
+        results = self.run_concurrently(compute)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'title': 'Sample Quiz'}] * 5)
+
+    def test_sequential_calls_compute_again(self):
+        self.assertEqual(single_flight.run_once('PPzIWFJU_3s', lambda: 1), 1)
+        self.assertEqual(single_flight.run_once('PPzIWFJU_3s', lambda: 2), 2)
+
+    def test_follower_takes_over_if_leader_fails(self):
+        def failing_compute():
+            time.sleep(0.3)
+            raise RuntimeError('Error downloading audio')
+
+        results = []
+        leader = threading.Thread(target=lambda: self.assertRaises(
+            RuntimeError, single_flight.run_once, 'PPzIWFJU_3s', failing_compute))
+        leader.start()
+        time.sleep(0.1)
+        results.append(single_flight.run_once('PPzIWFJU_3s', lambda: 'recovered'))
+        leader.join()
+        self.assertEqual(results, ['recovered'])
+
+    def test_publishing_removes_stale_results(self):
+        single_flight.run_once('PPzIWFJU_3s', lambda: 1)
+        stale_path = os.path.join(single_flight.single_flight_dir(), 'PPzIWFJU_3s.json')
+        stale_time = time.time() - settings.SINGLE_FLIGHT_TIMEOUT_SECONDS - 1
+        os.utime(stale_path, (stale_time, stale_time))
+
+        single_flight.run_once('dQw4w9WgXcQ', lambda: 2)
+        self.assertFalse(os.path.exists(stale_path))
+        self.assertTrue(os.path.exists(os.path.join(single_flight.single_flight_dir(), 'dQw4w9WgXcQ.json')))
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from management_app.utils.staged_pipeline import Stage, StagedPipeline
+
+
+class ConcurrencyProbe:
+    """
+    Stage function that records how many items it works on at the same time.
+    """
+
+    def __init__(self, seconds=0.02):
+        self.seconds = seconds
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, item):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running -= 1
+        item.append(threading.current_thread().name)
+
+
+class StagedPipelineTests(SimpleTestCase):
+    def run_pipeline(self, stages, items, queue_size=2):
+        done, failed = [], []
+        pipeline = StagedPipeline(
+            stages, on_done=done.append, on_error=lambda item, stage, error: failed.append((item, stage, error)),
+            queue_size=queue_size).start()
+        for item in items:
+            pipeline.submit(item)
+        pipeline.stop()
+        return done, failed
+
+    def test_every_stage_keeps_its_own_concurrency_limit(self):
+        download, transcribe = ConcurrencyProbe(), ConcurrencyProbe()
+        done, failed = self.run_pipeline(
+            [Stage('download', download, 4), Stage('transcribe', transcribe, 1)],
+            [[] for _ in range(12)])
+
+        self.assertEqual(len(done), 12)
+        self.assertEqual(failed, [])
+        self.assertEqual(transcribe.max_running, 1)
+        self.assertGreater(download.max_running, 1)
+        self.assertLessEqual(download.max_running, 4)
+        for item in done:
+            self.assertTrue(item[0].startswith('pipeline-download'))
+            self.assertTrue(item[1].startswith('pipeline-transcribe'))
+
+    def test_stages_can_be_skipped(self):
+        done, _ = self.run_pipeline(
+            [Stage('first', lambda item: 'third', 1), Stage('second', lambda item: item.append('second'), 1),
+             Stage('third', lambda item: item.append('third'), 1)],
+            [[]])
+        self.assertEqual(done, [['third']])
+
+    def test_errors_end_the_item(self):
+        def fail_odd(item):
+            if item[0] % 2:
+                raise ValueError('odd')
+
+        reached = []
+        done, failed = self.run_pipeline(
+            [Stage('check', fail_odd, 2), Stage('next', reached.append, 1)],
+            [[number] for number in range(6)])
+
+        self.assertEqual(sorted(item[0] for item in done), [0, 2, 4])
+        self.assertEqual(sorted(item[0] for item in reached), [0, 2, 4])
+        self.assertEqual(sorted((item[0], stage) for item, stage, error in failed),
+                         [(1, 'check'), (3, 'check'), (5, 'check')])
+
+    def test_full_queues_make_earlier_stages_wait(self):
+        slow = ConcurrencyProbe(seconds=0.05)
+        pipeline = StagedPipeline([Stage('fast', lambda item: None, 4), Stage('slow', slow, 1)],
+                                  on_done=lambda item: None, on_error=None, queue_size=1).start()
+        for _ in range(8):
+            pipeline.submit([])
+        self.assertLessEqual(sum(pipeline.stage_stats().values()), 2)
+        pipeline.stop()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from management_app.models import TranscriptCacheEntry
+from management_app.utils import transcript_cache, youtube_quiz_creator
+
+from .helpers import TempCacheDirMixin
+
+GEMINI_RESPONSE = '''```json
+{"title": "Sample Quiz", "description": "A sample quiz.", "questions": [
+  {"question_title": "Question?", "question_options": ["A", "B", "C", "D"], "answer": "A"}
+]}
+```'''
+
+
+@override_settings(WHISPER_MODEL='tiny', TRANSCRIPT_CACHE_STORE_AUDIO=False)
+class TranscriptCacheTests(TempCacheDirMixin, TestCase):
+    def test_cache_hit_and_miss(self):
+        stats_before = transcript_cache.cache_stats()
+        self.assertIsNone(transcript_cache.get_transcript('PPzIWFJU_3s'))
+        transcript_cache.store_transcript('PPzIWFJU_3s', 'Hello world')
+        self.assertEqual(transcript_cache.get_transcript('PPzIWFJU_3s'), 'Hello world')
+        self.assertIsNone(transcript_cache.get_transcript('PPzIWFJU_3s', model='large'))
+
+        stats = transcript_cache.cache_stats()
+        self.assertEqual(stats['hits'] - stats_before['hits'], 1)
+        self.assertEqual(stats['misses'] - stats_before['misses'], 2)
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(TranscriptCacheEntry.objects.get().hits, 1)
+
+    @override_settings(TRANSCRIPT_CACHE_MAX_BYTES=10)
+    def test_least_recently_used_entries_are_evicted(self):
+        transcript_cache.store_transcript('aaaaaaaaaaa', '12345')
+        transcript_cache.store_transcript('bbbbbbbbbbb', '12345')
+        transcript_cache.get_transcript('aaaaaaaaaaa')
+        transcript_cache.store_transcript('ccccccccccc', '12345')
+
+        self.assertEqual(
+            set(TranscriptCacheEntry.objects.values_list('video_id', flat=True)),
+            {'aaaaaaaaaaa', 'ccccccccccc'})
+
+    @override_settings(TRANSCRIPT_CACHE_STORE_AUDIO=True)
+    def test_audio_file_is_stored(self):
+        with tempfile.NamedTemporaryFile(suffix='.mp3') as audio:
+            audio.write(b'audio')
+            audio.flush()
+            transcript_cache.store_transcript('PPzIWFJU_3s', 'Hello world', audio.name)
+
+        cached_audio = transcript_cache.get_audio_file('PPzIWFJU_3s')
+        self.assertTrue(cached_audio.endswith('PPzIWFJU_3s.mp3'))
+        self.assertTrue(os.path.exists(cached_audio))
+        self.assertEqual(TranscriptCacheEntry.objects.get().size_bytes, len('Hello world') + 5)
+
+    def test_pipeline_skips_download_on_cache_hit(self):
+        user = User.objects.create_user(username='testuser', password='testpass')
+        transcript_cache.store_transcript('PPzIWFJU_3s', 'Hello world')
+
+        with mock.patch.object(youtube_quiz_creator, 'download_audio_from_video') as download, \
+                mock.patch.object(youtube_quiz_creator, 'get_ai_response',
+                                  return_value=SimpleNamespace(text=GEMINI_RESPONSE)) as ai_response:
+            quiz = youtube_quiz_creator.create_quiz_from_url('https://youtu.be/PPzIWFJU_3s?si=x', user)
+
+        download.assert_not_called()
+        ai_response.assert_called_once_with('Hello world')
+        self.assertEqual(quiz.video_url, 'https://www.youtube.com/watch?v=PPzIWFJU_3s')
+        self.assertEqual(quiz.question_list.count(), 1)
@@ -0,0 +1,79 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from management_app.utils import gemini_client, transcript_notes, youtube_quiz_creator
+from management_app.utils.tokens import count_tokens, split_by_tokens
+
+SENTENCE = 'The mitochondria is the powerhouse of the cell.'
+
+
+class SplitByTokensTests(SimpleTestCase):
+    def test_chunks_stay_within_the_budget_and_keep_sentences(self):
+        text = ' '.join([SENTENCE] * 40)
+        chunks = split_by_tokens(text, 60)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 60)
+            self.assertTrue(chunk.endswith('.'))
+        self.assertEqual(' '.join(chunks), text)
+
+    def test_sentences_without_punctuation_are_split_between_words(self):
+        text = ' '.join(['word'] * 500)
+        chunks = split_by_tokens(text, 50)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(' '.join(chunks).split(), text.split())
+
+
+@override_settings(GEMINI_PROMPT_TOKEN_BUDGET=200, GEMINI_CHUNK_TOKENS=100, GEMINI_MAX_CONCURRENCY=4)
+class CondenseTranscriptTests(SimpleTestCase):
+    def test_short_transcripts_use_a_single_call(self):
+        with mock.patch.object(gemini_client, 'generate_content',
+                               return_value=SimpleNamespace(text='{}')) as generate_content:
+            youtube_quiz_creator.get_ai_response(SENTENCE)
+
+        generate_content.assert_called_once()
+        self.assertTrue(generate_content.call_args.args[0].endswith('Transcript:\n' + SENTENCE))
+
+    def test_long_transcripts_are_condensed_in_parallel(self):
+        transcript = ' '.join(f'Fact number {number} is important.' for number in range(200))
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+        prompts = []
+
+        def generate_content(prompt, model=None):
+            nonlocal running, max_running
+            prompts.append(prompt)
+            if 'generate a quiz' in prompt:
+                return SimpleNamespace(text='{}')
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            part = prompt.split(' of a video transcript')[0].split('part ')[1]
+            return SimpleNamespace(text=f'- key fact of part {part}')
+
+        with mock.patch.object(gemini_client, 'generate_content', side_effect=generate_content):
+            youtube_quiz_creator.get_ai_response(transcript)
+
+        chunk_prompts = [prompt for prompt in prompts if 'generate a quiz' not in prompt]
+        quiz_prompt = prompts[-1]
+        self.assertGreater(len(chunk_prompts), 1)
+        self.assertGreater(max_running, 1)
+        self.assertLessEqual(max_running, 4)
+        self.assertIn('notes on a video transcript', quiz_prompt)
+        self.assertNotIn('Fact number', quiz_prompt)
+        self.assertLess(quiz_prompt.index('key fact of part 1 of'), quiz_prompt.index('key fact of part 2 of'))
+
+    def test_failed_chunks_raise_a_runtime_error(self):
+        with mock.patch.object(gemini_client, 'generate_content', side_effect=ValueError('quota')):
+            with self.assertRaisesMessage(RuntimeError, 'Error extracting key facts: quota'):
+                transcript_notes.condense_transcript(' '.join([SENTENCE] * 100))
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from management_app.utils.video_id import extract_video_id, canonical_video_url
+
+
+class VideoIdTests(SimpleTestCase):
+    def test_extract_video_id_from_all_url_forms(self):
+        urls = [
+            'https://www.youtube.com/watch?v=PPzIWFJU_3s',
+            'https://www.youtube.com/watch?feature=share&v=PPzIWFJU_3s&t=42',
+            'https://youtube.com/watch?v=PPzIWFJU_3s',
+            'https://m.youtube.com/watch?v=PPzIWFJU_3s',
+            'https://music.youtube.com/watch?v=PPzIWFJU_3s',
+            'https://youtu.be/PPzIWFJU_3s?si=abcdef',
+            'https://www.youtube.com/shorts/PPzIWFJU_3s',
+            'https://www.youtube.com/embed/PPzIWFJU_3s',
+            'https://www.youtube-nocookie.com/embed/PPzIWFJU_3s',
+            'https://www.youtube.com/live/PPzIWFJU_3s?feature=shared',
+            'www.youtube.com/watch?v=PPzIWFJU_3s',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(extract_video_id(url), 'PPzIWFJU_3s')
+
+    def test_extract_video_id_rejects_other_urls(self):
+        urls = [
+            '',
+            'http://example.com/video',
+            'https://www.youtube.com/watch?v=tooshort',
+            'https://www.youtube.com/channel/UC1234567890',
+            'https://example.com/watch?v=PPzIWFJU_3s',
+            'http://[::1',
+            '[::1/watch?v=PPzIWFJU_3s',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIsNone(extract_video_id(url))
+
+    def test_canonical_video_url(self):
+        self.assertEqual(canonical_video_url('PPzIWFJU_3s'),
+                         'https://www.youtube.com/watch?v=PPzIWFJU_3s')
@@ -0,0 +1,73 @@
+import importlib
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from management_app.utils import whisper_models
+
+
+class FakeModel:
+    def parameters(self):
+        return []
+
+    def transcribe(self, audio, **kwargs):
+        tqdm = importlib.import_module('whisper.transcribe').tqdm
+        with tqdm.tqdm(total=4, disable=kwargs.get('verbose') is not False) as progress_bar:
+            for _ in range(2):
+                progress_bar.update(2)
+        return {'text': 'transcript of ' + audio}
+
+
+@override_settings(WHISPER_MODEL='tiny')
+class WhisperModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        """
+        Starts every test with an empty model registry.
+        """
+        whisper_models._models.clear()
+        self.addCleanup(whisper_models._models.clear)
+
+    def test_model_is_loaded_once_for_concurrent_callers(self):
+        with mock.patch('whisper.load_model', return_value=FakeModel()) as load_model:
+            threads = [threading.Thread(target=whisper_models.get_model) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        load_model.assert_called_once_with('tiny')
+
+    def test_model_stats_report_loaded_models(self):
+        with mock.patch('whisper.load_model', return_value=FakeModel()):
+            loaded = whisper_models.get_model()
+        self.assertEqual(loaded.transcribe('audio.mp3')['text'], 'transcript of audio.mp3')
+        stats = whisper_models.model_stats()
+        self.assertEqual(stats[0]['name'], 'tiny')
+        self.assertGreater(stats[0]['rss_after_load'], 0)
+
+    def test_transcribe_reports_segment_progress(self):
+        with mock.patch('whisper.load_model', return_value=FakeModel()):
+            loaded = whisper_models.get_model()
+        progress = []
+        loaded.transcribe('audio.mp3', progress=progress.append)
+        self.assertEqual(progress, [0.5, 1])
+
+    def test_concurrent_transcriptions_report_their_own_progress(self):
+        started = threading.Barrier(2)
+
+        class WaitingModel(FakeModel):
+            def transcribe(self, audio, **kwargs):
+                # Both transcriptions run at the same time before either updates its progress.
+                started.wait(timeout=5)
+                return super().transcribe(audio, **kwargs)
+
+        with mock.patch('whisper.load_model', side_effect=lambda name: WaitingModel()):
+            models = [whisper_models.get_model('tiny'), whisper_models.get_model('base')]
+        progress = {'tiny': [], 'base': []}
+        threads = [threading.Thread(target=loaded.transcribe, args=('audio.mp3', progress[loaded.name].append))
+                   for loaded in models]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(progress, {'tiny': [0.5, 1], 'base': [0.5, 1]})
@@ -0,0 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from management_app.utils.youtube_quiz_creator import prepare_quiz_prompt
+
+# The blocking Gemini calls that condense a long transcript for an async view run on these
+# threads. Downloads and transcriptions are left to the quiz job workers.
+_blocking_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_BLOCKING_WORKERS, thread_name_prefix='async-blocking')
+
+
+async def run_blocking(executor: ThreadPoolExecutor, function, *args):
+    """
+    Runs a blocking function on one of the executors and waits for it without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _with_fresh_connection, function, *args)
+
+
+def _with_fresh_connection(function, *args):
+    # Executor threads live as long as the process, so their connections are checked like
+    # those of a request.
+    close_old_connections()
+    try:
+        return function(*args)
+    finally:
+        close_old_connections()
+
+
+async def prepare_quiz_prompt_async(transcript: str) -> str:
+    """
+    Runs prepare_quiz_prompt on the blocking executor, since condensing a long transcript makes blocking Gemini calls.
+    """
+    return await run_blocking(_blocking_executor, prepare_quiz_prompt, transcript)
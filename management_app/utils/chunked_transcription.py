@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from management_app.utils.lazy_modules import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = SAMPLE_RATE // 50
+
+_pool = None
+_pool_lock = threading.Lock()
+_worker_model = None
+
+
+def find_chunks(audio, chunk_seconds: float, overlap_seconds: float, search_seconds: float):
+    """
+    Splits the audio into (start, end) sample ranges of about chunk_seconds.
+    Each cut is moved to the quietest 20 ms frame within search_seconds of the target,
+    and every chunk is extended by overlap_seconds on both sides.
+    """
+    total = len(audio)
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    if total <= chunk:
+        return [(0, total)]
+
+    frames = len(audio) // FRAME_SAMPLES
+    energy = np.sqrt(np.mean(
+        np.square(audio[:frames * FRAME_SAMPLES].reshape(frames, FRAME_SAMPLES)), axis=1))
+    search = int(search_seconds * SAMPLE_RATE) // FRAME_SAMPLES
+
+    cuts = [0]
+    target = chunk
+    while target < total - chunk // 2:
+        centre = target // FRAME_SAMPLES
+        low, high = max(centre - search, cuts[-1] // FRAME_SAMPLES + 1), min(centre + search, frames - 1)
+        cut = (low + int(np.argmin(energy[low:high + 1]))) * FRAME_SAMPLES if low <= high else target
+        cuts.append(cut)
+        target = cut + chunk
+    cuts.append(total)
+
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    return [(max(start - overlap, 0), min(end + overlap, total)) for start, end in zip(cuts, cuts[1:])]
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def stitch_transcripts(texts, max_overlap_words: int = 30) -> str:
+    """
+    Joins chunk transcripts in order and removes the words that were transcribed
+    twice because the chunks overlap.
+    """
+    words = []
+    for text in texts:
+        new_words = text.split()
+        overlap = 0
+        for size in range(min(max_overlap_words, len(words), len(new_words)), 0, -1):
+            if [_normalize(w) for w in words[-size:]] == [_normalize(w) for w in new_words[:size]]:
+                overlap = size
+                break
+        words.extend(new_words[overlap:])
+    return ' '.join(words)
+
+
+def should_transcribe_chunked(audio) -> bool:
+    return (settings.WHISPER_PROCESSES > 1
+            and len(audio) >= settings.WHISPER_CHUNKED_MIN_SECONDS * SAMPLE_RATE)
+
+
+def transcribe_chunked(audio, progress=None) -> str:
+    """
+    Transcribes long audio in parallel on the Whisper process pool and returns the stitched transcript.
+    """
+    chunks = find_chunks(
+        audio,
+        settings.WHISPER_CHUNK_SECONDS,
+        settings.WHISPER_CHUNK_OVERLAP_SECONDS,
+        settings.WHISPER_CHUNK_SEARCH_SECONDS,
+    )
+    pool = get_pool()
+    futures = {pool.submit(_transcribe_chunk, audio[start:end]): number
+               for number, (start, end) in enumerate(chunks)}
+
+    texts = [''] * len(chunks)
+    try:
+        for done, future in enumerate(as_completed(futures), start=1):
+            texts[futures[future]] = future.result()
+            if progress:
+                progress(done / len(chunks))
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    return stitch_transcripts(texts)
+
+
+def torch_threads_per_process() -> int:
+    """
+    Returns WHISPER_TORCH_THREADS or splits the CPU cores evenly between the pool processes.
+    """
+    if settings.WHISPER_TORCH_THREADS:
+        return settings.WHISPER_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // settings.WHISPER_PROCESSES)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Returns the process pool used for chunked transcription, starting it on first use.
+    Every pool process loads WHISPER_MODEL once and limits torch to its share of the cores.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.WHISPER_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(settings.WHISPER_MODEL, torch_threads_per_process()),
+            )
+    return _pool
+
+
+def _discard_pool(pool):
+    """
+    Forgets a pool whose processes died, so the next call starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(torch_threads)
+    _worker_model = whisper.load_model(model_name)
+
+
+def _transcribe_chunk(audio) -> str:
+    return _worker_model.transcribe(audio).get('text', '').strip()
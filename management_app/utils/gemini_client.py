@@ -0,0 +1,227 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from management_app.utils.lazy_modules import genai, genai_errors, genai_types
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Coroutines cannot block on the thread semaphore, so they check it again after this delay.
+ASYNC_POLL_SECONDS = 0.05
+
+_client = None
+_limits = None
+_lock = threading.Lock()
+_stats = {'calls': 0, 'failures': 0, 'retries': 0, 'latency_seconds_total': 0.0, 'latency_seconds_max': 0.0}
+
+
+class TokenBucket:
+    """
+    Allows `rate` calls per second on average and bursts of up to `capacity` calls.
+    acquire() blocks until a token is available, so bursts queue up locally.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while (wait := self.take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while (wait := self.take()) > 0:
+            await asyncio.sleep(wait)
+
+    def take(self) -> float:
+        """
+        Takes a token and returns 0, or returns the seconds until the next token is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+
+def get_client() -> 'genai.Client':
+    """
+    Returns the process-wide Gemini client. Its HTTP connection pool keeps connections
+    alive between calls, and every call is limited to GEMINI_TIMEOUT_SECONDS.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = genai.Client(
+                api_key=settings.MY_API_KEY,
+                http_options=genai_types.HttpOptions(
+                    timeout=int(settings.GEMINI_TIMEOUT_SECONDS * 1000),
+                    client_args={'limits': httpx.Limits(
+                        max_connections=settings.GEMINI_MAX_CONCURRENCY,
+                        max_keepalive_connections=settings.GEMINI_MAX_CONCURRENCY,
+                    )},
+                ),
+            )
+    return _client
+
+
+def _get_limits():
+    """
+    Returns the semaphore limiting concurrent calls and the token bucket limiting the call rate.
+    """
+    global _limits
+    with _lock:
+        if _limits is None:
+            _limits = (
+                threading.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY),
+                TokenBucket(settings.GEMINI_REQUESTS_PER_MINUTE / 60, settings.GEMINI_MAX_CONCURRENCY),
+            )
+    return _limits
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Returns True for errors worth retrying: rate limits, server errors, timeouts and connection problems.
+    """
+    if isinstance(error, genai_errors.APIError):
+        return error.code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+def _record(name: str, value=1):
+    with _lock:
+        _stats[name] += value
+
+
+def _record_latency(latency: float):
+    with _lock:
+        _stats['calls'] += 1
+        _stats['latency_seconds_total'] += latency
+        _stats['latency_seconds_max'] = max(_stats['latency_seconds_max'], latency)
+
+
+def _record_retry(retry_state):
+    _record('retries')
+
+
+def call_with_limits(function, *args, **kwargs):
+    """
+    Calls function within the concurrency and rate limits and retries transient errors
+    with jittered exponential backoff, up to GEMINI_RETRY_ATTEMPTS attempts.
+    """
+    return _retrying()(_limited_call, function, *args, **kwargs)
+
+
+def _retrying(retrying_class=Retrying):
+    return retrying_class(
+        retry=retry_if_exception(is_transient_error),
+        wait=wait_random_exponential(
+            multiplier=settings.GEMINI_RETRY_BASE_SECONDS, max=settings.GEMINI_RETRY_MAX_SECONDS),
+        stop=stop_after_attempt(settings.GEMINI_RETRY_ATTEMPTS),
+        before_sleep=_record_retry,
+        reraise=True,
+    )
+
+
+def _limited_call(function, *args, **kwargs):
+    semaphore, bucket = _get_limits()
+    bucket.acquire()
+    with semaphore:
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            _record('failures')
+            raise
+        finally:
+            _record_latency(time.perf_counter() - started)
+
+
+def generate_content(contents, model: str = None):
+    """
+    Sends a prompt to Gemini through the shared client and returns the response.
+    """
+    return call_with_limits(
+        lambda: get_client().models.generate_content(
+            model=model or settings.GEMINI_MODEL, contents=contents))
+
+
+def generate_content_stream(contents, model: str = None):
+    """
+    Sends a prompt to Gemini and yields the text of the response chunks as they arrive.
+    The stream counts against the concurrency limit until it is finished; transient errors
+    are retried as long as no chunk has been received yet.
+    """
+    semaphore, bucket = _get_limits()
+    bucket.acquire()
+    with semaphore:
+        started = time.perf_counter()
+        try:
+            stream, first_chunk = _retrying()(_start_stream, contents, model or settings.GEMINI_MODEL)
+            if first_chunk is not None:
+                yield first_chunk.text or ''
+                for chunk in stream:
+                    yield chunk.text or ''
+        except Exception:
+            _record('failures')
+            raise
+        finally:
+            _record_latency(time.perf_counter() - started)
+
+
+def _start_stream(contents, model: str):
+    stream = iter(get_client().models.generate_content_stream(model=model, contents=contents))
+    return stream, next(stream, None)
+
+
+async def generate_content_stream_async(contents, model: str = None):
+    """
+    Like generate_content_stream, but uses the asyncio client of the SDK, so waiting for
+    Gemini (and for the concurrency and rate limits) does not occupy a thread. Consume it in
+    contextlib.aclosing: its concurrency slot is only given back when the generator is closed,
+    and an abandoned generator is not closed before it is garbage collected.
+    """
+    semaphore, bucket = _get_limits()
+    await bucket.acquire_async()
+    while not semaphore.acquire(blocking=False):
+        await asyncio.sleep(ASYNC_POLL_SECONDS)
+    try:
+        started = time.perf_counter()
+        try:
+            stream, first_chunk = await _retrying(AsyncRetrying)(
+                _start_stream_async, contents, model or settings.GEMINI_MODEL)
+            if first_chunk is not None:
+                yield first_chunk.text or ''
+                async for chunk in stream:
+                    yield chunk.text or ''
+        except Exception:
+            _record('failures')
+            raise
+        finally:
+            _record_latency(time.perf_counter() - started)
+    finally:
+        semaphore.release()
+
+
+async def _start_stream_async(contents, model: str):
+    stream = await get_client().aio.models.generate_content_stream(model=model, contents=contents)
+    return stream, await anext(stream, None)
+
+
+def gemini_stats():
+    """
+    Returns call, failure and retry counters and the latencies of this process.
+    """
+    with _lock:
+        stats = dict(_stats)
+    stats['latency_seconds_avg'] = stats['latency_seconds_total'] / stats['calls'] if stats['calls'] else 0.0
+    return stats
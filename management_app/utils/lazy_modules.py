@@ -0,0 +1,48 @@
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    Stands in for a module and imports it on the first attribute access. Setting or deleting
+    attributes, e.g. through mock.patch.object, acts on the real module as well.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_name', name)
+
+    def _load(self):
+        # import_module returns the cached module after the first call and holds the import lock before.
+        return importlib.import_module(self._name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __delattr__(self, attribute):
+        delattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = 'loaded' if self._name in sys.modules else 'not loaded yet'
+        return f'<lazy module {self._name!r}, {state}>'
+
+
+# Whisper pulls in torch, which alone takes seconds and hundreds of MB. Web processes that only
+# serve quizzes or tokens never touch these; the pipeline loads them on first use.
+whisper = LazyModule('whisper')
+yt_dlp = LazyModule('yt_dlp')
+genai = LazyModule('google.genai')
+genai_errors = LazyModule('google.genai.errors')
+genai_types = LazyModule('google.genai.types')
+numpy = LazyModule('numpy')
+
+HEAVY_MODULES = ('torch', 'whisper', 'yt_dlp', 'google.genai', 'numpy')
+
+
+def loaded_heavy_modules() -> list:
+    """
+    Returns the heavy modules already imported by this process.
+    """
+    return [name for name in HEAVY_MODULES if name in sys.modules]
@@ -0,0 +1,246 @@
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+trace_logger = logging.getLogger('management_app.pipeline')
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+ATTRIBUTE_BUCKETS = {
+    'download_bytes': (2**18, 2**20, 2**22, 2**24, 2**26, 2**28, 2**30),
+    'audio_seconds': (30, 60, 300, 600, 1200, 1800, 3600, 7200),
+    'transcript_tokens': (500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+}
+
+_current_trace = contextvars.ContextVar('pipeline_trace', default=None)
+_span_listeners = []
+
+
+class Histogram:
+    """
+    A Prometheus histogram with fixed buckets and one series per label combination.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            counts, total = self.series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.series[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self.series.items()}
+        for key, (counts, total) in sorted(series.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_labels(labels + [("le", _number(bound))])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(labels)} {cumulative}')
+        return lines
+
+
+STAGE_DURATION = Histogram(
+    'quizly_pipeline_stage_duration_seconds', 'Duration of quiz pipeline stages.',
+    ['stage', 'outcome'], DURATION_BUCKETS)
+ATTRIBUTE_HISTOGRAMS = {
+    attribute: Histogram(f'quizly_pipeline_{attribute}', f'{attribute.replace("_", " ").capitalize()} per stage.',
+                         ['stage'], buckets)
+    for attribute, buckets in ATTRIBUTE_BUCKETS.items()
+}
+
+
+@contextmanager
+def stage_span(stage: str):
+    """
+    Measures one pipeline stage. The yielded dict takes attributes of the stage, e.g.
+    download_bytes, audio_seconds or transcript_tokens, which are recorded as histograms
+    and, if a trace is active, added to the trace together with duration and outcome.
+    """
+    span = {}
+    started = time.perf_counter()
+    outcome = 'success'
+    try:
+        yield span
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        STAGE_DURATION.observe(duration, stage=stage, outcome=outcome)
+        for attribute, value in span.items():
+            if attribute in ATTRIBUTE_HISTOGRAMS:
+                ATTRIBUTE_HISTOGRAMS[attribute].observe(value, stage=stage)
+        for listener in list(_span_listeners):
+            listener(stage, outcome, duration, span)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace['spans'].append({'stage': stage, 'outcome': outcome,
+                                   'duration_seconds': round(duration, 4), **span})
+
+
+@contextmanager
+def observe_spans(listener):
+    """
+    Calls listener(stage, outcome, duration, attributes) for every finished stage span
+    of any thread while the context is active.
+    """
+    _span_listeners.append(listener)
+    try:
+        yield
+    finally:
+        _span_listeners.remove(listener)
+
+
+@contextmanager
+def pipeline_trace(name: str, **attributes):
+    """
+    Collects the spans of one pipeline run and writes them as one JSON line to the
+    "management_app.pipeline" logger if PIPELINE_TRACE_LOG is enabled.
+    """
+    trace = {'name': name, **attributes, 'spans': []}
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    outcome = 'success'
+    try:
+        yield trace
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        _current_trace.reset(token)
+        if settings.PIPELINE_TRACE_LOG:
+            trace['outcome'] = outcome
+            trace['duration_seconds'] = round(time.perf_counter() - started, 4)
+            trace_logger.info(json.dumps(trace, default=str))
+
+
+def render_metrics() -> str:
+    """
+    Returns the metrics of this process in the Prometheus text format.
+    """
+    lines = STAGE_DURATION.render()
+    for histogram in ATTRIBUTE_HISTOGRAMS.values():
+        lines.extend(histogram.render())
+    for collector in COLLECTORS:
+        lines.extend(collector())
+    return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _sample(name: str, metric_type: str, documentation: str, value, labels=()):
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} {metric_type}',
+            f'{name}{_labels(list(labels))} {_number(value)}']
+
+
+def _whisper_metrics():
+    from management_app.utils.whisper_models import model_stats
+
+    lines = []
+    for stats in model_stats():
+        labels = [('model', stats['name'])]
+        lines += _sample('quizly_whisper_model_load_seconds', 'gauge',
+                         'Time needed to load the Whisper model.', stats['load_seconds'], labels)
+        lines += _sample('quizly_whisper_model_parameter_bytes', 'gauge',
+                         'Memory used by the Whisper model parameters.', stats['parameter_bytes'], labels)
+    return lines
+
+
+def _transcript_cache_metrics():
+    from management_app.utils.transcript_cache import counters
+
+    return [line for name, value in counters().items()
+            for line in _sample(f'quizly_transcript_cache_{name}_total', 'counter',
+                                f'Transcript cache {name} in this process.', value)]
+
+
+def _gemini_metrics():
+    from management_app.utils.gemini_client import gemini_stats
+
+    stats = gemini_stats()
+    return (_sample('quizly_gemini_calls_total', 'counter', 'Gemini calls.', stats['calls'])
+            + _sample('quizly_gemini_failures_total', 'counter', 'Failed Gemini calls.', stats['failures'])
+            + _sample('quizly_gemini_retries_total', 'counter', 'Retried Gemini calls.', stats['retries'])
+            + _sample('quizly_gemini_latency_seconds_total', 'counter',
+                      'Total latency of Gemini calls.', stats['latency_seconds_total']))
+
+
+def _streaming_metrics():
+    from management_app.utils.quiz_streaming import streaming_stats
+
+    stats = streaming_stats()
+    return (_sample('quizly_stream_total', 'counter', 'Streamed quiz creations.', stats['streams'])
+            + _sample('quizly_stream_time_to_first_question_seconds_total', 'counter',
+                      'Total time until the first question was streamed.',
+                      stats['time_to_first_question_seconds_total'])
+            + _sample('quizly_stream_time_to_first_question_count', 'counter',
+                      'Streams that sent at least one question.', stats['time_to_first_question_count']))
+
+
+def _batch_metrics():
+    from management_app.utils.quiz_batches import pipeline_stats
+
+    lines = ['# HELP quizly_batch_stage_queue_size Batch jobs waiting in front of a pipeline stage.',
+             '# TYPE quizly_batch_stage_queue_size gauge']
+    for stage, size in pipeline_stats().items():
+        lines.append(f'quizly_batch_stage_queue_size{_labels([("stage", stage)])} {size}')
+    return lines
+
+
+def _scratch_metrics():
+    from management_app.utils.scratch_space import scratch_stats
+
+    stats = scratch_stats()
+    return (_sample('quizly_scratch_used_bytes', 'gauge', 'Bytes used or reserved in the scratch directory.',
+                    stats['used_bytes'])
+            + _sample('quizly_scratch_max_bytes', 'gauge', 'Quota of the scratch directory.', stats['max_bytes']))
+
+
+def _quiz_cache_metrics():
+    from management_app.api.response_cache import cache_stats
+
+    stats = cache_stats()
+    return ([line for name in ('hits', 'misses')
+             for line in _sample(f'quizly_quiz_cache_{name}_total', 'counter',
+                                 f'Rendered quiz cache {name} in this process.', stats[name])]
+            + _sample('quizly_quiz_cache_hit_rate', 'gauge', 'Share of rendered quizzes served from the cache.',
+                      stats['hit_rate']))
+
+
+def _process_metrics():
+    from management_app.utils.whisper_models import current_rss_bytes
+
+    return _sample('quizly_process_max_resident_memory_bytes', 'gauge',
+                   'Peak resident memory of this process.', current_rss_bytes())
+
+
+COLLECTORS = [_whisper_metrics, _transcript_cache_metrics, _gemini_metrics, _streaming_metrics, _batch_metrics,
+              _scratch_metrics, _quiz_cache_metrics, _process_metrics]
@@ -0,0 +1,215 @@
+import logging
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from management_app.models import QuizBatch, QuizContent, QuizJob
+from management_app.utils import single_flight, transcript_cache
+from management_app.utils.pipeline_metrics import stage_span
+from management_app.utils.quiz_jobs import ProgressPublisher, claim_next_job, finish_job, requeue_stale_jobs
+from management_app.utils.quiz_persistence import get_shared_content, quiz_from_shared_content, save_quiz
+from management_app.utils.scratch_space import ScratchArea, open_scratch_area, sweep_stale_areas
+from management_app.utils.single_flight import Flight
+from management_app.utils.staged_pipeline import Stage, StagedPipeline
+from management_app.utils.video_id import canonical_video_url, extract_video_id
+from management_app.utils.youtube_quiz_creator import fetch_audio, generate_quiz_from_transcript, transcribe_audio
+
+logger = logging.getLogger(__name__)
+
+# Quizzes are written one at a time, SQLite does not allow parallel writes anyway.
+SAVE_WORKERS = 1
+
+_wake = threading.Event()
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+@dataclass
+class BatchItem:
+    """
+    State of one batch job while it moves through the pipeline stages.
+    """
+    job: QuizJob
+    progress: ProgressPublisher
+    url: str = ''
+    video_id: str = ''
+    audio_file: str = None
+    scratch: ScratchArea = None
+    transcript: str = None
+    content: dict = None
+    shared: QuizContent = None
+    flight: Flight = None
+    quiz: object = None
+
+
+def enqueue_quiz_batch(urls, user) -> QuizBatch:
+    """
+    Stores a batch with one queued job per URL and wakes up the batch pipeline of this process.
+    """
+    with transaction.atomic():
+        batch = QuizBatch.objects.create(user=user)
+        QuizJob.objects.bulk_create([QuizJob(video_url=url, user=user, batch=batch) for url in urls])
+    start_batch_pipeline()
+    _wake.set()
+    return batch
+
+
+def build_pipeline() -> StagedPipeline:
+    """
+    Returns the staged pipeline for batch jobs: many parallel downloads, few Whisper
+    transcriptions (CPU-bound) and as many Gemini calls as the rate limits allow.
+    """
+    return StagedPipeline([
+        Stage('download', download_stage, settings.QUIZ_BATCH_DOWNLOAD_WORKERS),
+        Stage('transcribe', transcribe_stage, settings.QUIZ_BATCH_TRANSCRIBE_WORKERS),
+        Stage('generate', generate_stage, settings.QUIZ_BATCH_GENERATE_WORKERS),
+        Stage('save', save_stage, SAVE_WORKERS),
+    ], on_done=finish_item, on_error=fail_item, queue_size=settings.QUIZ_BATCH_QUEUE_SIZE)
+
+
+def download_stage(item: BatchItem):
+    """
+    Downloads the audio of the video, or skips to the generation if its transcript is cached,
+    or straight to saving if a quiz was generated for the video before. Waits while the scratch space is full, which holds back the downloads until Whisper catches up.
+    Like create_quiz_from_url, a job leads the video's single flight until its quiz content is
+    generated; jobs of the same video meanwhile wait and skip to saving that content.
+    """
+    video_id = extract_video_id(item.job.video_url)
+    if video_id is None:
+        raise RuntimeError('Invalid YouTube URL')
+    item.video_id = video_id
+    item.url = canonical_video_url(video_id)
+
+    item.shared = get_shared_content(video_id)
+    if item.shared is not None:
+        return 'save'
+    item.flight, item.content = single_flight.lead_or_wait(video_id)
+    if item.flight is None:
+        for stage in ('download', 'transcribe', 'generate'):
+            item.progress(stage, 1)
+        return 'save'
+    item.transcript = transcript_cache.get_transcript(video_id)
+    if item.transcript is not None:
+        item.progress('download', 1)
+        item.progress('transcribe', 1)
+        return 'generate'
+    item.scratch = open_scratch_area()
+    item.audio_file = fetch_audio(item.url, video_id, item.scratch, item.progress)
+
+
+def transcribe_stage(item: BatchItem):
+    """
+    Transcribes the downloaded audio unless another job has transcribed the same video in the meantime.
+    """
+    try:
+        item.transcript = transcript_cache.get_transcript(item.video_id)
+        if item.transcript is None:
+            item.transcript = transcribe_audio(item.video_id, item.audio_file, item.progress)
+        else:
+            item.progress('transcribe', 1)
+    finally:
+        _cleanup(item)
+
+
+def generate_stage(item: BatchItem):
+    try:
+        item.content = item.flight.publish(generate_quiz_from_transcript(item.transcript, item.progress))
+    finally:
+        _release_flight(item)
+
+
+def save_stage(item: BatchItem):
+    item.progress('save', 0)
+    with stage_span('save'):
+        if item.shared is not None:
+            item.quiz = quiz_from_shared_content(item.shared, item.job.user, item.url)
+        else:
+            item.quiz = save_quiz(item.content, item.job.user, item.url)
+    item.progress('save', 1)
+
+
+def finish_item(item: BatchItem):
+    finish_job(item.job, quiz=item.quiz)
+
+
+def fail_item(item: BatchItem, stage: str, error: Exception):
+    logger.warning('Quiz job %s of batch %s failed in stage %s: %s', item.job.pk, item.job.batch_id, stage, error)
+    _cleanup(item)
+    _release_flight(item)
+    finish_job(item.job, error=error)
+
+
+def _cleanup(item: BatchItem):
+    if item.scratch is not None:
+        item.scratch.close()
+
+
+def _release_flight(item: BatchItem):
+    if item.flight is not None:
+        item.flight.release()
+
+
+def feed(pipeline: StagedPipeline) -> int:
+    """
+    Claims queued batch jobs and submits them to the pipeline until the queue is empty.
+    Waits while the first stage is full, so jobs stay claimable by other processes meanwhile.
+    """
+    submitted = 0
+    while True:
+        job = claim_next_job(batch=True)
+        if job is None:
+            return submitted
+        pipeline.submit(BatchItem(job=job, progress=ProgressPublisher(job)))
+        submitted += 1
+
+
+def run_batch_jobs() -> int:
+    """
+    Runs all queued batch jobs through a new pipeline and returns their number once they are done.
+    """
+    if not QuizJob.objects.filter(status=QuizJob.STATUS_QUEUED, batch__isnull=False).exists():
+        return 0
+    pipeline = build_pipeline().start()
+    try:
+        return feed(pipeline)
+    finally:
+        pipeline.stop()
+
+
+def start_batch_pipeline():
+    """
+    Starts the batch pipeline and the thread feeding it once per process,
+    unless background jobs are disabled with QUIZ_JOB_WORKERS = 0.
+    """
+    global _pipeline
+    if _pipeline is not None or settings.QUIZ_JOB_WORKERS <= 0:
+        return
+    with _pipeline_lock:
+        if _pipeline is not None:
+            return
+        requeue_stale_jobs()
+        sweep_stale_areas()
+        _pipeline = build_pipeline().start()
+        threading.Thread(target=_feed_loop, args=(_pipeline,), name='quiz-batch-feeder', daemon=True).start()
+
+
+def _feed_loop(pipeline: StagedPipeline):
+    while True:
+        try:
+            close_old_connections()
+            feed(pipeline)
+        except Exception:
+            logger.exception('Quiz batch feeder crashed, restarting loop')
+        finally:
+            connection.close()
+        _wake.wait(timeout=settings.QUIZ_JOB_POLL_SECONDS)
+        _wake.clear()
+
+
+def pipeline_stats():
+    """
+    Returns the number of batch jobs waiting in front of every stage of this process' pipeline.
+    """
+    return _pipeline.stage_stats() if _pipeline is not None else {}
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from management_app.models import QuizJob, QuizJobEvent
+from management_app.utils.scratch_space import process_exists, sweep_stale_areas
+from management_app.utils.youtube_quiz_creator import create_quiz_from_url
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}'
+
+_wake = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def enqueue_quiz_job(url: str, user) -> QuizJob:
+    """
+    Stores a new quiz creation job in the database and wakes up the local workers.
+    """
+    job = QuizJob.objects.create(video_url=url, user=user)
+    start_workers()
+    _wake.set()
+    return job
+
+
+def start_workers():
+    """
+    Starts the bounded pool of QUIZ_JOB_WORKERS background threads once per process.
+    Jobs and scratch areas left behind by crashed workers are re-queued or removed
+    before the first worker starts.
+    """
+    if _workers or settings.QUIZ_JOB_WORKERS <= 0:
+        return
+    with _workers_lock:
+        if _workers:
+            return
+        requeue_stale_jobs()
+        sweep_stale_areas()
+        for number in range(settings.QUIZ_JOB_WORKERS):
+            thread = threading.Thread(
+                target=_worker_loop, name=f'quiz-job-{number}', daemon=True)
+            _workers.append(thread)
+            thread.start()
+
+
+def requeue_stale_jobs():
+    """
+    Puts running jobs back into the queue if their worker process no longer exists
+    or has not reported progress for QUIZ_JOB_STALE_SECONDS.
+    """
+    hostname = socket.gethostname()
+    stale_before = timezone.now() - timedelta(seconds=settings.QUIZ_JOB_STALE_SECONDS)
+    requeued = 0
+    for job in QuizJob.objects.filter(status=QuizJob.STATUS_RUNNING):
+        host, _, pid = job.worker.rpartition(':')
+        crashed = host == hostname and pid.isdigit() and not process_exists(int(pid))
+        if crashed or job.updated_at < stale_before:
+            requeued += QuizJob.objects.filter(pk=job.pk, worker=job.worker).update(
+                status=QuizJob.STATUS_QUEUED, worker='', updated_at=timezone.now())
+    if requeued:
+        logger.info('Re-queued %s interrupted quiz jobs', requeued)
+    return requeued
+
+
+def claim_next_job(batch: bool = False):
+    """
+    Atomically marks the oldest queued job as running for this worker and returns it.
+    Jobs of batches are only claimed with batch=True, single jobs only without.
+    Returns None if the queue is empty.
+    """
+    while True:
+        job_id = QuizJob.objects.filter(
+            status=QuizJob.STATUS_QUEUED, batch__isnull=not batch).order_by(
+            'created_at', 'id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = QuizJob.objects.filter(pk=job_id, status=QuizJob.STATUS_QUEUED).update(
+            status=QuizJob.STATUS_RUNNING, worker=WORKER_ID, updated_at=timezone.now())
+        if claimed:
+            return QuizJob.objects.select_related('user').get(pk=job_id)
+
+
+def process_job(job: QuizJob):
+    """
+    Runs the quiz pipeline for a claimed job and stores the result or the error.
+    Stage transitions and progress are published as QuizJobEvents for the event stream.
+    """
+    publish = ProgressPublisher(job)
+    try:
+        quiz = create_quiz_from_url(job.video_url, job.user, progress=publish)
+    except Exception as e:
+        logger.exception('Quiz job %s failed', job.pk)
+        finish_job(job, error=e)
+        return
+    finish_job(job, quiz=quiz)
+
+
+def finish_job(job: QuizJob, quiz=None, error: Exception = None):
+    """
+    Stores the created quiz or the error of a job and publishes the final event.
+    """
+    if error is not None:
+        job.status = QuizJob.STATUS_FAILED
+        job.error = str(error)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+    else:
+        job.status = QuizJob.STATUS_DONE
+        job.quiz = quiz
+        job.save(update_fields=['status', 'quiz', 'updated_at'])
+    QuizJobEvent.objects.create(job=job, stage=job.status, progress=1)
+    prune_job_events()
+
+
+def prune_job_events() -> int:
+    """
+    Deletes the progress events of jobs finished more than QUIZ_JOB_EVENTS_RETENTION_SECONDS ago.
+    Their final event is kept, so late event streams still learn the result.
+    """
+    finished_before = timezone.now() - timedelta(seconds=settings.QUIZ_JOB_EVENTS_RETENTION_SECONDS)
+    deleted, _ = QuizJobEvent.objects.filter(
+        job__status__in=(QuizJob.STATUS_DONE, QuizJob.STATUS_FAILED), job__updated_at__lt=finished_before,
+    ).exclude(stage__in=(QuizJob.STATUS_DONE, QuizJob.STATUS_FAILED)).delete()
+    return deleted
+
+
+class ProgressPublisher:
+    """
+    Progress callback of a job. Stores the progress on the job and appends a QuizJobEvent
+    whenever a stage starts or ends or its progress grew by at least QUIZ_JOB_PROGRESS_STEP.
+    """
+
+    def __init__(self, job: QuizJob):
+        self.job = job
+        self.published = {}
+
+    def __call__(self, stage: str, fraction: float):
+        fraction = round(fraction, 3)
+        last = self.published.get(stage)
+        if last is not None and fraction not in (0, 1) and fraction - last < settings.QUIZ_JOB_PROGRESS_STEP:
+            return
+        if last == fraction:
+            return
+        self.published[stage] = fraction
+
+        self.job.stage = stage
+        self.job.progress[stage] = fraction
+        self.job.save(update_fields=['stage', 'progress', 'updated_at'])
+        QuizJobEvent.objects.create(job=self.job, stage=stage, progress=fraction)
+
+
+async def follow_job_async(job_id: int, last_event_id: int = 0):
+    """
+    Yields the QuizJobEvents of a job as they are published, up to the final done or failed event.
+    """
+    while True:
+        events = QuizJobEvent.objects.filter(job_id=job_id, id__gt=last_event_id).order_by('id')
+        async for event in events:
+            last_event_id = event.id
+            yield event
+            if event.stage in (QuizJob.STATUS_DONE, QuizJob.STATUS_FAILED):
+                return
+        await asyncio.sleep(settings.QUIZ_JOB_EVENTS_POLL_SECONDS)
+
+
+def run_pending_jobs(stop_event=None):
+    """
+    Processes queued jobs until the queue is empty or stop_event is set.
+    """
+    processed = 0
+    while not (stop_event and stop_event.is_set()):
+        job = claim_next_job()
+        if job is None:
+            break
+        process_job(job)
+        processed += 1
+    return processed
+
+
+def _worker_loop():
+    while True:
+        try:
+            close_old_connections()
+            run_pending_jobs()
+        except Exception:
+            logger.exception('Quiz job worker crashed, restarting loop')
+        finally:
+            connection.close()
+        _wake.wait(timeout=settings.QUIZ_JOB_POLL_SECONDS)
+        _wake.clear()
@@ -0,0 +1,168 @@
+from django.db import IntegrityError, transaction
+
+from management_app.models import Quiz, QuizContent, QuizQuestion
+from management_app.utils.video_id import extract_video_id
+
+MAX_TEXT_LENGTH = 255
+
+
+def validate_quiz_content(content) -> dict:
+    """
+    Checks the structure of generated quiz content before anything is written to the database
+    and raises a RuntimeError describing the first problem found.
+    """
+    if not isinstance(content, dict):
+        raise RuntimeError('Invalid quiz content: expected a JSON object')
+
+    for key in ('title', 'description'):
+        if not isinstance(content.get(key), str) or not content[key].strip():
+            raise RuntimeError(f'Invalid quiz content: "{key}" is missing')
+    if len(content['title']) > MAX_TEXT_LENGTH:
+        raise RuntimeError('Invalid quiz content: "title" is too long')
+
+    questions = content.get('questions')
+    if not isinstance(questions, list) or not questions:
+        raise RuntimeError('Invalid quiz content: "questions" is missing')
+
+    for number, question in enumerate(questions, start=1):
+        if not isinstance(question, dict):
+            raise RuntimeError(f'Invalid quiz content: question {number} is not an object')
+        title = question.get('question_title')
+        options = question.get('question_options')
+        answer = question.get('answer')
+        if not isinstance(title, str) or not title.strip() or len(title) > MAX_TEXT_LENGTH:
+            raise RuntimeError(f'Invalid quiz content: question {number} has no valid title')
+        if (not isinstance(options, list) or len(options) < 2
+                or not all(isinstance(option, str) for option in options)):
+            raise RuntimeError(f'Invalid quiz content: question {number} has no valid options')
+        if not isinstance(answer, str) or answer not in options or len(answer) > MAX_TEXT_LENGTH:
+            raise RuntimeError(f'Invalid quiz content: the answer of question {number} is not an option')
+    return content
+
+
+def save_quiz(content: dict, user, video_url: str) -> Quiz:
+    """
+    Validates the content and stores the quiz with all of its questions in one transaction.
+    """
+    return save_quizzes([(content, user, video_url)])[0]
+
+
+def save_quizzes(items, batch_size: int = 500):
+    """
+    Stores many quizzes at once. items is an iterable of (content, user, video_url) tuples.
+    All contents are validated first; then the quizzes and their questions are written with
+    bulk inserts in a single transaction, so either all quizzes are stored or none.
+    Quizzes of YouTube videos reference the shared QuizContent of their video instead of
+    storing own questions.
+    """
+    items = [(validate_quiz_content(content), user, video_url, extract_video_id(video_url) or '')
+             for content, user, video_url in items]
+
+    with transaction.atomic():
+        shared = {}
+        for content, _, _, video_id in items:
+            if video_id and video_id not in shared:
+                shared[video_id] = store_content(video_id, content)
+
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(title=content['title'], description=content['description'], video_url=video_url,
+                 video_id=video_id, content=_shared_if_equal(shared.get(video_id), content), user=user)
+            for content, user, video_url, video_id in items
+        ], batch_size=batch_size)
+
+        QuizQuestion.objects.bulk_create([
+            _question(question, quiz=quiz)
+            for quiz, (content, _, _, _) in zip(quizzes, items) if quiz.content is None
+            for question in content['questions']
+        ], batch_size=batch_size)
+
+    return quizzes
+
+
+def get_shared_content(video_id: str):
+    """
+    Returns the stored QuizContent of a video with its questions, or None.
+    """
+    return QuizContent.objects.filter(video_id=video_id).prefetch_related('questions').first()
+
+
+async def get_shared_content_async(video_id: str):
+    """
+    Same as get_shared_content, with the async ORM.
+    """
+    return await QuizContent.objects.filter(video_id=video_id).prefetch_related('questions').afirst()
+
+
+def store_content(video_id: str, content: dict):
+    """
+    Stores generated content as the shared QuizContent of a video and returns it.
+    If the video already has content, the existing one is returned instead.
+    """
+    existing = get_shared_content(video_id)
+    if existing is not None:
+        return existing
+    try:
+        with transaction.atomic():
+            shared = QuizContent.objects.create(
+                video_id=video_id, title=content['title'], description=content['description'])
+            QuizQuestion.objects.bulk_create(
+                [_question(question, content=shared) for question in content['questions']])
+    except IntegrityError:
+        # Another worker stored content for the same video at the same time.
+        return get_shared_content(video_id)
+    return shared
+
+
+def quiz_from_shared_content(shared: QuizContent, user, video_url: str) -> Quiz:
+    """
+    Creates a quiz of a user that references already generated content, without calling Gemini.
+    """
+    return Quiz.objects.create(title=shared.title, description=shared.description, video_url=video_url,
+                               video_id=shared.video_id, content=shared, user=user)
+
+
+def shared_content_as_dict(shared: QuizContent) -> dict:
+    """
+    Returns shared content in the structure generated by Gemini.
+    """
+    return _as_dict(shared, shared.questions.all())
+
+
+def quiz_as_dict(quiz: Quiz) -> dict:
+    """
+    Returns a quiz with its own or shared questions in the structure generated by Gemini.
+    """
+    return _as_dict(quiz, quiz.question_list)
+
+
+def _as_dict(owner, questions) -> dict:
+    return {
+        'title': owner.title,
+        'description': owner.description,
+        'questions': [
+            {'question_title': question.question_title, 'question_options': question.question_options,
+             'answer': question.answer}
+            for question in questions
+        ],
+    }
+
+
+def _shared_if_equal(shared, content: dict):
+    """
+    Returns the shared content if it is the given content. Content generated concurrently
+    for the same video differs from the stored one, so that quiz keeps its own questions.
+    """
+    if shared is None:
+        return None
+    generated = {
+        'title': content['title'],
+        'description': content['description'],
+        'questions': [{key: question[key] for key in ('question_title', 'question_options', 'answer')}
+                      for question in content['questions']],
+    }
+    return shared if shared_content_as_dict(shared) == generated else None
+
+
+def _question(question: dict, **owner) -> QuizQuestion:
+    return QuizQuestion(question_title=question['question_title'],
+                        question_options=question['question_options'], answer=question['answer'], **owner)
@@ -0,0 +1,302 @@
+import json
+import threading
+import time
+from contextlib import aclosing
+
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+
+from management_app.models import QuizJob
+from management_app.utils import gemini_client, single_flight, transcript_cache
+from management_app.utils.async_pipeline import prepare_quiz_prompt_async
+from management_app.utils.pipeline_metrics import stage_span
+from management_app.utils.quiz_jobs import enqueue_quiz_job, follow_job_async
+from management_app.utils.quiz_persistence import (
+    get_shared_content, get_shared_content_async, quiz_as_dict, quiz_from_shared_content, save_quiz,
+    shared_content_as_dict, validate_quiz_content)
+from management_app.utils.video_id import extract_video_id, canonical_video_url
+from management_app.utils.youtube_quiz_creator import clean_ai_response, prepare_quiz_prompt
+
+_stats = {'streams': 0, 'time_to_first_question_count': 0,
+          'time_to_first_question_seconds_total': 0.0, 'time_to_first_question_seconds_max': 0.0}
+_stats_lock = threading.Lock()
+
+
+class IncrementalQuizParser:
+    """
+    Parses the quiz JSON while Gemini is still writing it. feed() takes the next piece of text
+    and returns ("title" | "description" | "question", value) events for every value of the root
+    object that is complete by now. Text before the opening brace (e.g. ```json) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.position = 0
+        self.stack = []
+        self.finished = False
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.expecting_key = False
+        self.key = None
+        self.question_start = None
+
+    def feed(self, text: str):
+        self.buffer += text
+        events = []
+        while self.position < len(self.buffer) and not self.finished:
+            index = self.position
+            char = self.buffer[index]
+            self.position += 1
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self._string_closed(index, events)
+            elif not self.stack:
+                if char == '{':
+                    self.stack.append(char)
+                    self.expecting_key = True
+            elif char == '"':
+                self.in_string = True
+                self.string_start = index
+            elif char in '{[':
+                if char == '{' and self._in_questions():
+                    self.question_start = index
+                self.stack.append(char)
+            elif char in '}]':
+                self.stack.pop()
+                if char == '}' and self._in_questions() and self.question_start is not None:
+                    self._emit(events, 'question', self.buffer[self.question_start:index + 1])
+                    self.question_start = None
+                self.finished = not self.stack
+            elif len(self.stack) == 1 and char == ':':
+                self.expecting_key = False
+            elif len(self.stack) == 1 and char == ',':
+                self.expecting_key = True
+        return events
+
+    def _in_questions(self) -> bool:
+        return len(self.stack) == 2 and self.stack[1] == '[' and self.key == 'questions'
+
+    def _string_closed(self, end: int, events):
+        if len(self.stack) != 1:
+            return
+        raw_value = self.buffer[self.string_start:end + 1]
+        if self.expecting_key:
+            self.key = json.loads(raw_value)
+        elif self.key in ('title', 'description'):
+            self._emit(events, self.key, raw_value)
+
+    @staticmethod
+    def _emit(events, event: str, raw_value: str):
+        try:
+            events.append((event, json.loads(raw_value)))
+        except ValueError:
+            # The complete response is validated at the end of the stream.
+            pass
+
+
+def stream_quiz_from_url(url: str, user):
+    """
+    Creates a quiz like create_quiz_from_url, but yields (event, data) tuples while it works:
+    "stage" events for each pipeline stage, the "title", "description" and each "question"
+    as soon as Gemini has written it completely, and "done" with the id of the stored quiz.
+    Only Gemini is streamed from the request. A video without a transcript is downloaded and
+    transcribed by a quiz job; the stream then ends with a "job" event pointing to the job's
+    event stream, so the request thread is not held while the job is queued and running.
+    """
+    started = time.perf_counter()
+    video_id = extract_video_id(url)
+    if video_id is None:
+        raise RuntimeError('Invalid YouTube URL')
+    url = canonical_video_url(video_id)
+    _record('streams')
+
+    shared = get_shared_content(video_id)
+    if shared is not None:
+        yield from _stream_shared_content(shared, user, url)
+        return
+
+    yield 'stage', {'stage': 'transcribe'}
+    transcript = transcript_cache.get_transcript(video_id)
+    if transcript is None:
+        yield 'job', _job_event(enqueue_quiz_job(url, user))
+        return
+
+    # Concurrent streams and jobs for the same video share one Gemini call.
+    flight, content = single_flight.lead_or_wait(video_id)
+    if flight is None:
+        yield from _content_events(content)
+    else:
+        try:
+            yield 'stage', {'stage': 'generate'}
+            content = yield from _generate_events(
+                gemini_client.generate_content_stream(prepare_quiz_prompt(transcript)), started)
+            flight.publish(content)
+        finally:
+            flight.release()
+
+    yield 'stage', {'stage': 'save'}
+    with stage_span('save'):
+        quiz = save_quiz(content, user, url)
+    yield 'done', {'quiz_id': quiz.id}
+
+
+def _generate_events(text_stream, started: float):
+    """
+    Yields the values of the quiz as Gemini writes them and returns the validated content.
+    """
+    parser = IncrementalQuizParser()
+    chunks = []
+    first_question = True
+    for text in text_stream:
+        chunks.append(text)
+        for event, data in parser.feed(text):
+            if event == 'question' and first_question:
+                record_time_to_first_question(time.perf_counter() - started)
+                first_question = False
+            yield event, data
+    return validate_quiz_content(clean_ai_response(''.join(chunks)))
+
+
+def _job_event(job: QuizJob) -> dict:
+    return {'job_id': job.pk, 'events_url': reverse('quiz_job_events', kwargs={'pk': job.pk})}
+
+
+async def stream_quiz_from_url_async(url: str, user):
+    """
+    Same as stream_quiz_from_url for async views. Gemini is streamed through its asyncio client,
+    and waiting for a job or for another stream of the same video only costs a coroutine, so the
+    stages of a quiz job are relayed here instead of ending the stream (see _stream_job_async).
+    """
+    started = time.perf_counter()
+    video_id = extract_video_id(url)
+    if video_id is None:
+        raise RuntimeError('Invalid YouTube URL')
+    url = canonical_video_url(video_id)
+    _record('streams')
+
+    shared = await get_shared_content_async(video_id)
+    if shared is not None:
+        for event in _shared_content_events(shared):
+            yield event
+        yield 'stage', {'stage': 'save'}
+        with stage_span('save'):
+            quiz = await sync_to_async(quiz_from_shared_content)(shared, user, url)
+        yield 'done', {'quiz_id': quiz.id}
+        return
+
+    yield 'stage', {'stage': 'transcribe'}
+    transcript = await sync_to_async(transcript_cache.get_transcript)(video_id)
+    if transcript is None:
+        job = await sync_to_async(enqueue_quiz_job)(url, user)
+        async with aclosing(_stream_job_async(job)) as events:
+            async for event in events:
+                yield event
+        return
+
+    flight, content = await single_flight.lead_or_wait_async(video_id)
+    if flight is None:
+        for event in _content_events(content):
+            yield event
+    else:
+        try:
+            yield 'stage', {'stage': 'generate'}
+            parser = IncrementalQuizParser()
+            chunks = []
+            first_question = True
+            prompt = await prepare_quiz_prompt_async(transcript)
+            # Closing the stream right away frees its Gemini slot even if the client went away.
+            async with aclosing(gemini_client.generate_content_stream_async(prompt)) as stream:
+                async for text in stream:
+                    chunks.append(text)
+                    for event, data in parser.feed(text):
+                        if event == 'question' and first_question:
+                            record_time_to_first_question(time.perf_counter() - started)
+                            first_question = False
+                        yield event, data
+            content = validate_quiz_content(clean_ai_response(''.join(chunks)))
+            flight.publish(content)
+        finally:
+            flight.release()
+
+    yield 'stage', {'stage': 'save'}
+    with stage_span('save'):
+        quiz = await sync_to_async(save_quiz)(content, user, url)
+    yield 'done', {'quiz_id': quiz.id}
+
+
+async def _stream_job_async(job: QuizJob):
+    """
+    Relays the stages of a queued quiz job and, once it is done, the content of its quiz.
+    The download and the transcription run in the job workers, which share them with
+    every other job for the same video, so the request only waits for events.
+    """
+    yield 'job', _job_event(job)
+    stage = 'transcribe'
+    async with aclosing(follow_job_async(job.pk)) as events:
+        async for event in events:
+            if event.stage in (QuizJob.STATUS_DONE, QuizJob.STATUS_FAILED):
+                break
+            if event.stage != stage:
+                stage = event.stage
+                yield 'stage', {'stage': stage}
+
+    job = await QuizJob.objects.select_related('quiz').aget(pk=job.pk)
+    if job.status != QuizJob.STATUS_DONE:
+        raise RuntimeError(job.error or 'Quiz job failed')
+    for event in _content_events(await sync_to_async(quiz_as_dict)(job.quiz)):
+        yield event
+    yield 'done', {'quiz_id': job.quiz_id}
+
+
+def _shared_content_events(shared):
+    return _content_events(shared_content_as_dict(shared))
+
+
+def _content_events(content: dict):
+    yield 'title', content['title']
+    yield 'description', content['description']
+    for question in content['questions']:
+        yield 'question', question
+
+
+def _stream_shared_content(shared, user, url: str):
+    """
+    Yields the stored content of a video that was turned into a quiz before, without Gemini.
+    """
+    yield from _shared_content_events(shared)
+    yield 'stage', {'stage': 'save'}
+    with stage_span('save'):
+        quiz = quiz_from_shared_content(shared, user, url)
+    yield 'done', {'quiz_id': quiz.id}
+
+
+def _record(name: str, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+
+def record_time_to_first_question(seconds: float):
+    with _stats_lock:
+        _stats['time_to_first_question_count'] += 1
+        _stats['time_to_first_question_seconds_total'] += seconds
+        _stats['time_to_first_question_seconds_max'] = max(
+            _stats['time_to_first_question_seconds_max'], seconds)
+
+
+def streaming_stats():
+    """
+    Returns the number of streamed quiz creations and their time to the first question.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    count = stats['time_to_first_question_count']
+    stats['time_to_first_question_seconds_avg'] = (
+        stats['time_to_first_question_seconds_total'] / count if count else 0.0)
+    return stats
@@ -0,0 +1,211 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+RAM_DIR = '/dev/shm'
+DIR_NAME = 'quizly-scratch'
+WAIT_POLL_SECONDS = 0.5
+LOCK_NAME = '.lock'
+
+_condition = threading.Condition()
+_active = []
+_swept = False
+
+
+class ScratchArea:
+    """
+    A private directory for the temporary files of one quiz creation. It counts against
+    SCRATCH_MAX_BYTES with at least reserve_bytes until it is closed, which removes it.
+    The reservation is part of the directory name, so other processes count it as well.
+    """
+
+    def __init__(self, path: str, reserve_bytes: int):
+        self.path = path
+        self.reserve_bytes = reserve_bytes
+        self.closed = False
+
+    def file(self, name: str) -> str:
+        """
+        Returns a path for a file inside the area.
+        """
+        return os.path.join(self.path, name)
+
+    def size(self) -> int:
+        return directory_size(self.path)
+
+    def close(self):
+        """
+        Removes the area with all its files. Calling it again does nothing.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        shutil.rmtree(self.path, ignore_errors=True)
+        with _condition:
+            if self in _active:
+                _active.remove(self)
+            _condition.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+@contextmanager
+def scratch_area(reserve_bytes: int = None):
+    """
+    Opens a scratch area and removes it on every way out of the block, see open_scratch_area.
+    """
+    area = open_scratch_area(reserve_bytes)
+    try:
+        yield area
+    finally:
+        area.close()
+
+
+def open_scratch_area(reserve_bytes: int = None) -> ScratchArea:
+    """
+    Creates a scratch area in scratch_root(). Waits while the areas of all processes in the
+    scratch directory, each counted with its files or at least its reservation, would exceed
+    SCRATCH_MAX_BYTES, and raises a RuntimeError after SCRATCH_WAIT_SECONDS. The area has to
+    be closed by the caller.
+    """
+    reserve_bytes = settings.SCRATCH_RESERVE_BYTES if reserve_bytes is None else reserve_bytes
+    root = scratch_root()
+    sweep_stale_areas(root)
+    deadline = time.monotonic() + settings.SCRATCH_WAIT_SECONDS
+
+    with _condition:
+        while True:
+            # The lock keeps other processes from reserving between the check and the mkdir.
+            with FileLock(os.path.join(root, LOCK_NAME), thread_local=False):
+                # An empty directory grants any reservation, so a single download larger
+                # than the quota cannot wait forever.
+                if not _area_names(root) or used_bytes(root) + reserve_bytes <= settings.SCRATCH_MAX_BYTES:
+                    path = os.path.join(root, f'{os.getpid()}-{reserve_bytes}-{uuid.uuid4().hex}')
+                    os.makedirs(path)
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError('Error reserving scratch space: quota exceeded')
+            # Other processes free space without notifying us, so check again regularly.
+            _condition.wait(timeout=min(remaining, WAIT_POLL_SECONDS))
+
+        area = ScratchArea(path, reserve_bytes)
+        _active.append(area)
+    return area
+
+
+def used_bytes(root: str = None) -> int:
+    """
+    Returns the bytes used in the scratch directory, counting every area of every process
+    with its files or its reservation, whichever is larger.
+    """
+    root = root or scratch_root()
+    total = 0
+    for name in _area_names(root):
+        total += max(directory_size(os.path.join(root, name)), _reserved_bytes(name))
+    return total
+
+
+def _area_names(root: str) -> list:
+    try:
+        return [name for name in os.listdir(root) if not name.startswith('.')]
+    except FileNotFoundError:
+        return []
+
+
+def _reserved_bytes(name: str) -> int:
+    # Areas are named '<pid>-<reserved bytes>-<random hex>'.
+    parts = name.split('-')
+    return int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else 0
+
+
+def scratch_root() -> str:
+    """
+    Returns the scratch directory: SCRATCH_DIR if set, otherwise a directory in the RAM-backed
+    /dev/shm if it is large enough for SCRATCH_MAX_BYTES, or else in the system temp directory.
+    """
+    base = settings.SCRATCH_DIR
+    if not base:
+        base = RAM_DIR if _is_large_enough(RAM_DIR, settings.SCRATCH_MAX_BYTES) else tempfile.gettempdir()
+        base = os.path.join(base, DIR_NAME)
+    os.makedirs(base, exist_ok=True)
+    return base
+
+
+def _is_large_enough(path: str, size: int) -> bool:
+    try:
+        return os.path.isdir(path) and shutil.disk_usage(path).total >= size
+    except OSError:
+        return False
+
+
+def sweep_stale_areas(root: str = None, force: bool = False) -> int:
+    """
+    Removes scratch areas left behind by processes that no longer exist, once per process
+    (or every time with force). Areas are named after the id of the process that created them.
+    """
+    global _swept
+    if _swept and not force:
+        return 0
+    _swept = True
+    root = root or scratch_root()
+
+    removed = 0
+    for name in _area_names(root):
+        pid = name.split('-', 1)[0]
+        if not pid.isdigit() or int(pid) == os.getpid() or process_exists(int(pid)):
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info('Removed %s scratch areas of crashed workers', removed)
+    return removed
+
+
+def process_exists(pid: int) -> bool:
+    """
+    Returns whether a process with the given id is running on this host.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+def scratch_stats():
+    """
+    Returns the number of open areas of this process and the bytes used in the scratch directory.
+    """
+    root = scratch_root()
+    with _condition:
+        areas = len(_active)
+    return {'areas': areas, 'used_bytes': used_bytes(root), 'max_bytes': settings.SCRATCH_MAX_BYTES, 'path': root}
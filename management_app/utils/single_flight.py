@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from filelock import FileLock, Timeout
+
+# Coroutines cannot block on the lock, so they try it again after this delay.
+ASYNC_POLL_SECONDS = 0.1
+
+
+def run_once(key: str, compute):
+    """
+    Runs compute() for the given key only once at a time across all worker processes.
+    The first caller (the leader) runs compute() and shares its JSON-serializable result.
+    Callers arriving while the leader runs (followers) wait for the lock and return that
+    result instead of computing it again. If the leader failed, a follower takes over.
+    """
+    flight, result = lead_or_wait(key)
+    if flight is None:
+        return result
+    try:
+        return flight.publish(compute())
+    finally:
+        flight.release()
+
+
+def lead_or_wait(key: str):
+    """
+    Same as run_once for work that is not a single call, e.g. a streamed generation or one
+    spread over pipeline stages. Returns (flight, None) if the caller leads; it then calls
+    flight.publish(result) and flight.release(), from any thread. Returns (None, result)
+    if the caller waited for another leader.
+    """
+    lock = _lock(key)
+    waiting_since = time.time()
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        try:
+            lock.acquire(timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS)
+        except Timeout:
+            raise RuntimeError(f'Timed out waiting for the running quiz generation of {key}')
+        return _after_waiting(key, lock, waiting_since)
+    return Flight(key, lock), None
+
+
+async def lead_or_wait_async(key: str):
+    """
+    Same as lead_or_wait, but waits for the leader on the event loop instead of a thread.
+    """
+    lock = _lock(key)
+    waiting_since = time.time()
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_TIMEOUT_SECONDS
+    waited = False
+    while True:
+        try:
+            lock.acquire(timeout=0)
+            break
+        except Timeout:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'Timed out waiting for the running quiz generation of {key}')
+            waited = True
+            await asyncio.sleep(ASYNC_POLL_SECONDS)
+    if waited:
+        return _after_waiting(key, lock, waiting_since)
+    return Flight(key, lock), None
+
+
+def _lock(key: str) -> FileLock:
+    os.makedirs(single_flight_dir(), exist_ok=True)
+    # Not bound to the acquiring thread, so another pipeline stage can release it.
+    return FileLock(_path(key, '.lock'), thread_local=False)
+
+
+def _after_waiting(key: str, lock: FileLock, waiting_since: float):
+    result = _read_result(key, written_after=waiting_since)
+    if result is not None:
+        lock.release()
+        return None, result
+    return Flight(key, lock), None
+
+
+class Flight:
+    """
+    The lead of a key, held until release().
+    """
+
+    def __init__(self, key: str, lock: FileLock):
+        self.key = key
+        self.lock = lock
+
+    def publish(self, result):
+        """
+        Shares the result with the followers waiting for the lock and returns it.
+        """
+        result_path = _path(self.key, '.json')
+        tmp_path = f'{result_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as result_file:
+            json.dump({'written_at': time.time(), 'result': result}, result_file)
+        os.replace(tmp_path, result_path)
+        remove_stale_results()
+        return result
+
+    def release(self):
+        """
+        Lets the next caller in; without a published result it becomes the leader. Calling it again does nothing.
+        """
+        if self.lock.is_locked:
+            self.lock.release()
+
+
+def _read_result(key: str, written_after: float):
+    try:
+        with open(_path(key, '.json'), encoding='utf-8') as result_file:
+            stored = json.load(result_file)
+    except (OSError, ValueError):
+        return None
+    if stored['written_at'] < written_after:
+        return None
+    return stored['result']
+
+
+def remove_stale_results() -> int:
+    """
+    Removes the results published longer than SINGLE_FLIGHT_TIMEOUT_SECONDS ago.
+    Every follower of them has read them or given up by then.
+    """
+    stale_before = time.time() - settings.SINGLE_FLIGHT_TIMEOUT_SECONDS
+    removed = 0
+    for entry in os.scandir(single_flight_dir()):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            if entry.stat().st_mtime < stale_before:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _path(key: str, suffix: str) -> str:
+    return os.path.join(single_flight_dir(), key + suffix)
+
+
+def single_flight_dir() -> str:
+    return os.path.join(settings.QUIZLY_CACHE_DIR, 'single_flight')
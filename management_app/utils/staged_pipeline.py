@@ -0,0 +1,131 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    """
+    One step of a StagedPipeline, worked on by `workers` threads. The function receives
+    an item and may return the name of a later stage to jump to; otherwise the item
+    moves on to the next stage.
+    """
+    name: str
+    function: Callable
+    workers: int
+
+
+class StagedPipeline:
+    """
+    Moves items through a sequence of stages. Every stage has its own worker threads and a
+    bounded input queue, so a slow stage makes the stages before it wait instead of piling
+    up work (and temporary files) in memory. on_done(item) is called after the last stage,
+    on_error(item, stage, error) when a stage raises; both end the item.
+    """
+
+    def __init__(self, stages, on_done, on_error, queue_size: int = 4):
+        self.stages = list(stages)
+        self.on_done = on_done
+        self.on_error = on_error
+        self.queues = {stage.name: queue.Queue(maxsize=max(queue_size, 1)) for stage in self.stages}
+        self.threads = []
+        self.pending = 0
+        self.idle = threading.Condition()
+
+    def start(self):
+        """
+        Starts the worker threads of all stages.
+        """
+        for stage in self.stages:
+            for number in range(max(stage.workers, 1)):
+                thread = threading.Thread(
+                    target=self._work, args=(stage,), name=f'pipeline-{stage.name}-{number}', daemon=True)
+                self.threads.append(thread)
+                thread.start()
+        return self
+
+    def submit(self, item, timeout: float = None):
+        """
+        Puts an item into the queue of the first stage. Blocks while the queue is full,
+        at most for timeout seconds if given (then queue.Full is raised).
+        """
+        with self.idle:
+            self.pending += 1
+        try:
+            self.queues[self.stages[0].name].put(item, timeout=timeout)
+        except queue.Full:
+            self._finish()
+            raise
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Waits until all submitted items are done and returns whether they are.
+        """
+        with self.idle:
+            return self.idle.wait_for(lambda: self.pending == 0, timeout=timeout)
+
+    def stop(self):
+        """
+        Stops the worker threads once the items submitted so far are done.
+        """
+        self.join()
+        for stage in self.stages:
+            for _ in range(max(stage.workers, 1)):
+                self.queues[stage.name].put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def stage_stats(self):
+        """
+        Returns the number of items waiting in front of every stage.
+        """
+        return {stage.name: self.queues[stage.name].qsize() for stage in self.stages}
+
+    def _work(self, stage: Stage):
+        try:
+            while True:
+                item = self.queues[stage.name].get()
+                if item is _STOP:
+                    return
+                close_old_connections()
+                self._run(stage, item)
+        finally:
+            connection.close()
+
+    def _run(self, stage: Stage, item):
+        try:
+            next_stage = stage.function(item) or self._following(stage)
+        except Exception as e:
+            self._end(self.on_error, item, stage.name, e)
+            return
+        if next_stage is None:
+            self._end(self.on_done, item)
+        else:
+            self.queues[next_stage].put(item)
+
+    def _following(self, stage: Stage):
+        index = self.stages.index(stage)
+        return self.stages[index + 1].name if index + 1 < len(self.stages) else None
+
+    def _end(self, callback, item, *args):
+        try:
+            callback(item, *args)
+        except Exception:
+            logger.exception('Finishing a pipeline item failed')
+        finally:
+            self._finish()
+
+    def _finish(self):
+        with self.idle:
+            self.pending -= 1
+            if self.pending == 0:
+                self.idle.notify_all()
@@ -0,0 +1,78 @@
+import logging
+import re
+import threading
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+ENCODING_NAME = 'cl100k_base'
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+_encoding = None
+_encoding_failed = False
+_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text with tiktoken. If the encoding cannot be loaded
+    (it is downloaded on first use), the count is estimated with four characters per token.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+    with _lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                _encoding = tiktoken.get_encoding(ENCODING_NAME)
+            except Exception as e:
+                logger.warning('Could not load the tiktoken encoding %s, estimating token counts: %s',
+                               ENCODING_NAME, e)
+                _encoding_failed = True
+    return _encoding
+
+
+def split_by_tokens(text: str, max_tokens: int):
+    """
+    Splits a text at sentence ends into chunks of at most max_tokens tokens.
+    Sentences that are longer than max_tokens on their own are split between words.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in _pieces(text, max_tokens):
+        tokens = count_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def _pieces(text: str, max_tokens: int):
+    for sentence in SENTENCE_END.split(text.strip()):
+        if count_tokens(sentence) <= max_tokens:
+            yield sentence
+            continue
+        words = []
+        words_tokens = 0
+        for word in sentence.split():
+            tokens = count_tokens(' ' + word)
+            if words and words_tokens + tokens > max_tokens:
+                yield ' '.join(words)
+                words, words_tokens = [], 0
+            words.append(word)
+            words_tokens += tokens
+        if words:
+            yield ' '.join(words)
@@ -0,0 +1,129 @@
+import os
+import shutil
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from management_app.models import TranscriptCacheEntry
+
+_counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1):
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def get_transcript(video_id: str, model: str = None):
+    """
+    Returns the cached transcript of a video for the given Whisper model (default: WHISPER_MODEL)
+    and marks the entry as recently used. Returns None on a cache miss.
+    """
+    model = model or settings.WHISPER_MODEL
+    entry = TranscriptCacheEntry.objects.filter(video_id=video_id, model=model).only('transcript').first()
+    if entry is None:
+        _count('misses')
+        return None
+
+    _count('hits')
+    TranscriptCacheEntry.objects.filter(pk=entry.pk).update(
+        hits=F('hits') + 1, last_used_at=timezone.now())
+    return entry.transcript
+
+
+def get_audio_file(video_id: str):
+    """
+    Returns the path of a cached audio file of the video, if one is stored.
+    """
+    entries = TranscriptCacheEntry.objects.filter(video_id=video_id).exclude(audio_file='')
+    for audio_file in entries.values_list('audio_file', flat=True):
+        path = os.path.join(audio_cache_dir(), audio_file)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def store_transcript(video_id: str, transcript: str, audio_path: str = None, model: str = None):
+    """
+    Stores a transcript (and with TRANSCRIPT_CACHE_STORE_AUDIO a copy of the audio file)
+    and evicts the least recently used entries if the cache grows above TRANSCRIPT_CACHE_MAX_BYTES.
+    """
+    model = model or settings.WHISPER_MODEL
+    audio_file = ''
+    size_bytes = len(transcript.encode('utf-8'))
+
+    if settings.TRANSCRIPT_CACHE_STORE_AUDIO and audio_path and os.path.exists(audio_path):
+        audio_file = video_id + os.path.splitext(audio_path)[1]
+        cached_path = os.path.join(audio_cache_dir(), audio_file)
+        if os.path.abspath(cached_path) != os.path.abspath(audio_path):
+            os.makedirs(audio_cache_dir(), exist_ok=True)
+            shutil.copyfile(audio_path, cached_path)
+        size_bytes += os.path.getsize(cached_path)
+
+    try:
+        TranscriptCacheEntry.objects.update_or_create(
+            video_id=video_id, model=model,
+            defaults={
+                'transcript': transcript,
+                'audio_file': audio_file,
+                'size_bytes': size_bytes,
+                'last_used_at': timezone.now(),
+            },
+        )
+    except IntegrityError:
+        # Another worker stored the same transcript at the same time.
+        pass
+    evict()
+
+
+def evict(max_bytes: int = None):
+    """
+    Deletes least recently used entries until the cache fits into max_bytes.
+    """
+    max_bytes = settings.TRANSCRIPT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    total = TranscriptCacheEntry.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+    if total <= max_bytes:
+        return 0
+
+    evicted = 0
+    for entry in TranscriptCacheEntry.objects.order_by('last_used_at', 'id').only('size_bytes', 'audio_file'):
+        if total <= max_bytes:
+            break
+        if entry.audio_file and not TranscriptCacheEntry.objects.filter(
+                audio_file=entry.audio_file).exclude(pk=entry.pk).exists():
+            try:
+                os.remove(os.path.join(audio_cache_dir(), entry.audio_file))
+            except OSError:
+                pass
+        entry.delete()
+        total -= entry.size_bytes
+        evicted += 1
+    _count('evictions', evicted)
+    return evicted
+
+
+def audio_cache_dir() -> str:
+    return os.path.join(settings.QUIZLY_CACHE_DIR, 'audio')
+
+
+def counters():
+    """
+    Returns the hit, miss and eviction counters of this process.
+    """
+    with _counters_lock:
+        return dict(_counters)
+
+
+def cache_stats():
+    """
+    Returns the hit, miss and eviction counters of this process and the current cache size.
+    """
+    stats = counters()
+    totals = TranscriptCacheEntry.objects.aggregate(size=Sum('size_bytes'))
+    stats['entries'] = TranscriptCacheEntry.objects.count()
+    stats['size_bytes'] = totals['size'] or 0
+    return stats
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from management_app.utils import gemini_client
+from management_app.utils.pipeline_metrics import stage_span
+from management_app.utils.tokens import count_tokens, split_by_tokens
+
+MAX_ROUNDS = 3
+
+
+def needs_condensing(transcript: str) -> bool:
+    """
+    Returns whether a transcript is too long to be sent to Gemini as a whole.
+    """
+    return count_tokens(transcript) > settings.GEMINI_PROMPT_TOKEN_BUDGET
+
+
+def condense_transcript(transcript: str) -> str:
+    """
+    Splits a long transcript into chunks of GEMINI_CHUNK_TOKENS tokens, lets Gemini extract
+    the key facts of all chunks in parallel and returns the joined notes. Notes that are still
+    above GEMINI_PROMPT_TOKEN_BUDGET are condensed again, up to MAX_ROUNDS times.
+    """
+    notes = transcript
+    with stage_span('condense') as span:
+        span['transcript_tokens'] = count_tokens(transcript)
+        for _ in range(MAX_ROUNDS):
+            chunks = split_by_tokens(notes, settings.GEMINI_CHUNK_TOKENS)
+            notes = '\n\n'.join(extract_key_facts(chunks))
+            if not needs_condensing(notes):
+                break
+    return notes
+
+
+def extract_key_facts(chunks):
+    """
+    Returns the key facts of every chunk, in the order of the chunks.
+    At most GEMINI_MAX_CONCURRENCY chunks are sent to Gemini at the same time.
+    """
+    workers = max(min(len(chunks), settings.GEMINI_MAX_CONCURRENCY), 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='key-facts') as executor:
+        return list(executor.map(
+            lambda numbered: _extract_chunk(*numbered, len(chunks)), enumerate(chunks, 1)))
+
+
+def _extract_chunk(number: int, chunk: str, total: int) -> str:
+    try:
+        response = gemini_client.generate_content(build_key_facts_prompt(chunk, number, total))
+    except Exception as e:
+        raise RuntimeError(f'Error extracting key facts: {str(e)}')
+    return (response.text or '').strip()
+
+
+def build_key_facts_prompt(chunk: str, number: int, total: int) -> str:
+    """
+    Returns the prompt asking Gemini for the key facts of one part of a transcript.
+    """
+    return (
+        f"The following text is part {number} of {total} of a video transcript.\n"
+        "List the key facts, definitions, names, numbers and conclusions it contains that "
+        "would be useful for quiz questions.\n\n"
+        "Requirements:\n"
+        "- Write concise bullet points in the language of the transcript.\n"
+        "- Only include information stated in the text.\n"
+        "- Do not include an introduction or a summary.\n"
+        "Transcript part:\n" + chunk
+    )
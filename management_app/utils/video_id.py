@@ -0,0 +1,49 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+YOUTUBE_HOSTS = {
+    'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+    'youtube-nocookie.com', 'www.youtube-nocookie.com',
+}
+SHORT_HOSTS = {'youtu.be', 'www.youtu.be'}
+PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+
+
+def extract_video_id(url: str):
+    """
+    Returns the 11 character YouTube video id of all common YouTube URL forms
+    (watch, youtu.be, shorts, embed, live, mobile and music links) or None.
+    """
+    if not url:
+        return None
+    try:
+        parsed = urlparse(url.strip())
+        if not parsed.scheme:
+            parsed = urlparse('https://' + url.strip())
+    except ValueError:
+        # e.g. an unclosed IPv6 bracket in the host
+        return None
+    host = (parsed.hostname or '').lower()
+    parts = [part for part in parsed.path.split('/') if part]
+
+    video_id = None
+    if host in SHORT_HOSTS and parts:
+        video_id = parts[0]
+    elif host in YOUTUBE_HOSTS:
+        if parts[:1] == ['watch']:
+            video_id = parse_qs(parsed.query).get('v', [None])[0]
+        elif len(parts) >= 2 and parts[0] in PATH_PREFIXES:
+            video_id = parts[1]
+
+    if video_id and VIDEO_ID_PATTERN.match(video_id):
+        return video_id
+    return None
+
+
+def canonical_video_url(video_id: str) -> str:
+    """
+    Returns the canonical watch URL of a YouTube video id.
+    """
+    return 'https://www.youtube.com/watch?v=' + video_id
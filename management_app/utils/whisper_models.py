@@ -0,0 +1,169 @@
+import functools
+import importlib
+import resource
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from management_app.utils.lazy_modules import whisper
+
+
+@dataclass
+class LoadedModel:
+    """
+    A Whisper model loaded once per process together with its load statistics.
+    Whisper installs decoding hooks on the shared model, so calls to
+    `transcribe` are serialized through `lock`.
+    """
+    name: str
+    model: object
+    load_seconds: float
+    parameter_bytes: int
+    rss_after_load: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def transcribe(self, audio, progress=None, **kwargs):
+        """
+        Transcribes audio with the shared model. The optional progress callback receives
+        the fraction of audio processed so far, taken from Whisper's segment loop.
+        """
+        with self.lock:
+            if progress is None:
+                return self.model.transcribe(audio, **kwargs)
+            return _transcribe_with_progress(self.model, audio, progress, **kwargs)
+
+
+class _ProgressBar:
+    """
+    Stands in for the tqdm progress bar Whisper updates after every decoded segment.
+    """
+
+    def __init__(self, total=None, callback=None, **kwargs):
+        self.total = total or 1
+        self.done = 0
+        self.callback = callback
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, amount):
+        self.done += amount
+        self.callback(min(self.done / self.total, 1))
+
+
+def _transcribe_with_progress(model, audio, progress, **kwargs):
+    """
+    Runs model.transcribe and passes the progress of Whisper's progress bar to the callback.
+    The callback is kept per thread, so transcriptions with other models running at the
+    same time keep their own callbacks or the real progress bar.
+    """
+    _install_progress_hook()
+    _progress.callback = progress
+    try:
+        return model.transcribe(audio, verbose=False, **kwargs)
+    finally:
+        _progress.callback = None
+
+
+_progress = threading.local()
+_progress_hook_lock = threading.Lock()
+_progress_hook_installed = False
+
+
+def _install_progress_hook():
+    """
+    Replaces the tqdm module used by whisper.transcribe once per process with one
+    whose progress bars report to the callback of the calling thread, if it has one.
+    """
+    global _progress_hook_installed
+    with _progress_hook_lock:
+        if _progress_hook_installed:
+            return
+        transcribe_module = importlib.import_module('whisper.transcribe')
+        transcribe_module.tqdm = SimpleNamespace(
+            tqdm=functools.partial(_progress_bar, transcribe_module.tqdm.tqdm))
+        _progress_hook_installed = True
+
+
+def _progress_bar(original_tqdm, **kwargs):
+    callback = getattr(_progress, 'callback', None)
+    if callback is None:
+        return original_tqdm(**kwargs)
+    return _ProgressBar(callback=callback, **kwargs)
+
+
+_models = {}
+_registry_lock = threading.Lock()
+
+
+def get_model(name: str = None) -> LoadedModel:
+    """
+    Returns the process-wide instance of the given Whisper model, loading it on first use.
+    Defaults to the model configured in WHISPER_MODEL.
+    """
+    name = name or settings.WHISPER_MODEL
+    loaded = _models.get(name)
+    if loaded is not None:
+        return loaded
+
+    with _registry_lock:
+        loaded = _models.get(name)
+        if loaded is None:
+            loaded = _load_model(name)
+            _models[name] = loaded
+    return loaded
+
+
+def _load_model(name: str) -> LoadedModel:
+    """
+    Loads a Whisper checkpoint from disk and measures time and memory used for it.
+    """
+    started = time.perf_counter()
+    model = whisper.load_model(name)
+    load_seconds = time.perf_counter() - started
+    parameter_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+    return LoadedModel(
+        name=name,
+        model=model,
+        load_seconds=load_seconds,
+        parameter_bytes=parameter_bytes,
+        rss_after_load=current_rss_bytes(),
+    )
+
+
+def preload_models(names=None):
+    """
+    Loads the given models (default: WHISPER_MODEL) so the first request does not pay for it.
+    """
+    return [get_model(name) for name in (names or [settings.WHISPER_MODEL])]
+
+
+def current_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of this process in bytes.
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def model_stats():
+    """
+    Returns load time and memory figures of every model loaded in this process.
+    """
+    return [
+        {
+            'name': loaded.name,
+            'load_seconds': round(loaded.load_seconds, 3),
+            'parameter_bytes': loaded.parameter_bytes,
+            'rss_after_load': loaded.rss_after_load,
+        }
+        for loaded in list(_models.values())
+    ]
@@ -1,54 +1,119 @@
-import tempfile
+import glob
 import os
+import subprocess
 from django.conf import settings
 
-from management_app.models import QuizQuestion, Quiz
-import whisper
-from google import genai
+from management_app.utils import gemini_client, single_flight, transcript_cache
+from management_app.utils.chunked_transcription import SAMPLE_RATE, should_transcribe_chunked, transcribe_chunked
+from management_app.utils.lazy_modules import numpy as np, yt_dlp
+from management_app.utils.pipeline_metrics import pipeline_trace, stage_span
+from management_app.utils.quiz_persistence import (
+    get_shared_content, quiz_from_shared_content, save_quiz, validate_quiz_content)
+from management_app.utils.scratch_space import scratch_area
+from management_app.utils.tokens import count_tokens
+from management_app.utils.transcript_notes import condense_transcript, needs_condensing
+from management_app.utils.video_id import extract_video_id, canonical_video_url
+from management_app.utils.whisper_models import get_model
 import json
 import re
-import yt_dlp
 
 
-def create_quiz_from_url(url: str, user):
+def create_quiz_from_url(url: str, user, progress=None):
     """
     Given a YouTube video URL, this function downloads the audio, transcribes it,
     generates quiz content using Gemini API, and saves it to the database.
+    Transcripts are cached per video id, so repeated videos go straight to Gemini.
+    Concurrent calls for the same video share one generation and only create their own Quiz.
+    If a quiz was generated for the video before, the new Quiz references that content right away.
+    The optional progress callback is called with the stage name and a fraction between 0 and 1.
+    Every stage is timed, see pipeline_metrics.
     """
-    if url.startswith('https://youtu.be/'):
-        url = url.split("?")[0]
-        url = url.replace('https://youtu.be/',
-                          'https://www.youtube.com/watch?v=')
+    progress = progress or _ignore_progress
 
-    with tempfile.NamedTemporaryFile(suffix='', delete=False) as tmp_file:
-        tmp_audiofile = tmp_file.name
+    video_id = extract_video_id(url)
+    if video_id is None:
+        raise RuntimeError('Invalid YouTube URL')
+    url = canonical_video_url(video_id)
 
-    download_audio_from_video(url, tmp_audiofile)
+    shared = get_shared_content(video_id)
+    if shared is not None:
+        with stage_span('save'):
+            return quiz_from_shared_content(shared, user, url)
 
-    transcript = generate_transcript(tmp_audiofile)
+    with pipeline_trace('create_quiz', video_id=video_id):
+        gemini_response_json = single_flight.run_once(
+            video_id, lambda: generate_quiz_content(url, video_id, progress))
 
+        progress('save', 0)
+        with stage_span('save'):
+            quiz = save_quiz(gemini_response_json, user, url)
+        progress('save', 1)
+
+    return quiz
+
+
+def generate_quiz_content(url: str, video_id: str, progress):
+    """
+    Returns the quiz content generated by Gemini for a video, using the cached transcript if possible.
+    """
+    transcript = transcript_cache.get_transcript(video_id)
+    if transcript is None:
+        transcript = transcribe_video(url, video_id, progress)
+    else:
+        progress('download', 1)
+        progress('transcribe', 1)
+    return generate_quiz_from_transcript(transcript, progress)
+
+
+def generate_quiz_from_transcript(transcript: str, progress):
+    """
+    Lets Gemini generate the quiz for a transcript and returns the validated quiz content.
+    """
+    progress('generate', 0)
     gemini_response = get_ai_response(transcript)
 
-    gemini_response_json = clean_ai_response(gemini_response.text)
+    gemini_response_json = validate_quiz_content(clean_ai_response(gemini_response.text))
+    progress('generate', 1)
+    return gemini_response_json
 
-    quiz = Quiz.objects.create(
-        title=gemini_response_json["title"],
-        description=gemini_response_json["description"],
-        video_url=url,
-        user=user
-    )
 
-    for item in gemini_response_json['questions']:
-        QuizQuestion.objects.create(
-            quiz=quiz,
-            question_title=item["question_title"],
-            question_options=item["question_options"],
-            answer=item["answer"]
-        )
+def transcribe_video(url: str, video_id: str, progress):
+    """
+    Downloads the audio of a video (unless it is cached), transcribes it and caches the transcript.
+    The download is removed again however the transcription ends.
+    """
+    with scratch_area() as scratch:
+        audio_file = fetch_audio(url, video_id, scratch, progress)
+        return transcribe_audio(video_id, audio_file, progress)
 
-    cleanup_temp_files(tmp_audiofile)
 
-    return quiz
+def fetch_audio(url: str, video_id: str, scratch, progress):
+    """
+    Returns the cached audio file of a video, or downloads it into the scratch area.
+    """
+    audio_file = transcript_cache.get_audio_file(video_id)
+    if audio_file is None:
+        progress('download', 0)
+        audio_file = download_audio_from_video(
+            url, scratch.file('audio'), progress=lambda fraction: progress('download', fraction))
+    progress('download', 1)
+    return audio_file
+
+
+def transcribe_audio(video_id: str, audio_file: str, progress):
+    """
+    Transcribes the audio file of a video and caches the transcript.
+    """
+    progress('transcribe', 0)
+    transcript = generate_transcript(
+        audio_file, lambda fraction: progress('transcribe', fraction))
+    transcript_cache.store_transcript(video_id, transcript, audio_file)
+    progress('transcribe', 1)
+    return transcript
+
+
+def _ignore_progress(stage, fraction):
+    pass
 
 
 def cleanup_temp_files(*file_paths):
@@ -56,50 +121,92 @@ def cleanup_temp_files(*file_paths):
     Removes temporary files created during the quiz creation process.
     """
     for file_path in file_paths:
-        try:
-            os.remove(file_path)
-            os.remove(file_path + ".mp3")
-        except OSError:
-            pass
+        for path in [file_path] + glob.glob(glob.escape(file_path) + ".*"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
 
 # region Prepare Quiz Generation
-def download_audio_from_video(url: str, tmp_audiofile: str):
+def download_audio_from_video(url: str, tmp_audiofile: str, audio_format: str = None, progress=None) -> str:
     """
-    Downloads audio from a YouTube video URL and saves it as an MP3 file.
+    Downloads audio from a YouTube video URL and returns the path of the audio file.
+    With the "native" format (default: AUDIO_FORMAT) the audio stream is stored in its
+    original container (opus/m4a) without re-encoding; "mp3" transcodes it to an MP3 file.
+    The optional progress callback receives the fraction of bytes downloaded so far.
     """
+    audio_format = audio_format or settings.AUDIO_FORMAT
     ydl_opts = {
         "format": "bestaudio/best",
         "outtmpl": tmp_audiofile + ".%(ext)s",
         "quiet": True,
         "noplaylist": True,
-        "postprocessors": [{
+    }
+    if progress:
+        ydl_opts["progress_hooks"] = [lambda status: _report_download_progress(status, progress)]
+    if audio_format == "mp3":
+        ydl_opts["postprocessors"] = [{
             "key": "FFmpegExtractAudio",
             "preferredcodec": "mp3",
             "preferredquality": "192",
-        }],
-    }
+        }]
+
+    with stage_span('download') as span:
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+        except Exception as e:
+            cleanup_temp_files(tmp_audiofile)
+            raise RuntimeError(f'Error downloading audio: {str(e)}')
+
+        audio_file = info["requested_downloads"][0]["filepath"]
+        span['download_bytes'] = os.path.getsize(audio_file)
+    return audio_file
 
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-    except Exception as e:
-        cleanup_temp_files(tmp_audiofile)
-        raise RuntimeError(f'Error downloading audio: {str(e)}')
 
+def _report_download_progress(status: dict, progress):
+    total = status.get("total_bytes") or status.get("total_bytes_estimate")
+    if status.get("status") == "downloading" and total:
+        progress(min(status.get("downloaded_bytes", 0) / total, 1))
 
-def generate_transcript(tmp_audiofile: str):
+
+def decode_audio(audio_file: str):
     """
-    Transcribes audio from an MP3 file using the Whisper model and returns the transcript.
+    Decodes an audio file in a single ffmpeg pass into the 16 kHz mono float32 samples Whisper works on.
+    Unlike whisper.load_audio, ffmpeg writes the float32 samples itself, so the samples are neither
+    rounded to 16 bit nor converted and scaled in two more passes over the array.
     """
+    command = ['ffmpeg', '-nostdin', '-threads', '0', '-i', audio_file,
+               '-f', 'f32le', '-ac', '1', '-acodec', 'pcm_f32le', '-ar', str(SAMPLE_RATE), '-']
     try:
-        model = whisper.load_model("turbo")
-        result = model.transcribe(tmp_audiofile + ".mp3")
-        transcript = result.get('text', '').strip()
-        return transcript
-    except Exception as e:
-        cleanup_temp_files(tmp_audiofile)
-        raise RuntimeError(f'Error transcribing audio: {str(e)}')
+        output = subprocess.run(command, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f'Error decoding audio: {e.stderr.decode(errors="replace").strip()}')
+    # torch warns about read-only arrays, and the bytes returned by ffmpeg are read-only.
+    return np.frombuffer(bytearray(output), np.float32)
+
+
+def generate_transcript(audio_file: str, progress=None):
+    """
+    Transcribes an audio file using the Whisper model and returns the transcript.
+    Long audio is split into chunks that are transcribed in parallel if WHISPER_PROCESSES > 1.
+    The optional progress callback receives the fraction of the audio transcribed so far.
+    """
+    with stage_span('transcribe') as span:
+        try:
+            audio = decode_audio(audio_file)
+            span['audio_seconds'] = len(audio) / SAMPLE_RATE
+            if should_transcribe_chunked(audio):
+                transcript = transcribe_chunked(audio, progress)
+            else:
+                model = get_model()
+                result = model.transcribe(audio, progress=progress)
+                transcript = result.get('text', '').strip()
+        except Exception as e:
+            raise RuntimeError(f'Error transcribing audio: {str(e)}')
+        span['transcript_tokens'] = count_tokens(transcript)
+    return transcript
 # endregion
 
 # region Quiz generation and Response Formatting
@@ -109,10 +216,31 @@ def get_ai_response(transcript: str):
     """
     Generates quiz content using the Gemini API based on the provided transcript.
     """
-    client = genai.Client(api_key=settings.MY_API_KEY)
-    gemini_response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents="Based on the following transcript, generate a quiz in valid JSON format.\n\n"
+    prompt = prepare_quiz_prompt(transcript)
+    with stage_span('generate') as span:
+        span['transcript_tokens'] = count_tokens(transcript)
+        gemini_response = gemini_client.generate_content(prompt)
+    return gemini_response
+
+
+def prepare_quiz_prompt(transcript: str) -> str:
+    """
+    Returns the quiz prompt for a transcript. Transcripts above GEMINI_PROMPT_TOKEN_BUDGET
+    tokens are condensed to notes of their key facts first, short ones are used as they are.
+    """
+    if needs_condensing(transcript):
+        return build_quiz_prompt(condense_transcript(transcript), notes=True)
+    return build_quiz_prompt(transcript)
+
+
+def build_quiz_prompt(transcript: str, notes: bool = False) -> str:
+    """
+    Returns the prompt asking Gemini for a quiz about the transcript,
+    or about notes of the key facts of a transcript.
+    """
+    source = "notes on a video transcript" if notes else "transcript"
+    return (
+        f"Based on the following {source}, generate a quiz in valid JSON format.\n\n"
         "The quiz must follow this exact structure:\n\n"
         "{\n"
         "  \"title\": \"Create a concise quiz title based on the topic of the transcript.\",\n"
@@ -131,18 +259,18 @@ def get_ai_response(transcript: str):
         "- Only one correct answer is allowed per question, and it must be present in 'question_options'.\n"
         "- The output must be valid JSON and parsable as-is (e.g., using Python's json.loads).\n"
         "- Do not include explanations, comments, or any text outside the JSON.\n"
-        "Transcript:\n" + transcript
+        + ("Notes:\n" if notes else "Transcript:\n") + transcript
     )
-    return gemini_response
 
 
 def clean_ai_response(gemini_response):
     """
     Cleans and parses the Gemini API response to extract valid JSON content.
     """
-    cleaned_response = re.sub(r'^[^{]*', '', gemini_response)
-    cleaned_response = cleaned_response.replace("`", "")
-    cleaned_response = cleaned_response.strip()
-    gemini_reponse_json = json.loads(cleaned_response)
+    with stage_span('parse'):
+        cleaned_response = re.sub(r'^[^{]*', '', gemini_response)
+        cleaned_response = cleaned_response.replace("`", "")
+        cleaned_response = cleaned_response.strip()
+        gemini_reponse_json = json.loads(cleaned_response)
     return gemini_reponse_json
 # endregion
@@ -1,3 +1,27 @@
-from django.shortcuts import render
+import hmac
 
-# Create your views here.
\ No newline at end of file
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from management_app.utils.pipeline_metrics import render_metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Serves the pipeline metrics of this process in the Prometheus text format.
+    Requires METRICS_TOKEN as Bearer token. Only with DEBUG and no token set, requests from
+    METRICS_ALLOWED_IPS are allowed instead; behind a reverse proxy every request comes from its address.
+    """
+    if not metrics_access_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def metrics_access_allowed(request) -> bool:
+    if settings.METRICS_TOKEN:
+        header = request.headers.get('Authorization', '')
+        # compare_digest only takes ASCII strings, so non-ASCII headers are compared as bytes.
+        return hmac.compare_digest(header.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode())
+    return settings.DEBUG and request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
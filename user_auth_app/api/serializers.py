@@ -1,6 +1,19 @@
 from rest_framework import serializers
 
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+
+def email_exists(email: str) -> bool:
+    """
+    Checks case-insensitively if an email is already in use.
+    The query matches the unique index on LOWER(email) of auth_user.
+    """
+    return User.objects.filter(email__gt='').annotate(email_lower=Lower('email')).filter(
+        email_lower=Lower(Value(email))).exists()
+
 
 class RegistrationSerializer(serializers.ModelSerializer):
     confirmed_password = serializers.CharField(write_only=True)
@@ -17,21 +30,32 @@ class RegistrationSerializer(serializers.ModelSerializer):
             }
         }
 
-    def save(self):
-        """Checks if passwords match and if email is already in use. Sets the account details and saves afterwards."""
-        password = self.validated_data['password']
-        confirmed_password = self.validated_data['confirmed_password']
-
-        if password != confirmed_password:
+    def validate(self, attrs):
+        """Checks if passwords match and if email is already in use, before the password gets hashed."""
+        if attrs['password'] != attrs['confirmed_password']:
             raise serializers.ValidationError({'error': 'Passwords do not match'})
 
-        if User.objects.filter(email=self.validated_data['email']).exists():
+        if email_exists(attrs['email']):
             raise serializers.ValidationError({'error': 'Email already exists'})
+        return attrs
 
+    def save(self, password_hash=None):
+        """Sets the account details and saves afterwards. A password hash computed beforehand can be passed in."""
         user = User(
             email=self.validated_data['email'],
             username=self.validated_data['username']
         )
-        user.set_password(password)
-        user.save()
-        return user
\ No newline at end of file
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(self.validated_data['password'])
+
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Same shape as the errors of validate(), which DRF puts into lists.
+            if email_exists(user.email):
+                raise serializers.ValidationError({'error': ['Email already exists']})
+            raise serializers.ValidationError({'error': ['Username already exists']})
+        return user
@@ -1,10 +1,18 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import RegistrationView, LogoutView, CookieTokenObtainPairView, CookieTokenRefreshView
+from .views import (
+    RegistrationView, LogoutView, CookieTokenObtainPairView, CookieTokenRefreshView,
+    AsyncRegistrationView, AsyncLoginView, AsyncLogoutView, AsyncTokenRefreshView,
+)
+
+if settings.ASYNC_VIEWS:
+    RegistrationView, CookieTokenObtainPairView, LogoutView, CookieTokenRefreshView = (
+        AsyncRegistrationView, AsyncLoginView, AsyncLogoutView, AsyncTokenRefreshView)
 
 urlpatterns = [
     path('register/', RegistrationView.as_view(), name='register'),
     path('login/', CookieTokenObtainPairView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('token/refresh/', CookieTokenRefreshView.as_view(), name='token_refresh'),
-]
\ No newline at end of file
+]
@@ -1,27 +1,56 @@
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 from django.conf import settings
-
+from django.contrib.auth import aauthenticate
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from user_auth_app.authentication import authenticate_async, invalidate_user
+from user_auth_app.utils.password_hashing import make_password_async, make_password_bounded
 from .serializers import RegistrationSerializer
 from .permissions import AuthenticatedViaRefreshToken
 
+LOGOUT_DATA = {"detail": "Log-Out successfully! All Tokens will be deleted. Refresh token is now invalid."}
+
+
+def parse_request_data(request):
+    """
+    Returns the JSON or form data of a plain Django request, or None if the body is invalid.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST.dict()
+
 
 class RegistrationView(CreateAPIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
         """
-        Registers a new user with the provided data.
+        Registers a new user with the provided data. The password is hashed with bounded
+        concurrency, so a burst of sign-ups cannot occupy every CPU core.
         """
         serializer = RegistrationSerializer(data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(password_hash=make_password_bounded(serializer.validated_data['password']))
             return Response(
                 {"detail": "User created successfully!"},
                 status=status.HTTP_201_CREATED
@@ -30,6 +59,29 @@ class RegistrationView(CreateAPIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncRegistrationView(View):
+    http_method_names = ['post']
+
+    async def post(self, request):
+        """
+        Same as RegistrationView, awaiting the password hash instead of blocking a thread.
+        """
+        data = parse_request_data(request)
+        if data is None:
+            return JsonResponse({'detail': 'Invalid request data'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = RegistrationSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        password_hash = await make_password_async(serializer.validated_data['password'])
+        try:
+            await sync_to_async(serializer.save)(password_hash=password_hash)
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse({"detail": "User created successfully!"}, status=status.HTTP_201_CREATED)
+
+
 class CookieTokenObtainPairView(TokenObtainPairView):
     permission_classes = [AllowAny]
 
@@ -40,38 +92,63 @@ class CookieTokenObtainPairView(TokenObtainPairView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        user = serializer.user
-        tokens = serializer.validated_data
+        response = Response(login_data(serializer.user))
+        set_login_cookies(response, serializer.validated_data)
+        return response
 
-        response = Response()
 
-        response.set_cookie(
-            key="access_token",
-            value=tokens["access"],
-            httponly=True,
-            secure=settings.SECURE_COOKIES,
-            samesite='Lax',
-        )
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    http_method_names = ['post']
+
+    async def post(self, request):
+        """
+        Same as CookieTokenObtainPairView, authenticating with Django's async auth API.
+        """
+        data = parse_request_data(request)
+        if data is None:
+            return JsonResponse({'detail': 'Invalid request data'}, status=status.HTTP_400_BAD_REQUEST)
+        errors = {field: ['This field is required.'] for field in ('username', 'password') if not data.get(field)}
+        if errors:
+            return JsonResponse(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await aauthenticate(request, username=data['username'], password=data['password'])
+        if user is None:
+            return JsonResponse({'detail': 'No active account found with the given credentials'},
+                                status=status.HTTP_401_UNAUTHORIZED)
+
+        refresh = TokenObtainPairSerializer.get_token(user)
+        response = JsonResponse(login_data(user))
+        set_login_cookies(response, {"access": str(refresh.access_token), "refresh": str(refresh)})
+        return response
+
+
+def login_data(user):
+    return {
+        "detail": "Login successful",
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email
+        }
+    }
 
+
+def set_login_cookies(response, tokens):
+    """
+    Sets the access and refresh tokens in HttpOnly cookies; a refresh only passes the access token.
+    """
+    for key in ("access", "refresh"):
+        if key not in tokens:
+            continue
         response.set_cookie(
-            key="refresh_token",
-            value=tokens["refresh"],
+            key=f"{key}_token",
+            value=tokens[key],
             httponly=True,
             secure=settings.SECURE_COOKIES,
             samesite='Lax',
         )
 
-        response.data = {
-            "detail": "Login successful",
-            "user": {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email
-            }
-        }
-
-        return response
-
 
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
@@ -80,13 +157,30 @@ class LogoutView(APIView):
         """
         Logs out the user by deleting the access and refresh tokens stored in cookies.
         """
-        response = Response(
-            {"detail": "Log-Out successfully! All Tokens will be deleted. Refresh token is now invalid."},
-            status=status.HTTP_200_OK
-        )
-        response.delete_cookie(key="refresh_token", samesite='Lax')
-        response.delete_cookie(key="access_token", samesite='Lax')
-        return response
+        invalidate_user(request.user.pk)
+        return delete_login_cookies(Response(LOGOUT_DATA, status=status.HTTP_200_OK))
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLogoutView(View):
+    http_method_names = ['post']
+
+    async def post(self, request):
+        """
+        Same as LogoutView.
+        """
+        user = await authenticate_async(request)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                                status=status.HTTP_403_FORBIDDEN)
+        invalidate_user(user.pk)
+        return delete_login_cookies(JsonResponse(LOGOUT_DATA, status=status.HTTP_200_OK))
+
+
+def delete_login_cookies(response):
+    response.delete_cookie(key="refresh_token", samesite='Lax')
+    response.delete_cookie(key="access_token", samesite='Lax')
+    return response
 
 
 class CookieTokenRefreshView(TokenRefreshView):
@@ -120,12 +214,30 @@ class CookieTokenRefreshView(TokenRefreshView):
             status=status.HTTP_200_OK
         )
 
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            httponly=True,
-            secure=True,
-            samesite='Lax',
-        )
+        set_login_cookies(response, {"access": access_token})
+        return response
 
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTokenRefreshView(View):
+    http_method_names = ['post']
+
+    async def post(self, request):
+        """
+        Same as CookieTokenRefreshView.
+        """
+        refresh_token = request.COOKIES.get('refresh_token')
+        if not refresh_token:
+            return JsonResponse({'detail': 'You do not have permission to perform this action.'},
+                                status=status.HTTP_403_FORBIDDEN)
+
+        serializer = TokenRefreshSerializer(data={"refresh": refresh_token})
+        try:
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
+        except (ValidationError, TokenError, AuthenticationFailed):
+            return JsonResponse({"message": "Refresh Token invalid!"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        access_token = serializer.validated_data.get('access')
+        response = JsonResponse({"detail": "Token refreshed", "access": access_token}, status=status.HTTP_200_OK)
+        set_login_cookies(response, {"access": access_token})
         return response
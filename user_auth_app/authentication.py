@@ -1,16 +1,88 @@
-from rest_framework.authentication import BaseAuthentication
-from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth.models import User
+import copy
+import threading
+import time
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from cachetools import TLRUCache
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+
+CachedToken = namedtuple('CachedToken', ['user', 'validated_token', 'expires_at'])
+
+_token_cache = TLRUCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttu=lambda raw_token, cached, now: cached.expires_at,
+    timer=time.time,
+)
+_token_cache_lock = threading.Lock()
+
+
+class CookieJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates with the access token from the "access_token" cookie or, if there is
+    no cookie, from the Authorization header. Decoded tokens and their users are cached
+    until the token expires, so repeated requests need neither a decode nor a query.
+    """
 
-class CookieJWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
-        token = request.COOKIES.get("access_token")
-        if not token:
+        cookie_token = request.COOKIES.get("access_token")
+        if cookie_token:
+            try:
+                return self.authenticate_token(cookie_token)
+            except (AuthenticationFailed, TokenError):
+                pass
+
+        header = self.get_header(request)
+        if header is None:
             return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return self.authenticate_token(raw_token.decode() if isinstance(raw_token, bytes) else raw_token)
+
+    def authenticate_token(self, raw_token: str):
+        """
+        Returns (user, validated_token) for a raw token, from the cache if possible.
+        """
+        with _token_cache_lock:
+            cached = _token_cache.get(raw_token)
+        if cached is None:
+            validated_token = self.get_validated_token(raw_token)
+            user = self.get_user(validated_token)
+            cached = CachedToken(user, validated_token, validated_token['exp'])
+            with _token_cache_lock:
+                _token_cache[raw_token] = cached
+        # Views may modify request.user, so every request gets its own copy.
+        return (copy.copy(cached.user), cached.validated_token)
+
+    def authenticate_header(self, request):
+        """
+        Sends no WWW-Authenticate challenge, so DRF keeps answering unauthenticated
+        requests with 403 as it did before the header tokens were read here.
+        """
+        return None
+
+
+def invalidate_user(user_id):
+    """
+    Removes all cached tokens of a user, e.g. after logout or when the user changed.
+    """
+    with _token_cache_lock:
+        for raw_token, cached in list(_token_cache.items()):
+            if cached.user.pk == user_id:
+                del _token_cache[raw_token]
+
 
-        try:
-            validated = AccessToken(token)
-            user = User.objects.get(id=validated["user_id"])
-            return (user, token)
-        except Exception:
-            return None
\ No newline at end of file
+async def authenticate_async(request):
+    """
+    Authenticates a plain Django request in an async view the same way DRF views do
+    and returns the user, or None if the request is not authenticated.
+    """
+    try:
+        result = await sync_to_async(CookieJWTAuthentication().authenticate)(request)
+    except (AuthenticationFailed, TokenError):
+        return None
+    return result[0] if result else None
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Stops the migration if emails differing only in case are in use more than once, since
+    the unique index cannot be created then. Which account keeps the email has to be decided
+    by hand, e.g. in the admin, before migrating again.
+    """
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.filter(email__gt='').values(email_lower=Lower('email'))
+        .annotate(count=Count('id')).filter(count__gt=1).values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            f'These emails are used by several users, differing only in case: {", ".join(sorted(duplicates))}. '
+            f'Change or remove them so every email is used once, then run the migration again.'
+        )
+
+
+class Migration(migrations.Migration):
+    """
+    Adds a unique index on LOWER(email) to Django's auth_user table, so the registration
+    can look up emails case-insensitively without a table scan and duplicates are
+    rejected by the database even if two sign-ups race each other.
+    Users without email (e.g. created with createsuperuser) are not part of the index.
+    Existing duplicates are reported before the index is created.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX auth_user_email_lower_uniq ON auth_user (LOWER(email)) WHERE email > ''",
+            reverse_sql="DROP INDEX auth_user_email_lower_uniq",
+        ),
+    ]
@@ -0,0 +1,13 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_tokens(sender, instance, **kwargs):
+    """
+    Makes sure changed or deleted users are loaded again on their next request.
+    """
+    invalidate_user(instance.pk)
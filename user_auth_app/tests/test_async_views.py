@@ -0,0 +1,70 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from user_auth_app.api.views import AsyncLoginView, AsyncLogoutView, AsyncRegistrationView, AsyncTokenRefreshView
+
+
+class AsyncAuthViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='olivia', password='password123')
+        self.factory = AsyncRequestFactory()
+
+    async def login(self, password='password123'):
+        request = self.factory.post('/api/login/', {'username': 'olivia', 'password': password},
+                                    content_type='application/json')
+        return await AsyncLoginView.as_view()(request)
+
+    async def test_login_sets_token_cookies(self):
+        response = await self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.cookies['access_token']['httponly'])
+        self.assertIn('refresh_token', response.cookies)
+
+    async def test_login_failure(self):
+        self.assertEqual((await self.login('anotherpassword')).status_code, 401)
+
+        request = self.factory.post('/api/login/', {'username': 'olivia'}, content_type='application/json')
+        self.assertEqual((await AsyncLoginView.as_view()(request)).status_code, 400)
+
+    async def test_logout(self):
+        access_token = (await self.login()).cookies['access_token'].value
+        request = self.factory.post('/api/logout/', headers={'Authorization': f'Bearer {access_token}'})
+        response = await AsyncLogoutView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies['access_token'].value, '')
+        self.assertEqual((await AsyncLogoutView.as_view()(self.factory.post('/api/logout/'))).status_code, 403)
+
+    async def test_token_refresh(self):
+        refresh_token = (await self.login()).cookies['refresh_token'].value
+        view = AsyncTokenRefreshView.as_view()
+
+        self.factory.cookies['refresh_token'] = refresh_token
+        for secure in (False, True):
+            with override_settings(SECURE_COOKIES=secure):
+                response = await view(self.factory.post('/api/token/refresh/'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(bool(response.cookies['access_token']['secure']), secure)
+        self.factory.cookies['refresh_token'] = 'invalidtoken'
+        self.assertEqual((await view(self.factory.post('/api/token/refresh/'))).status_code, 401)
+        del self.factory.cookies['refresh_token']
+        self.assertEqual((await view(self.factory.post('/api/token/refresh/'))).status_code, 403)
+
+    async def test_registration(self):
+        data = {'username': 'emma', 'email': 'emma@example.com',
+                'password': 'password123', 'confirmed_password': 'password123'}
+        request = self.factory.post('/api/register/', data, content_type='application/json')
+        response = await AsyncRegistrationView.as_view()(request)
+
+        self.assertEqual(response.status_code, 201)
+        user = await User.objects.aget(username='emma')
+        self.assertTrue(await sync_to_async(user.check_password)('password123'))
+
+        request = self.factory.post('/api/register/', {**data, 'username': 'emma2', 'email': 'EMMA@example.com'},
+                                    content_type='application/json')
+        response = await AsyncRegistrationView.as_view()(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'error': ['Email already exists']})
@@ -0,0 +1,65 @@
+from rest_framework.test import APITestCase, APIRequestFactory
+from django.contrib.auth.models import User
+
+from user_auth_app.authentication import CookieJWTAuthentication
+
+
+class CookieJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        response = self.client.post(
+            '/api/login/', {'username': 'testuser', 'password': 'testpass'}, format='json')
+        self.access_token = response.cookies.get('access_token').value
+        self.factory = APIRequestFactory()
+
+    def cookie_request(self, token=None):
+        request = self.factory.get('/api/quizzes/')
+        request.COOKIES['access_token'] = token or self.access_token
+        return request
+
+    def test_cached_token_needs_no_query(self):
+        authentication = CookieJWTAuthentication()
+        user, _ = authentication.authenticate(self.cookie_request())
+        self.assertEqual(user, self.user)
+
+        with self.assertNumQueries(0):
+            user, validated_token = authentication.authenticate(self.cookie_request())
+        self.assertEqual(user, self.user)
+        self.assertEqual(validated_token['user_id'], str(self.user.id))
+
+    def test_header_token_uses_same_cache(self):
+        authentication = CookieJWTAuthentication()
+        authentication.authenticate(self.cookie_request())
+        request = self.factory.get('/api/quizzes/', HTTP_AUTHORIZATION='Bearer ' + self.access_token)
+
+        with self.assertNumQueries(0):
+            user, _ = authentication.authenticate(request)
+        self.assertEqual(user, self.user)
+
+    def test_invalid_cookie_is_ignored(self):
+        self.assertIsNone(CookieJWTAuthentication().authenticate(self.cookie_request('invalidtoken')))
+
+    def test_user_change_invalidates_cache(self):
+        authentication = CookieJWTAuthentication()
+        authentication.authenticate(self.cookie_request())
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(authentication.authenticate(self.cookie_request()))
+
+    def test_logout_invalidates_cache(self):
+        authentication = CookieJWTAuthentication()
+        authentication.authenticate(self.cookie_request())
+        self.client.post('/api/logout/')
+
+        with self.assertNumQueries(1):
+            authentication.authenticate(self.cookie_request())
+
+    def test_unauthenticated_requests_are_forbidden(self):
+        self.client.cookies.clear()
+        response = self.client.get('/api/quizzes/')
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('WWW-Authenticate', response)
+
+        response = self.client.get('/api/quizzes/', HTTP_AUTHORIZATION='Bearer invalidtoken')
+        self.assertEqual(response.status_code, 403)
@@ -1,4 +1,10 @@
+from unittest import mock
+
 from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.urls import reverse
 
 
@@ -36,4 +42,56 @@ class RegistrationTests(APITestCase):
         }
 
         response = self.client.post(url, data, format='json')
-        self.assertEqual(response.status_code, 400)
\ No newline at end of file
+        self.assertEqual(response.status_code, 400)
+
+    def test_registration_email_exists_case_insensitive(self):
+        User.objects.create_user(username='olduser', password='oldpassword123', email='New@User.de')
+        url = reverse('register')
+        data = {
+            'username': 'newuser',
+            'password': 'newpassword123',
+            'confirmed_password': 'newpassword123',
+            'email': 'new@user.DE'
+        }
+
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': ['Email already exists']})
+
+    def test_registration_race_keeps_the_error_format(self):
+        User.objects.create_user(username='olduser', password='oldpassword123', email='new@user.de')
+        url = reverse('register')
+        data = {
+            'username': 'newuser',
+            'password': 'newpassword123',
+            'confirmed_password': 'newpassword123',
+            'email': 'NEW@user.de'
+        }
+
+        # Another sign-up stores the email between the check in validate() and the insert.
+        with mock.patch('user_auth_app.api.serializers.email_exists', side_effect=[False, True]):
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': ['Email already exists']})
+
+    def test_registration_stores_hashed_password(self):
+        url = reverse('register')
+        data = {
+            'username': 'newuser',
+            'password': 'newpassword123',
+            'confirmed_password': 'newpassword123',
+            'email': 'new@user.de'
+        }
+
+        self.client.post(url, data, format='json')
+        self.assertTrue(User.objects.get(username='newuser').check_password('newpassword123'))
+
+    def test_duplicate_email_is_rejected_by_database(self):
+        User.objects.create_user(username='olduser', password='oldpassword123', email='new@user.de')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(username='newuser', password='newpassword123', email='NEW@user.de')
+
+    def test_email_lookup_uses_index(self):
+        queryset = User.objects.filter(email__gt='').annotate(email_lower=Lower('email')).filter(
+            email_lower=Lower(Value('new@user.de')))
+        self.assertIn('auth_user_email_lower_uniq', queryset.explain())
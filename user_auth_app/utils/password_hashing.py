@@ -0,0 +1,25 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+
+
+def make_password_bounded(password: str) -> str:
+    """
+    Hashes a password on a small dedicated thread pool and waits for the result. This bounds
+    the concurrency: at most PASSWORD_HASH_WORKERS hashes run at the same time, so a burst of
+    sign-ups queues up instead of using every CPU core. The calling thread still waits for the
+    whole hash; make_password_async does not hold a thread.
+    """
+    return _executor.submit(make_password, password).result()
+
+
+async def make_password_async(password: str) -> str:
+    """
+    Same as make_password_bounded, but awaits the hash on the event loop.
+    """
+    return await asyncio.wrap_future(_executor.submit(make_password, password))